@@ -66,6 +66,24 @@ class CoreConfig(AppConfig):
             dispatch_uid='waldur_core.core.handlers.log_token_create',
         )
 
+        signals.post_save.connect(
+            handlers.invalidate_cached_token,
+            sender=Token,
+            dispatch_uid='waldur_core.core.handlers.invalidate_cached_token_on_save',
+        )
+
+        signals.post_delete.connect(
+            handlers.invalidate_cached_token,
+            sender=Token,
+            dispatch_uid='waldur_core.core.handlers.invalidate_cached_token_on_delete',
+        )
+
+        signals.post_save.connect(
+            handlers.invalidate_cached_user_token,
+            sender=User,
+            dispatch_uid='waldur_core.core.handlers.invalidate_cached_user_token',
+        )
+
         for index, model in enumerate(StateMixin.get_all_models()):
             fsm_signals.post_transition.connect(
                 handlers.delete_error_message,
@@ -5,6 +5,7 @@ from django.utils.translation import ugettext_lazy as _
 from rest_framework import exceptions
 
 import waldur_core.logging.middleware
+from waldur_core.core import token_activity
 
 TOKEN_KEY = settings.WALDUR_CORE.get('TOKEN_KEY', 'x-auth-token')
 
@@ -47,7 +48,7 @@ class TokenAuthentication(rest_framework.authentication.TokenAuthentication):
     def authenticate_credentials(self, key):
         model = self.get_model()
         try:
-            token = model.objects.select_related('user').get(key=key)
+            token = token_activity.get_cached_token(key)
         except model.DoesNotExist:
             raise exceptions.AuthenticationFailed(_('Invalid token.'))
 
@@ -56,8 +57,9 @@ class TokenAuthentication(rest_framework.authentication.TokenAuthentication):
 
         if token.user.token_lifetime:
             lifetime = timezone.timedelta(seconds=token.user.token_lifetime)
+            last_activity = token_activity.get_last_activity(token)
 
-            if token.created < timezone.now() - lifetime:
+            if last_activity < timezone.now() - lifetime:
                 raise exceptions.AuthenticationFailed(_('Token has expired.'))
 
         return token.user, token
@@ -91,12 +93,12 @@ def user_capturing_auth(auth):
         def authenticate(self, request):
             result = super(CapturingAuthentication, self).authenticate(request)
             if result is not None:
-                user, _ = result
+                user, token = result
                 waldur_core.logging.middleware.set_current_user(user)
-                token = user.auth_token
+                if token is None:
+                    token = user.auth_token
                 if token:
-                    token.created = timezone.now()
-                    token.save()
+                    token_activity.record_activity(token)
             return result
 
     return CapturingAuthentication
@@ -2,6 +2,7 @@ from django.conf import settings
 from django.forms import model_to_dict
 from rest_framework.authtoken.models import Token
 
+from waldur_core.core import token_activity
 from waldur_core.core.log import event_logger
 from waldur_core.core.models import StateMixin
 
@@ -11,6 +12,17 @@ def create_auth_token(sender, instance, created=False, **kwargs):
         Token.objects.create(user=instance)
 
 
+def invalidate_cached_token(sender, instance, **kwargs):
+    token_activity.invalidate_cached_token(instance.key)
+
+
+def invalidate_cached_user_token(sender, instance, created=False, **kwargs):
+    if created:
+        return
+    for key in Token.objects.filter(user=instance).values_list('key', flat=True):
+        token_activity.invalidate_cached_token(key)
+
+
 def preserve_fields_before_update(sender, instance, **kwargs):
     if instance.pk is None:
         return
@@ -132,7 +132,11 @@ class SummaryQuerySet:
         return self
 
     def count(self):
-        return sum([qs.count() for qs in self.querysets])
+        querysets = [qs.order_by().values('pk') for qs in self.querysets]
+        if len(querysets) < 2:
+            return sum([qs.count() for qs in querysets])
+        # Count rows of all models with single UNION ALL query
+        return querysets[0].union(*querysets[1:], all=True).count()
 
     def all(self):
         return self
@@ -144,17 +148,21 @@ class SummaryQuerySet:
             return
 
     def __getitem__(self, val):
-        chained_querysets = self._get_chained_querysets()
         if isinstance(val, slice):
-            return list(itertools.islice(chained_querysets, val.start, val.stop))
+            if val.step is not None:
+                chained_querysets = self._get_chained_querysets()
+                return list(
+                    itertools.islice(chained_querysets, val.start, val.stop, val.step)
+                )
+            return list(self._get_slice(val.start or 0, val.stop))
         else:
             try:
-                return next(itertools.islice(chained_querysets, val, val + 1))
+                return next(iter(self._get_slice(val, val + 1)))
             except StopIteration:
                 raise IndexError
 
     def __len__(self):
-        return sum([q.count() for q in self.querysets])
+        return self.count()
 
     def _get_chained_querysets(self):
         if self._order_by:
@@ -164,6 +172,34 @@ class SummaryQuerySet:
         else:
             return itertools.chain(*[qs.iterator() for qs in self.querysets])
 
+    def _get_slice(self, start, stop):
+        """
+        Fetch at most <stop> rows from each ordered queryset and merge them,
+        or skip whole querysets using their counts if ordering is not defined.
+        """
+        if stop is None:
+            return itertools.islice(self._get_chained_querysets(), start, None)
+
+        if self._order_by:
+            subsequences = [qs[:stop] for qs in self.querysets]
+            merged = self._merge(subsequences, compared_attr=self._order_by)
+            return itertools.islice(merged, start, stop)
+
+        results = []
+        for qs in self.querysets:
+            if stop <= start:
+                break
+            count = qs.count()
+            if start >= count:
+                start -= count
+                stop -= count
+                continue
+            rows = list(qs[start:stop])
+            results.extend(rows)
+            start = 0
+            stop -= count
+        return results
+
     def _merge(self, subsequences, compared_attr='pk'):
         @functools.total_ordering
         class Compared:
@@ -207,10 +243,11 @@ class SummaryQuerySet:
             compared_attr = compared_attr[1:]
 
         # prepare a heap whose items are
-        # (compared, current-value, iterator), one each per (non-empty) subsequence
+        # (compared, index, current-value, iterator), one each per (non-empty) subsequence
         # <compared> is used for model instances comparison based on given attribute
+        # <index> of subsequence breaks ties so that model instances are never compared
         heap = []
-        for subseq in subsequences:
+        for index, subseq in enumerate(subsequences):
             iterator = iter(subseq)
             for current_value in iterator:
                 # subseq is not empty, therefore add this subseq's item to the list
@@ -218,6 +255,7 @@ class SummaryQuerySet:
                     heap,
                     (
                         Compared(current_value, compared_attr, reverse=reverse),
+                        index,
                         current_value,
                         iterator,
                     ),
@@ -226,7 +264,7 @@ class SummaryQuerySet:
 
         while heap:
             # get and yield lowest current value (and corresponding iterator)
-            _, current_value, iterator = heap[0]
+            _, index, current_value, iterator = heap[0]
             yield current_value
             for current_value in iterator:
                 # subseq is not finished, therefore add this subseq's item back into the priority queue
@@ -234,6 +272,7 @@ class SummaryQuerySet:
                     heap,
                     (
                         Compared(current_value, compared_attr, reverse=reverse),
+                        index,
                         current_value,
                         iterator,
                     ),
@@ -1,15 +1,178 @@
+import base64
+import binascii
+import hashlib
+import json
 from collections import OrderedDict
 
-from rest_framework import pagination
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, FieldDoesNotExist, ValidationError
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db import connections
+from django.db.models import Q
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.query import EmptyQuerySet, QuerySet
+from django.utils.functional import cached_property
+from django.utils.translation import ugettext_lazy as _
+from rest_framework import exceptions, pagination
 from rest_framework.response import Response
 from rest_framework.utils.urls import remove_query_param, replace_query_param
 
+EXACT_COUNT_QUERY_PARAM = 'exact_count'
+
 
 class LinkHeaderPagination(pagination.PageNumberPagination):
+    """
+    Page number pagination with links in Link header.
+
+    If cursor query parameter is present, keyset pagination is used instead.
+    Rows are ordered by requested ordering with id as a tiebreaker, or by (created, id)
+    or by id if model does not have created field, newest first, if ordering is not
+    specified. The next page is selected by the key of the last row,
+    so that walking over entire collection does not produce OFFSET scans.
+    Ordering by nullable or relation fields and by expressions is rejected,
+    because such rows could not be selected by key.
+    Empty cursor denotes the first page. Result count is not calculated in this mode.
+    """
+
     page_size_query_param = 'page_size'
     max_page_size = 300
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = _('Invalid cursor.')
+    invalid_cursor_ordering_message = _(
+        'Ordering by %s is not supported with cursor pagination.'
+    )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_mode = self.cursor_query_param in request.query_params and (
+            isinstance(queryset, QuerySet)
+        )
+        if not self.cursor_mode:
+            return super(LinkHeaderPagination, self).paginate_queryset(
+                queryset, request, view
+            )
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        self.request = request
+        self.cursor_ordering = self.get_cursor_ordering(queryset)
+        queryset = queryset.order_by(
+            *[
+                ('-' if descending else '') + field
+                for field, descending in self.cursor_ordering
+            ]
+        )
+
+        cursor = request.query_params[self.cursor_query_param]
+        if cursor:
+            try:
+                queryset = queryset.filter(
+                    self.get_cursor_query(self.decode_cursor(cursor))
+                )
+            except (ValidationError, ValueError, TypeError):
+                raise exceptions.NotFound(self.invalid_cursor_message)
+
+        results = list(queryset[: page_size + 1])
+        self.has_next = len(results) > page_size
+        self.page_results = results[:page_size]
+        return self.page_results
+
+    def get_cursor_fields(self, model):
+        try:
+            model._meta.get_field('created')
+        except FieldDoesNotExist:
+            return ['id']
+        return ['created', 'id']
+
+    def get_cursor_ordering(self, queryset):
+        """
+        Return list of (field, descending) pairs which define keyset of the queryset.
+        """
+        model = queryset.model
+        pk_name = model._meta.pk.name
+        ordering = []
+        for item in queryset.query.order_by:
+            if not isinstance(item, str) or item == '?':
+                raise exceptions.ValidationError(
+                    self.invalid_cursor_ordering_message % item
+                )
+            descending = item.startswith('-')
+            field = item.lstrip('-')
+            if field == 'pk':
+                field = pk_name
+            if field in [name for name, _ in ordering]:
+                continue
+            self.validate_cursor_field(model, field)
+            ordering.append((field, descending))
+
+        if not ordering:
+            return [(field, True) for field in self.get_cursor_fields(model)]
+        if pk_name not in [name for name, _ in ordering]:
+            ordering.append((pk_name, ordering[-1][1]))
+        return ordering
+
+    def validate_cursor_field(self, model, path):
+        opts = model._meta
+        field = None
+        for name in path.split(LOOKUP_SEP):
+            if field is not None and not field.is_relation:
+                field = None
+                break
+            try:
+                field = opts.get_field(name)
+            except FieldDoesNotExist:
+                field = None
+                break
+            if field.null or field.many_to_many or field.one_to_many:
+                field = None
+                break
+            if field.is_relation:
+                opts = field.related_model._meta
+        if field is None or field.is_relation:
+            raise exceptions.ValidationError(
+                self.invalid_cursor_ordering_message % path
+            )
+
+    def get_cursor_query(self, values):
+        if len(values) != len(self.cursor_ordering):
+            raise exceptions.NotFound(self.invalid_cursor_message)
+        # Select rows which go strictly after the cursor in requested order
+        fields = [field for field, _ in self.cursor_ordering]
+        query = Q()
+        for index, (field, descending) in enumerate(self.cursor_ordering):
+            lookup = dict(zip(fields[:index], values[:index]))
+            lookup['%s__%s' % (field, 'lt' if descending else 'gt')] = values[index]
+            query |= Q(**lookup)
+        return query
+
+    def encode_cursor(self, instance):
+        values = []
+        for field, _ in self.cursor_ordering:
+            value = instance
+            for name in field.split(LOOKUP_SEP):
+                value = getattr(value, name)
+            # Microseconds should be preserved in order to keep keyset exact
+            if hasattr(value, 'isoformat'):
+                value = value.isoformat()
+            values.append(value)
+        data = json.dumps(values, default=str).encode('utf-8')
+        return base64.urlsafe_b64encode(data).decode('ascii')
+
+    def decode_cursor(self, cursor):
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        except (binascii.Error, UnicodeError, ValueError):
+            raise exceptions.NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list):
+            raise exceptions.NotFound(self.invalid_cursor_message)
+        return values
 
     def get_paginated_response(self, data):
+        if self.cursor_mode:
+            return self.get_cursor_paginated_response(data)
+
         link_candidates = OrderedDict(
             (
                 ('first', self.get_first_link),
@@ -32,6 +195,18 @@ class LinkHeaderPagination(pagination.PageNumberPagination):
 
         return Response(data, headers=headers)
 
+    def get_cursor_paginated_response(self, data):
+        url = self.request.build_absolute_uri()
+        links = [('first', replace_query_param(url, self.cursor_query_param, ''))]
+        if self.has_next:
+            cursor = self.encode_cursor(self.page_results[-1])
+            links.append(
+                ('next', replace_query_param(url, self.cursor_query_param, cursor))
+            )
+
+        link = ', '.join('<%s>; rel="%s"' % (href, rel) for rel, href in links)
+        return Response(data, headers={'Link': link})
+
     def get_first_link(self):
         url = self.request.build_absolute_uri()
         return remove_query_param(url, self.page_query_param)
@@ -53,3 +228,162 @@ class UnlimitedLinkHeaderPagination(LinkHeaderPagination):
     """
 
     page_size = None
+
+
+def is_exact_count_requested(request):
+    value = request.query_params.get(EXACT_COUNT_QUERY_PARAM, '')
+    return value.lower() in ('1', 'true', 'yes')
+
+
+def get_count_cache_key(queryset):
+    # SQL query is used as a normalized representation of the filter set
+    sql, params = queryset.query.sql_with_params()
+    digest = hashlib.md5(  # noqa: S303
+        str((queryset.db, sql, params)).encode('utf-8')
+    ).hexdigest()
+    return 'waldur_core.core.pagination.count.%s' % digest
+
+
+def get_estimated_count(queryset):
+    """ Return number of rows estimated by PostgreSQL planner for the queryset. """
+    sql, params = queryset.query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def get_queryset_count(queryset, exact=False):
+    """
+    Return tuple of the queryset count and flag which is True if count is exact.
+
+    Exact count is computed if it is requested explicitly or if planner
+    estimate is below COUNT_ESTIMATE_THRESHOLD. Otherwise recently cached
+    count is returned, or planner estimate if there is no cached count.
+    Exact counts and estimates of large querysets are cached for COUNT_CACHE_TIMEOUT.
+    """
+    if not isinstance(queryset, QuerySet):
+        return len(queryset), True
+
+    if isinstance(queryset, EmptyQuerySet):
+        return 0, True
+
+    threshold = settings.WALDUR_CORE['COUNT_ESTIMATE_THRESHOLD']
+    timeout = settings.WALDUR_CORE['COUNT_CACHE_TIMEOUT'].total_seconds()
+    try:
+        cache_key = get_count_cache_key(queryset)
+    except EmptyResultSet:
+        # SQL is not compiled if filter is known to match nothing, such as empty IN clause
+        return 0, True
+
+    if not exact:
+        cached_count = cache.get(cache_key)
+        if cached_count is not None:
+            return cached_count, False
+
+        estimated_count = get_estimated_count(queryset)
+        if estimated_count >= threshold:
+            # Estimate is cached too in order to skip planner round trip
+            cache.set(cache_key, estimated_count, timeout)
+            return estimated_count, False
+
+    count = queryset.count()
+    if count >= threshold:
+        cache.set(cache_key, count, timeout)
+    return count, True
+
+
+class ApproximateCountPage(Page):
+    def __init__(self, object_list, number, paginator, has_next):
+        super(ApproximateCountPage, self).__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+    def end_index(self):
+        return self.start_index() + len(self) - 1 if len(self) else 0
+
+
+class ApproximateCountPaginator(Paginator):
+    """
+    Paginator which does not rely on count for page slicing, because count may
+    be an estimate which is lower or greater than the real number of rows.
+    One extra row is fetched in order to find out if the next page exists.
+    Count is used only for result count header and the last page link.
+    """
+
+    def __init__(self, *args, exact_count=False, **kwargs):
+        super(ApproximateCountPaginator, self).__init__(*args, **kwargs)
+        self.exact_count = exact_count
+        self.is_count_exact = True
+        self.min_count = 0
+        self.known_count = None
+
+    def validate_number(self, number):
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(_('That page number is not an integer'))
+        if number < 1:
+            raise EmptyPage(_('That page number is less than 1'))
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom : bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage(_('That page contains no results'))
+
+        has_next = len(rows) > self.per_page
+        if has_next:
+            self.min_count = bottom + len(rows)
+        else:
+            # Rows of the last page are fetched, so count is known exactly
+            self.known_count = bottom + len(rows)
+        return ApproximateCountPage(rows[: self.per_page], number, self, has_next)
+
+    @cached_property
+    def count(self):
+        if self.known_count is not None:
+            return self.known_count
+        count, self.is_count_exact = get_queryset_count(
+            self.object_list, self.exact_count
+        )
+        return max(count, self.min_count)
+
+
+class ApproximateCountLinkHeaderPagination(LinkHeaderPagination):
+    """
+    Paginator for large tables where exact COUNT is more expensive than page fetching.
+    X-Result-Count header contains planner estimate or cached count
+    if result is large, which is indicated by X-Result-Count-Exact header.
+    Exact count is calculated if exact_count query parameter is true.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.exact_count = is_exact_count_requested(request)
+        return super(ApproximateCountLinkHeaderPagination, self).paginate_queryset(
+            queryset, request, view
+        )
+
+    def django_paginator_class(self, queryset, page_size):
+        return ApproximateCountPaginator(
+            queryset, page_size, exact_count=self.exact_count
+        )
+
+    def get_paginated_response(self, data):
+        response = super(
+            ApproximateCountLinkHeaderPagination, self
+        ).get_paginated_response(data)
+        if self.cursor_mode:
+            return response
+        response['X-Result-Count-Exact'] = str(
+            self.page.paginator.is_count_exact
+        ).lower()
+        return response
@@ -7,6 +7,7 @@ from django.core.exceptions import (
     MultipleObjectsReturned,
     ObjectDoesNotExist,
 )
+from django.db.models import Manager
 from django.urls import Resolver404, reverse
 from django.utils.translation import ugettext_lazy as _
 from rest_framework import serializers
@@ -15,7 +16,7 @@ from rest_framework.fields import Field, ReadOnlyField
 
 from waldur_core.core import utils as core_utils
 from waldur_core.core.fields import TimestampField
-from waldur_core.core.signals import pre_serializer_fields
+from waldur_core.core.signals import pre_serializer_fields, pre_serializer_prefetch
 
 from . import fields
 
@@ -159,6 +160,18 @@ class GenericRelatedField(Field):
         return obj
 
 
+PREFETCHED_DATA_CONTEXT_KEY = 'prefetched_data'
+
+
+def set_prefetched_data(serializer, key, data):
+    serializer.context.setdefault(PREFETCHED_DATA_CONTEXT_KEY, {})[key] = data
+
+
+def get_prefetched_data(serializer, key):
+    """ Return data stored by pre_serializer_prefetch receiver or None. """
+    return serializer.context.get(PREFETCHED_DATA_CONTEXT_KEY, {}).get(key)
+
+
 class AugmentedSerializerMixin:
     """
     This mixin provides several extensions to stock Serializer class:
@@ -238,6 +251,25 @@ class AugmentedSerializerMixin:
 
     4. This mixin overrides "get_extra_kwargs" method and puts "view_name" to extra_kwargs
     or uses URL name specified in a model of serialized object.
+
+    5.  Allow injected fields to load their data for the whole list of objects at once.
+
+        When list of objects is serialized, pre_serializer_prefetch signal is sent
+        before the first object is serialized. Receiver stores loaded data
+        in the serializer context using set_prefetched_data and field
+        reads it using get_prefetched_data.
+
+        Example:
+
+        def prefetch_customer_stats(sender, instances, serializer, **kwargs):
+            stats = CustomerStats.objects.filter(customer__in=instances)
+            set_prefetched_data(serializer, 'customer_stats',
+                                {item.customer_id: item for item in stats})
+
+        pre_serializer_prefetch.connect(
+            handlers.prefetch_customer_stats,
+            sender=CustomerSerializer
+        )
     """
 
     def get_fields(self):
@@ -260,6 +292,27 @@ class AugmentedSerializerMixin:
 
         return fields
 
+    def to_representation(self, instance):
+        self._prefetch_list_data()
+        return super(AugmentedSerializerMixin, self).to_representation(instance)
+
+    def _prefetch_list_data(self):
+        parent = self.parent
+        if not isinstance(parent, serializers.ListSerializer):
+            return
+        if getattr(parent, '_is_prefetched', False):
+            return
+        parent._is_prefetched = True
+
+        if parent.instance is None or isinstance(parent.instance, Manager):
+            return
+        # Queryset result cache is reused by the list serializer afterwards
+        instances = list(parent.instance)
+        if instances:
+            pre_serializer_prefetch.send(
+                sender=self.__class__, instances=instances, serializer=self
+            )
+
     def _get_related_paths(self):
         try:
             related_paths = self.Meta.related_paths
@@ -3,6 +3,12 @@ import django.dispatch
 # TODO: Make all the serializers emit this signal
 pre_serializer_fields = django.dispatch.Signal(providing_args=['fields'])
 
+# This signal is sent before serialization of the list of objects
+# so that injected fields could load their data for all objects at once
+pre_serializer_prefetch = django.dispatch.Signal(
+    providing_args=['instances', 'serializer']
+)
+
 # This signal allows to implement deletion validation in dependent
 # application without introducing circular dependency
 pre_delete_validate = django.dispatch.Signal(providing_args=['instance', 'user'])
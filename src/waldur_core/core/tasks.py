@@ -1,14 +1,18 @@
+import hashlib
+import json
 import logging
 from uuid import uuid4
 
+from celery import shared_task
 from celery.task import Task as CeleryTask
 from celery.worker.request import Request
+from django.core.cache import cache
 from django.db import IntegrityError
 from django.db import models as django_models
 from django.db.models import ObjectDoesNotExist
 from django_fsm import TransitionNotAllowed
 
-from waldur_core.core import models, utils
+from waldur_core.core import models, token_activity, utils
 from waldur_core.core.exceptions import RuntimeStateException
 
 logger = logging.getLogger(__name__)
@@ -321,47 +325,50 @@ class BackgroundTask(CeleryTask):
            should log themselves explicitly and make sure that they will not
            spam error messages.
 
-        Implement "is_equal" method to define what tasks are equal and should
-        be executed simultaneously.
+        Uncompleted tasks are tracked using short-lived lock in cache,
+        which is acquired when task is scheduled and released when it is completed.
+        Lock expires after "lock_timeout" seconds if worker has crashed.
+        Override "get_lock_key" method to define what tasks are equal and should
+        not be executed simultaneously.
     """
 
     is_background = True
+    lock_timeout = 60 * 60
 
-    def is_equal(self, other_task, *args, **kwargs):
-        """ Return True if task do the same operation as other_task.
+    def get_lock_key(self, *args, **kwargs):
+        """ Return cache key which is equal for tasks that do the same operation.
 
-            Note! Other task is represented as serialized celery task - dictionary.
+            By default tasks are equal if they have the same name and input parameters.
         """
-        raise NotImplementedError(
-            'BackgroundTask should implement "is_equal" method to avoid queue overload.'
-        )
-
-    def is_previous_task_processing(self, *args, **kwargs):
-        """ Return True if exist task that is equal to current and is uncompleted """
-        app = self._get_app()
-        inspect = app.control.inspect()
-        active = inspect.active() or {}
-        scheduled = inspect.scheduled() or {}
-        reserved = inspect.reserved() or {}
-        uncompleted = sum(
-            list(active.values()) + list(scheduled.values()) + list(reserved.values()),
-            [],
-        )
-        return any(self.is_equal(task, *args, **kwargs) for task in uncompleted)
+        identity = json.dumps([args, kwargs], sort_keys=True, default=str)
+        digest = hashlib.md5(identity.encode('utf-8')).hexdigest()  # noqa: S303
+        return 'background_task:%s:%s' % (self.name, digest)
 
     def apply_async(self, args=None, kwargs=None, **options):
         """ Do not run background task if previous task is uncompleted """
-        if self.is_previous_task_processing(*args, **kwargs):
+        task_id = options.setdefault('task_id', str(uuid4()))
+        lock_key = self.get_lock_key(*(args or ()), **(kwargs or {}))
+        if not cache.add(lock_key, task_id, self.lock_timeout):
             message = (
                 'Background task %s was not scheduled, because its predecessor is not completed yet.'
                 % self.name
             )
             logger.info(message)
             # It is expected by Celery that apply_async return AsyncResult, otherwise celerybeat dies
-            return self.AsyncResult(options.get('task_id') or str(uuid4()))
-        return super(BackgroundTask, self).apply_async(
-            args=args, kwargs=kwargs, **options
-        )
+            return self.AsyncResult(task_id)
+        try:
+            return super(BackgroundTask, self).apply_async(
+                args=args, kwargs=kwargs, **options
+            )
+        except Exception:
+            cache.delete(lock_key)
+            raise
+
+    def after_return(self, status, retval, task_id, args, kwargs, einfo):
+        """ Release lock when task is completed regardless of its result """
+        lock_key = self.get_lock_key(*(args or ()), **(kwargs or {}))
+        if cache.get(lock_key) == task_id:
+            cache.delete(lock_key)
 
 
 def log_celery_task(request):
@@ -476,3 +483,8 @@ class ExtensionTaskMixin(CeleryTask):
         return super(ExtensionTaskMixin, self).apply_async(
             args=args, kwargs=kwargs, **options
         )
+
+
+@shared_task(name='waldur_core.core.flush_token_activity')
+def flush_token_activity():
+    token_activity.flush_cached_activity()
@@ -7,6 +7,8 @@ from freezegun import freeze_time
 from rest_framework import status, test
 from rest_framework.authtoken.models import Token
 
+from waldur_core.core import tasks, token_activity
+
 from . import helpers
 
 
@@ -56,7 +58,10 @@ class TokenAuthenticationTest(test.APITransactionTestCase):
             self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
             self.assertEqual(response.data['detail'], 'Token has expired.')
 
-    def test_token_creation_time_is_updated_on_every_request(self):
+    @helpers.override_waldur_core_settings(
+        TOKEN_ACTIVITY_INTERVAL=timezone.timedelta(0)
+    )
+    def test_token_creation_time_is_updated_on_every_request_if_interval_is_zero(self,):
         response = self.client.post(
             self.auth_url, data={'username': self.username, 'password': self.password}
         )
@@ -69,6 +74,100 @@ class TokenAuthenticationTest(test.APITransactionTestCase):
         created2 = Token.objects.values_list('created', flat=True).get(key=token)
         self.assertTrue(created1 < created2)
 
+    def test_token_creation_time_is_not_updated_within_activity_interval(self):
+        response = self.client.post(
+            self.auth_url, data={'username': self.username, 'password': self.password}
+        )
+        token = response.data['token']
+        created1 = Token.objects.values_list('created', flat=True).get(key=token)
+
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token)
+        self.client.get(self.test_url)
+        self.client.get(self.test_url)
+        created2 = Token.objects.values_list('created', flat=True).get(key=token)
+        self.assertEqual(created1, created2)
+
+    def test_token_expiration_is_prolonged_by_not_flushed_activity(self):
+        user = get_user_model().objects.get(username=self.username)
+        response = self.client.post(
+            self.auth_url, data={'username': self.username, 'password': self.password}
+        )
+        token = response.data['token']
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token)
+
+        with freeze_time(timezone.now() + timezone.timedelta(seconds=30)):
+            response = self.client.get(self.test_url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        mocked_now = timezone.now() + timezone.timedelta(
+            seconds=user.token_lifetime + 10
+        )
+        with freeze_time(mocked_now):
+            response = self.client.get(self.test_url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_token_is_not_recreated_on_login_if_activity_is_not_flushed(self):
+        user = get_user_model().objects.get(username=self.username)
+        response = self.client.post(
+            self.auth_url, data={'username': self.username, 'password': self.password}
+        )
+        token = response.data['token']
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token)
+
+        with freeze_time(timezone.now() + timezone.timedelta(seconds=30)):
+            response = self.client.get(self.test_url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        mocked_now = timezone.now() + timezone.timedelta(
+            seconds=user.token_lifetime + 10
+        )
+        with freeze_time(mocked_now):
+            self.client.credentials()
+            response = self.client.post(
+                self.auth_url,
+                data={'username': self.username, 'password': self.password},
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data['token'], token)
+
+    def test_cached_activity_is_flushed_by_periodic_task(self):
+        response = self.client.post(
+            self.auth_url, data={'username': self.username, 'password': self.password}
+        )
+        token = Token.objects.get(key=response.data['token'])
+        last_activity = token.created + timezone.timedelta(minutes=5)
+        cache.set(token_activity.get_activity_key(token.key), last_activity)
+        token_activity.add_pending_key(token.key)
+
+        tasks.flush_token_activity()
+
+        token.refresh_from_db()
+        self.assertEqual(token.created, last_activity)
+
+    def test_periodic_task_does_not_check_tokens_without_pending_activity(self):
+        response = self.client.post(
+            self.auth_url, data={'username': self.username, 'password': self.password}
+        )
+        token = Token.objects.get(key=response.data['token'])
+        last_activity = token.created + timezone.timedelta(minutes=5)
+        cache.set(token_activity.get_activity_key(token.key), last_activity)
+
+        with self.assertNumQueries(0):
+            tasks.flush_token_activity()
+
+        token.refresh_from_db()
+        self.assertNotEqual(token.created, last_activity)
+
+    def test_password_hash_is_not_cached(self):
+        response = self.client.post(
+            self.auth_url, data={'username': self.username, 'password': self.password}
+        )
+        token = response.data['token']
+        token_activity.get_cached_token(token)
+
+        cached_token = cache.get(token_activity.get_token_key(token))
+        self.assertIn('password', cached_token.user.get_deferred_fields())
+
     def test_account_is_blocked_after_five_failed_attempts(self):
         for _ in range(5):
             response = self.client.post(
@@ -0,0 +1,34 @@
+from django.test import TestCase
+
+from waldur_core.core.managers import SummaryQuerySet
+from waldur_core.logging import models as logging_models
+from waldur_core.logging.tests import factories as logging_factories
+from waldur_core.structure.tests import factories as structure_factories
+
+
+class SummaryQuerySetTest(TestCase):
+    def setUp(self):
+        user = structure_factories.UserFactory()
+        hooks = []
+        for _ in range(3):
+            hooks.append(logging_factories.WebHookFactory(user=user))
+            hooks.append(logging_factories.PushHookFactory(user=user))
+        hooks.append(logging_factories.PushHookFactory(user=user))
+        self.hooks = sorted(hooks, key=lambda hook: hook.created, reverse=True)
+
+    def get_queryset(self):
+        return SummaryQuerySet([logging_models.WebHook, logging_models.PushHook])
+
+    def test_count(self):
+        self.assertEqual(self.get_queryset().count(), 7)
+
+    def test_ordered_slice(self):
+        queryset = self.get_queryset().order_by('-created')
+        self.assertEqual(queryset[2:5], self.hooks[2:5])
+        self.assertEqual(queryset[6], self.hooks[6])
+
+    def test_unordered_slice(self):
+        queryset = self.get_queryset()
+        hooks = list(queryset[0:7])
+        self.assertEqual(queryset[2:5], hooks[2:5])
+        self.assertEqual(queryset[5:10], hooks[5:])
@@ -0,0 +1,152 @@
+import re
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from waldur_core.core.pagination import (
+    ApproximateCountLinkHeaderPagination,
+    LinkHeaderPagination,
+    get_queryset_count,
+)
+from waldur_core.core.tests.helpers import override_waldur_core_settings
+from waldur_core.structure.models import Customer
+from waldur_core.structure.tests import factories as structure_factories
+
+
+class QuerysetCountTest(TestCase):
+    def setUp(self):
+        structure_factories.CustomerFactory.create_batch(3)
+        self.queryset = Customer.objects.all()
+        cache.clear()
+
+    def test_small_queryset_count_is_exact(self):
+        self.assertEqual(get_queryset_count(self.queryset), (3, True))
+
+    @override_waldur_core_settings(COUNT_ESTIMATE_THRESHOLD=0)
+    def test_large_queryset_count_is_estimated(self):
+        count, exact = get_queryset_count(self.queryset)
+        self.assertFalse(exact)
+
+    @override_waldur_core_settings(COUNT_ESTIMATE_THRESHOLD=0)
+    def test_exact_count_is_cached(self):
+        self.assertEqual(get_queryset_count(self.queryset, exact=True), (3, True))
+        structure_factories.CustomerFactory()
+
+        self.assertEqual(get_queryset_count(self.queryset), (3, False))
+        self.assertEqual(get_queryset_count(self.queryset, exact=True), (4, True))
+
+    @override_waldur_core_settings(COUNT_ESTIMATE_THRESHOLD=0)
+    @mock.patch('waldur_core.core.pagination.get_estimated_count', return_value=3)
+    def test_estimate_is_cached(self, get_estimated_count):
+        self.assertEqual(get_queryset_count(self.queryset), (3, False))
+        self.assertEqual(get_queryset_count(self.queryset), (3, False))
+        self.assertEqual(get_estimated_count.call_count, 1)
+
+    def test_list_count_is_exact(self):
+        self.assertEqual(get_queryset_count([1, 2]), (2, True))
+
+    @override_waldur_core_settings(COUNT_ESTIMATE_THRESHOLD=0)
+    def test_empty_queryset_count_is_exact(self):
+        self.assertEqual(get_queryset_count(self.queryset.none()), (0, True))
+
+    @override_waldur_core_settings(COUNT_ESTIMATE_THRESHOLD=0)
+    def test_count_of_queryset_with_empty_filter_is_exact(self):
+        queryset = self.queryset.filter(id__in=[])
+        self.assertEqual(get_queryset_count(queryset), (0, True))
+
+
+class CursorPaginationTest(TestCase):
+    def setUp(self):
+        self.customers = structure_factories.CustomerFactory.create_batch(5)
+        self.queryset = Customer.objects.all()
+
+    def paginate(self, url):
+        request = Request(APIRequestFactory().get(url))
+        paginator = LinkHeaderPagination()
+        results = paginator.paginate_queryset(self.queryset, request)
+        response = paginator.get_paginated_response([])
+        links = dict(
+            (rel, link)
+            for link, rel in re.findall(r'<([^>]+)>; rel="(\w+)"', response['Link'])
+        )
+        return results, links
+
+    def test_collection_is_walked_with_cursor(self):
+        url = '/customers/?page_size=2&cursor='
+        pages = []
+        while url:
+            results, links = self.paginate(url)
+            pages.append(results)
+            url = links.get('next')
+
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        self.assertEqual(
+            [customer.id for page in pages for customer in page],
+            [customer.id for customer in reversed(self.customers)],
+        )
+
+    def test_invalid_cursor_is_rejected(self):
+        with self.assertRaises(exceptions.NotFound):
+            self.paginate('/customers/?cursor=invalid')
+
+    def test_requested_ordering_is_kept(self):
+        for index, customer in enumerate(self.customers):
+            customer.name = 'Customer %s' % (index % 2)
+            customer.save()
+        self.queryset = Customer.objects.order_by('name')
+
+        url = '/customers/?page_size=2&cursor='
+        walked = []
+        while url:
+            results, links = self.paginate(url)
+            walked.extend(results)
+            url = links.get('next')
+
+        expected = sorted(self.customers, key=lambda c: (c.name, c.id))
+        self.assertEqual(
+            [customer.id for customer in walked],
+            [customer.id for customer in expected],
+        )
+
+    def test_ordering_by_nullable_field_is_rejected(self):
+        self.queryset = Customer.objects.order_by('agreement_number')
+        with self.assertRaises(exceptions.ValidationError):
+            self.paginate('/customers/?cursor=')
+
+
+@override_waldur_core_settings(COUNT_ESTIMATE_THRESHOLD=0)
+@mock.patch('waldur_core.core.pagination.get_estimated_count', return_value=1)
+class ApproximateCountPaginationTest(TestCase):
+    def setUp(self):
+        self.customers = structure_factories.CustomerFactory.create_batch(5)
+        self.queryset = Customer.objects.order_by('id')
+        cache.clear()
+
+    def paginate(self, url):
+        request = Request(APIRequestFactory().get(url))
+        paginator = ApproximateCountLinkHeaderPagination()
+        results = paginator.paginate_queryset(self.queryset, request)
+        response = paginator.get_paginated_response([])
+        return results, response
+
+    def test_page_beyond_estimate_is_returned(self, get_estimated_count):
+        results, response = self.paginate('/customers/?page_size=2&page=2')
+        self.assertEqual(results, self.customers[2:4])
+        self.assertIn('rel="next"', response['Link'])
+        self.assertEqual(response['X-Result-Count'], '5')
+        self.assertEqual(response['X-Result-Count-Exact'], 'false')
+
+    def test_last_page_is_not_cut_off_by_estimate(self, get_estimated_count):
+        results, response = self.paginate('/customers/?page_size=2&page=3')
+        self.assertEqual(results, self.customers[4:])
+        self.assertNotIn('rel="next"', response['Link'])
+        self.assertEqual(response['X-Result-Count'], '5')
+        self.assertEqual(response['X-Result-Count-Exact'], 'true')
+
+    def test_page_beyond_last_row_is_not_found(self, get_estimated_count):
+        with self.assertRaises(exceptions.NotFound):
+            self.paginate('/customers/?page_size=2&page=4')
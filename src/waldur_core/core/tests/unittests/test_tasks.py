@@ -0,0 +1,49 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from waldur_core.core import tasks
+
+
+class DummyBackgroundTask(tasks.BackgroundTask):
+    name = 'waldur_core.core.tests.DummyBackgroundTask'
+
+    def run(self, *args):
+        pass
+
+
+@mock.patch('celery.app.task.Task.apply_async')
+class BackgroundTaskTest(TestCase):
+    def setUp(self):
+        self.task = DummyBackgroundTask()
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_task_is_not_scheduled_if_previous_task_is_not_completed(self, apply_async):
+        self.task.apply_async(args=('instance:1',))
+        self.task.apply_async(args=('instance:1',))
+        self.assertEqual(apply_async.call_count, 1)
+
+    def test_tasks_with_different_arguments_are_scheduled(self, apply_async):
+        self.task.apply_async(args=('instance:1',))
+        self.task.apply_async(args=('instance:2',))
+        self.assertEqual(apply_async.call_count, 2)
+
+    def test_task_is_scheduled_again_after_previous_task_is_completed(
+        self, apply_async
+    ):
+        self.task.apply_async(args=('instance:1',))
+        task_id = apply_async.call_args[1]['task_id']
+        self.task.after_return('SUCCESS', None, task_id, ('instance:1',), {}, None)
+        self.task.apply_async(args=('instance:1',))
+        self.assertEqual(apply_async.call_count, 2)
+
+    def test_lock_is_released_if_task_can_not_be_scheduled(self, apply_async):
+        apply_async.side_effect = OSError
+        with self.assertRaises(OSError):
+            self.task.apply_async(args=('instance:1',))
+        apply_async.side_effect = None
+        self.task.apply_async(args=('instance:1',))
+        self.assertEqual(apply_async.call_count, 2)
@@ -0,0 +1,204 @@
+"""
+Write-coalesced tracking of authentication token activity.
+
+Token creation time is used as a time of the last activity for sliding token expiration.
+Instead of saving token on every authenticated request, time of the last activity
+is stored in cache and written to database by each process at most once per
+WALDUR_CORE['TOKEN_ACTIVITY_INTERVAL'] using single query for all pending tokens.
+Pending activity is also flushed on process exit and by periodic task, which
+writes activity stored in cache, so that it is not lost if process is idle.
+Keys of tokens with pending activity are tracked in cache, so that periodic task
+does not need to check all tokens.
+Authenticated token together with its user is cached for the same interval too,
+so that authentication does not hit database on hot path.
+Password hash of the user is deferred and is never stored in cache.
+"""
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, DateTimeField, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+logger = logging.getLogger(__name__)
+
+PENDING_KEYS_CACHE_KEY = 'token_activity_pending_keys'
+PENDING_KEYS_LOCK_KEY = 'token_activity_pending_keys_lock'
+PENDING_KEYS_LOCK_TIMEOUT = 10
+
+_lock = threading.Lock()
+_pending = {}
+_last_flush = time.monotonic()
+
+
+def get_interval():
+    return settings.WALDUR_CORE['TOKEN_ACTIVITY_INTERVAL'].total_seconds()
+
+
+def get_activity_key(key):
+    return 'token_activity:%s' % key
+
+
+def get_token_key(key):
+    return 'token:%s' % key
+
+
+def get_cached_token(key):
+    """
+    Return token with selected user from cache or database.
+    """
+    token = cache.get(get_token_key(key))
+    if token is None:
+        token = (
+            Token.objects.select_related('user').defer('user__password').get(key=key)
+        )
+        interval = get_interval()
+        if interval:
+            cache.set(get_token_key(key), token, interval)
+    return token
+
+
+def invalidate_cached_token(key):
+    cache.delete(get_token_key(key))
+
+
+def get_last_activity(token):
+    """
+    Return time of the last activity of the token, which may be not flushed yet.
+    """
+    last_activity = cache.get(get_activity_key(token.key))
+    if last_activity and last_activity > token.created:
+        return last_activity
+    return token.created
+
+
+def record_activity(token, now=None):
+    """
+    Store time of the last activity of the token in cache and
+    schedule its update in database if stored value is older than interval.
+    """
+    global _last_flush
+
+    now = now or timezone.now()
+    interval = get_interval()
+    lifetime = token.user.token_lifetime
+    if lifetime:
+        cache.set(get_activity_key(token.key), now, lifetime)
+
+    if (now - token.created).total_seconds() < interval:
+        return
+
+    with _lock:
+        is_new = token.key not in _pending
+        _pending[token.key] = now
+        should_flush = time.monotonic() - _last_flush >= interval
+        if should_flush:
+            _last_flush = time.monotonic()
+
+    if should_flush:
+        flush_activity()
+    elif is_new and lifetime:
+        add_pending_key(token.key)
+
+
+def add_pending_key(key):
+    """
+    Register token as having pending activity in cache, so that it is flushed
+    by periodic task even if process is idle. If cache is locked by another
+    process, token is skipped, because pending activity is still flushed
+    by the current process later.
+    """
+    if not cache.add(PENDING_KEYS_LOCK_KEY, True, PENDING_KEYS_LOCK_TIMEOUT):
+        return
+    try:
+        keys = cache.get(PENDING_KEYS_CACHE_KEY) or set()
+        keys.add(key)
+        cache.set(PENDING_KEYS_CACHE_KEY, keys, None)
+    finally:
+        cache.delete(PENDING_KEYS_LOCK_KEY)
+
+
+def pop_pending_keys():
+    if not cache.add(PENDING_KEYS_LOCK_KEY, True, PENDING_KEYS_LOCK_TIMEOUT):
+        return set()
+    try:
+        keys = cache.get(PENDING_KEYS_CACHE_KEY) or set()
+        cache.delete(PENDING_KEYS_CACHE_KEY)
+        return keys
+    finally:
+        cache.delete(PENDING_KEYS_LOCK_KEY)
+
+
+def flush_activity():
+    """
+    Write all pending activity of the current process to database using single query.
+    Activity time is never moved backwards, even if token has been refreshed concurrently.
+    """
+    global _pending
+
+    with _lock:
+        pending, _pending = _pending, {}
+
+    update_activity(pending)
+
+
+def flush_cached_activity():
+    """
+    Write activity stored in cache by all processes to database.
+    Only tokens registered as having pending activity are checked and
+    only activity which is older than interval since the last write is flushed.
+    """
+    pending_keys = pop_pending_keys()
+    if not pending_keys:
+        return
+
+    interval = get_interval()
+    tokens = dict(
+        Token.objects.filter(key__in=pending_keys).values_list('key', 'created')
+    )
+    if not tokens:
+        return
+
+    keys = {get_activity_key(key): key for key in tokens}
+    pending = {}
+    for cache_key, last_activity in cache.get_many(keys).items():
+        key = keys[cache_key]
+        if (last_activity - tokens[key]).total_seconds() >= interval:
+            pending[key] = last_activity
+
+    update_activity(pending)
+
+
+def update_activity(pending):
+    """
+    Write time of the last activity of the tokens to database using single query.
+    """
+    if not pending:
+        return
+
+    last_activity = Case(
+        *[
+            When(key=key, then=Value(value, output_field=DateTimeField()))
+            for key, value in pending.items()
+        ],
+        output_field=DateTimeField(),
+    )
+    count = Token.objects.filter(key__in=list(pending)).update(
+        created=Greatest('created', last_activity)
+    )
+    for key in pending:
+        invalidate_cached_token(key)
+    logger.debug('Activity of %s tokens has been flushed to database.', count)
+
+
+@atexit.register
+def flush_activity_on_exit():
+    try:
+        flush_activity()
+    except Exception:
+        logger.warning('Unable to flush token activity on exit.', exc_info=True)
@@ -4,6 +4,7 @@ import functools
 import importlib
 import os
 import re
+import statistics
 import time
 import unicodedata
 import uuid
@@ -438,3 +439,16 @@ def get_lat_lon_from_address(address):
 
     if location:
         return location.latitude, location.longitude
+
+
+def measure_latency(func, repeat):
+    """
+    Call func given number of times and return median latency in milliseconds.
+    It is used by benchmark management commands.
+    """
+    timings = []
+    for _ in range(max(repeat, 1)):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
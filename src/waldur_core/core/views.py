@@ -24,7 +24,7 @@ from rest_framework.views import APIView
 from rest_framework.views import exception_handler as rf_exception_handler
 
 from waldur_core import __version__
-from waldur_core.core import WaldurExtension, permissions
+from waldur_core.core import WaldurExtension, permissions, token_activity
 from waldur_core.core.exceptions import ExtensionDisabled, IncorrectStateException
 from waldur_core.core.mixins import ensure_atomic_transaction
 from waldur_core.core.serializers import AuthTokenSerializer
@@ -65,7 +65,7 @@ class RefreshTokenMixin:
         if user.token_lifetime:
             lifetime = timezone.timedelta(seconds=user.token_lifetime)
 
-            if token.created < timezone.now() - lifetime:
+            if token_activity.get_last_activity(token) < timezone.now() - lifetime:
                 token.delete()
                 token = Token.objects.create(user=user)
                 created = True
@@ -7,6 +7,7 @@ class EventsConfig(AppConfig):
     verbose_name = 'Logging'
 
     def ready(self):
+        from waldur_core.core import models as core_models
         from waldur_core.logging import handlers, models
 
         signals.post_save.connect(
@@ -14,3 +15,23 @@ class EventsConfig(AppConfig):
             sender=models.Event,
             dispatch_uid='waldur_core.logging.handlers.process_hook',
         )
+
+        for model in models.BaseHook.get_all_models() + [models.SystemNotification]:
+            signals.post_save.connect(
+                handlers.invalidate_hooks_index,
+                sender=model,
+                dispatch_uid='waldur_core.logging.handlers.invalidate_hooks_index_%s'
+                % model.__name__,
+            )
+            signals.post_delete.connect(
+                handlers.invalidate_hooks_index,
+                sender=model,
+                dispatch_uid='waldur_core.logging.handlers.invalidate_hooks_index_on_delete_%s'
+                % model.__name__,
+            )
+
+        signals.post_save.connect(
+            handlers.invalidate_hooks_index_on_user_update,
+            sender=core_models.User,
+            dispatch_uid='waldur_core.logging.handlers.invalidate_hooks_index_on_user_update',
+        )
@@ -1,7 +1,18 @@
 from django.db import transaction
 
-from waldur_core.logging import tasks
+from waldur_core.logging import tasks, utils
 
 
 def process_hook(sender, instance, created=False, **kwargs):
     transaction.on_commit(lambda: tasks.process_event.delay(instance.pk))
+
+
+def invalidate_hooks_index(sender, instance, **kwargs):
+    transaction.on_commit(utils.invalidate_hooks_index)
+
+
+def invalidate_hooks_index_on_user_update(sender, instance, created=False, **kwargs):
+    if created:
+        return
+    if any(instance.tracker.has_changed(field) for field in utils.HOOK_USER_FIELDS):
+        transaction.on_commit(utils.invalidate_hooks_index)
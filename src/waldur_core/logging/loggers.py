@@ -4,12 +4,15 @@ import datetime
 import decimal
 import importlib
 import logging
+import threading
 import types
 import uuid
 from collections import defaultdict
+from contextlib import contextmanager
 
 from django.apps import apps
 from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
 
 from waldur_core.logging import models
 from waldur_core.logging.log import EventLoggerAdapter
@@ -17,6 +20,8 @@ from waldur_core.logging.middleware import get_event_context
 
 logger = logging.getLogger(__name__)
 
+_locals = threading.local()
+
 
 class LoggerError(AttributeError):
     pass
@@ -226,13 +231,92 @@ class EventLogger(BaseLogger):
         log = getattr(self.logger, level)
         log(msg, extra={'event_type': event_type, 'event_context': context})
 
-        event = models.Event.objects.create(
-            event_type=event_type, message=msg, context=context,
-        )
+        event = models.Event(event_type=event_type, message=msg, context=context)
+        scopes = []
         if event_context:
-            for scope in self.get_scopes(event_context) or []:
-                if scope and scope.id:
-                    models.Feed.objects.create(scope=scope, event=event)
+            scopes = [
+                scope
+                for scope in self.get_scopes(event_context) or []
+                if scope and scope.id
+            ]
+
+        events_buffer = get_events_buffer()
+        if events_buffer is not None:
+            events_buffer.add(event, scopes)
+            return
+
+        event.save()
+        for scope in scopes:
+            models.Feed.objects.create(scope=scope, event=event)
+
+
+class EventsBuffer:
+    """
+    Collects events and their feeds in order to store them with bulk queries.
+
+    Bulk creation does not emit post_save signal, therefore hooks are processed
+    by a single task for all flushed events.
+    """
+
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+        self.events = []
+        self.scopes = []
+
+    def add(self, event, scopes):
+        self.events.append(event)
+        self.scopes.append(scopes)
+        if len(self.events) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        from waldur_core.logging import tasks
+
+        if not self.events:
+            return
+
+        events = models.Event.objects.bulk_create(self.events)
+        feeds = [
+            models.Feed(scope=scope, event=event)
+            for event, scopes in zip(events, self.scopes)
+            for scope in scopes
+        ]
+        models.Feed.objects.bulk_create(feeds)
+
+        event_ids = [event.id for event in events]
+        transaction.on_commit(lambda: tasks.process_events.delay(event_ids))
+
+        self.events = []
+        self.scopes = []
+
+
+def get_events_buffer():
+    return getattr(_locals, 'events_buffer', None)
+
+
+@contextmanager
+def buffered_events(batch_size=1000):
+    """
+    Store events emitted within the block with bulk queries.
+
+    Events are flushed when the buffer is full and when the block is exited,
+    even if exception is raised, because changes made by non-atomic code
+    are kept. If the block runs inside a transaction which is rolled back,
+    flushed events are rolled back as well.
+    Event logger API is not changed, so that existing code does not need to be updated.
+    """
+    if get_events_buffer() is not None:
+        # Nested block is flushed by the outer one.
+        yield
+        return
+
+    events_buffer = EventsBuffer(batch_size)
+    _locals.events_buffer = events_buffer
+    try:
+        yield
+    finally:
+        del _locals.events_buffer
+        events_buffer.flush()
 
 
 class LoggableMixin:
@@ -0,0 +1,127 @@
+import datetime
+import random
+import uuid
+
+from dateutil.relativedelta import relativedelta
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from waldur_core.core.utils import measure_latency
+from waldur_core.logging import loggers
+from waldur_core.logging.models import Event, Feed
+from waldur_core.structure.models import Customer
+
+
+class Command(BaseCommand):
+    help = """Generate synthetic events and measure latency of typical event list queries.
+    Generated events are deleted afterwards unless --keep option is specified.
+    Do not run it against production database."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--count',
+            type=int,
+            default=1000000,
+            help='Number of events to generate. Default is 1000000.',
+        )
+        parser.add_argument(
+            '--months',
+            type=int,
+            default=12,
+            help='Number of months the events are spread over. Default is 12.',
+        )
+        parser.add_argument(
+            '--scopes',
+            type=int,
+            default=1000,
+            help='Number of distinct scopes referenced by feeds. Default is 1000.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=10000, help='Bulk insert batch size.',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Number of times each query is executed.',
+        )
+        parser.add_argument(
+            '--keep', action='store_true', help='Do not delete generated events.',
+        )
+
+    def handle(self, count, months, scopes, batch_size, repeat, keep, *args, **options):
+        if count <= 0:
+            self.stdout.write('Number of events should be positive.')
+            return
+
+        content_type = ContentType.objects.get_for_model(Customer)
+        event_types = loggers.get_valid_events()
+        now = timezone.now()
+        period = (now - (now - relativedelta(months=months))).total_seconds()
+
+        # Generated values are used only for benchmarking, seed makes runs comparable
+        rand = random.Random(0)  # noqa: S311
+
+        self.stdout.write('Generating %s events...' % count)
+        event_ids = []
+        generated = 0
+        while generated < count:
+            size = min(batch_size, count - generated)
+            events = [
+                Event(
+                    uuid=uuid.uuid4(),
+                    created=now - datetime.timedelta(seconds=rand.random() * period),
+                    event_type=rand.choice(event_types),
+                    message='Benchmark event %s' % (generated + i),
+                    context={},
+                )
+                for i in range(size)
+            ]
+            with transaction.atomic():
+                events = Event.objects.bulk_create(events)
+                Feed.objects.bulk_create(
+                    Feed(
+                        event=event,
+                        content_type=content_type,
+                        object_id=rand.randint(1, scopes),
+                    )
+                    for event in events
+                )
+            event_ids.extend(event.id for event in events)
+            generated += size
+        self.stdout.write('...done')
+
+        since = now - relativedelta(months=1)
+        event_type = rand.choice(event_types)
+        scope_events = Feed.objects.filter(
+            content_type=content_type, object_id=rand.randint(1, scopes)
+        ).values_list('event_id', flat=True)
+        querysets = [
+            ('all', Event.objects.all()),
+            ('event type', Event.objects.filter(event_type=event_type)),
+            ('created range', Event.objects.filter(created__gte=since)),
+            ('message', Event.objects.filter(message__icontains='event 1')),
+            ('scope', Event.objects.filter(id__in=scope_events)),
+        ]
+
+        self.stdout.write('Query latency in milliseconds (median of %s runs):' % repeat)
+        for name, queryset in querysets:
+            list_latency = measure_latency(lambda: list(queryset.all()[:10]), repeat)
+            count_latency = measure_latency(lambda: queryset.all().count(), repeat)
+            self.stdout.write(
+                '  %-15s list: %10.2f  count: %10.2f'
+                % (name, list_latency, count_latency)
+            )
+
+        if not keep:
+            self.stdout.write('Deleting generated events...')
+            # Only generated events are deleted, because events
+            # emitted concurrently may have ids within the same range.
+            for start in range(0, len(event_ids), batch_size):
+                batch = event_ids[start : start + batch_size]
+                with transaction.atomic():
+                    Feed.objects.filter(event_id__in=batch).delete()
+                    Event.objects.filter(id__in=batch).delete()
+            self.stdout.write('...done')
@@ -0,0 +1,106 @@
+import gzip
+import json
+import os
+
+from dateutil.relativedelta import relativedelta
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from waldur_core.core.utils import DryRunCommand, month_start
+from waldur_core.logging.models import Event, Feed
+
+
+class Command(DryRunCommand):
+    help = """Delete events older than given number of months.
+    Events are processed month by month starting from the oldest one.
+    Optionally each month is archived to gzipped JSON lines file before deletion."""
+
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument(
+            '--months',
+            type=int,
+            default=12,
+            help='Number of recent months which should be kept. Default is 12.',
+        )
+        parser.add_argument(
+            '--archive-dir',
+            help='Directory where events are archived before deletion.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10000,
+            help='Number of events deleted in one transaction.',
+        )
+
+    def handle(self, dry_run, months, archive_dir, batch_size, *args, **options):
+        cutoff = month_start(timezone.now()) - relativedelta(months=max(months, 0))
+        oldest_event = Event.objects.order_by('created').first()
+        if not oldest_event or oldest_event.created >= cutoff:
+            self.stdout.write('There are no events older than %s.' % cutoff.date())
+            return
+
+        if archive_dir and not dry_run:
+            os.makedirs(archive_dir, exist_ok=True)
+
+        start = month_start(oldest_event.created)
+        while start < cutoff:
+            end = start + relativedelta(months=1)
+            events = Event.objects.filter(created__gte=start, created__lt=end)
+            label = start.strftime('%Y-%m')
+
+            if dry_run:
+                count = events.count()
+                if count:
+                    self.stdout.write(
+                        '%s: %s events would be deleted.' % (label, count)
+                    )
+            else:
+                if archive_dir:
+                    path = os.path.join(archive_dir, 'events-%s.json.gz' % label)
+                    self.archive_events(events, path, batch_size)
+                count = self.delete_events(events, batch_size)
+                if count:
+                    self.stdout.write(
+                        '%s: %s events have been deleted.' % (label, count)
+                    )
+            start = end
+
+    def archive_events(self, events, path, batch_size):
+        with gzip.open(path, 'wt') as archive:
+            last_id = 0
+            while True:
+                batch = list(events.filter(id__gt=last_id).order_by('id')[:batch_size])
+                if not batch:
+                    return
+                last_id = batch[-1].id
+
+                feeds = {}
+                for event_id, content_type_id, object_id in Feed.objects.filter(
+                    event_id__in=[event.id for event in batch]
+                ).values_list('event_id', 'content_type_id', 'object_id'):
+                    feeds.setdefault(event_id, []).append([content_type_id, object_id])
+
+                for event in batch:
+                    record = dict(
+                        uuid=event.uuid.hex,
+                        created=event.created,
+                        event_type=event.event_type,
+                        message=event.message,
+                        context=event.context,
+                        feeds=feeds.get(event.id, []),
+                    )
+                    archive.write(json.dumps(record, cls=DjangoJSONEncoder) + '\n')
+
+    def delete_events(self, events, batch_size):
+        deleted = 0
+        while True:
+            ids = list(events.order_by('id').values_list('id', flat=True)[:batch_size])
+            if not ids:
+                return deleted
+            with transaction.atomic():
+                Feed.objects.filter(event_id__in=ids).delete()
+                Event.objects.filter(id__in=ids).delete()
+            deleted += len(ids)
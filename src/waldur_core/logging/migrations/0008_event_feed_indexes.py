@@ -0,0 +1,49 @@
+from django.db import migrations, models
+
+# Indexes are created concurrently so that event and feed tables,
+# which are usually large, are not locked for writes during migration.
+INDEXES = (
+    (
+        'event',
+        models.Index(fields=['created'], name='logging_event_created_idx'),
+        'logging_event (created)',
+    ),
+    (
+        'event',
+        models.Index(
+            fields=['event_type', 'created'], name='logging_event_type_created_idx'
+        ),
+        'logging_event (event_type, created)',
+    ),
+    (
+        'feed',
+        models.Index(
+            fields=['content_type', 'object_id', 'event'],
+            name='logging_feed_scope_event_idx',
+        ),
+        'logging_feed (content_type_id, object_id, event_id)',
+    ),
+)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('logging', '0007_drop_alerts'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    'CREATE INDEX CONCURRENTLY IF NOT EXISTS %s ON %s'
+                    % (index.name, definition),
+                    'DROP INDEX CONCURRENTLY IF EXISTS %s' % index.name,
+                )
+            ],
+            state_operations=[migrations.AddIndex(model_name=model_name, index=index)],
+        )
+        for model_name, index, definition in INDEXES
+    ]
@@ -346,6 +346,12 @@ class Event(UuidMixin):
 
     class Meta:
         ordering = ('-created',)
+        indexes = [
+            models.Index(fields=['created'], name='logging_event_created_idx'),
+            models.Index(
+                fields=['event_type', 'created'], name='logging_event_type_created_idx'
+            ),
+        ]
 
 
 class FeedManager(GenericKeyMixin, models.Manager):
@@ -360,3 +366,11 @@ class Feed(models.Model):
     object_id = models.PositiveIntegerField(db_index=True)
     scope = ct_fields.GenericForeignKey('content_type', 'object_id')
     objects = FeedManager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['content_type', 'object_id', 'event'],
+                name='logging_feed_scope_event_idx',
+            ),
+        ]
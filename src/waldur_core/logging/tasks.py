@@ -8,8 +8,12 @@ from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 
 from waldur_core.core.utils import deserialize_instance
-from waldur_core.logging.models import BaseHook, Event, Feed, Report, SystemNotification
-from waldur_core.logging.utils import create_report_archive
+from waldur_core.logging.models import Event, Feed, Report, SystemNotification
+from waldur_core.logging.utils import (
+    create_report_archive,
+    get_event_visible_users,
+    get_hooks_index,
+)
 from waldur_core.structure import models as structure_models
 
 logger = logging.getLogger(__name__)
@@ -18,9 +22,21 @@ logger = logging.getLogger(__name__)
 @shared_task(name='waldur_core.logging.process_event')
 def process_event(event_id):
     event = Event.objects.get(id=event_id)
-    for hook in BaseHook.get_active_hooks():
-        if check_event(event, hook):
-            hook.process(event)
+    handle_event(event, get_hooks_index())
+
+
+@shared_task(name='waldur_core.logging.process_events')
+def process_events(event_ids):
+    """ Process events stored by events buffer. Hooks index is fetched only once. """
+    hooks_index = get_hooks_index()
+    for event in Event.objects.filter(id__in=event_ids).order_by('created'):
+        handle_event(event, hooks_index)
+
+
+def handle_event(event, hooks_index):
+    hooks = hooks_index.get(event.event_type, [])
+    for hook in filter_hooks(event, hooks):
+        hook.process(event)
 
     process_system_notification(event)
 
@@ -34,11 +50,21 @@ def process_system_notification(event):
     customer_feed = Feed.objects.filter(event=event, content_type=customer_ct).first()
     customer = customer_feed and customer_feed.scope
 
-    for hook in SystemNotification.get_hooks(
-        event.event_type, project=project, customer=customer
-    ):
-        if check_event(event, hook):
-            hook.process(event)
+    hooks = list(
+        SystemNotification.get_hooks(
+            event.event_type, project=project, customer=customer
+        )
+    )
+    for hook in filter_hooks(event, hooks):
+        hook.process(event)
+
+
+def filter_hooks(event, hooks):
+    # Hooks are already matched by event type, so only permissions are checked
+    if not hooks:
+        return []
+    visible_user_ids = get_event_visible_users(event, [hook.user for hook in hooks])
+    return [hook for hook in hooks if hook.user_id in visible_user_ids]
 
 
 def check_event(event, hook):
@@ -46,13 +72,7 @@ def check_event(event, hook):
     if event.event_type not in hook.all_event_types:
         return False
 
-    # Check permissions
-    for feed in Feed.objects.filter(event=event):
-        qs = feed.content_type.model_class().get_permitted_objects(hook.user)
-        if qs.filter(id=feed.object_id).exists():
-            return True
-
-    return False
+    return hook.user_id in get_event_visible_users(event, [hook.user])
 
 
 @shared_task(name='waldur_core.logging.create_report')
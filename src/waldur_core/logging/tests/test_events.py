@@ -0,0 +1,37 @@
+from django.urls import reverse
+from rest_framework import status, test
+
+from waldur_core.core.tests.helpers import override_waldur_core_settings
+from waldur_core.structure.tests import factories as structure_factories
+from waldur_core.structure.tests import fixtures as structure_fixtures
+
+from . import factories
+
+
+@override_waldur_core_settings(COUNT_ESTIMATE_THRESHOLD=0)
+class EventListTest(test.APITransactionTestCase):
+    def setUp(self):
+        self.fixture = structure_fixtures.ProjectFixture()
+        factories.EventFactory.create_batch(3)
+
+    def test_user_without_scope_gets_empty_list(self):
+        self.client.force_authenticate(self.fixture.user)
+        response = self.client.get(factories.EventFactory.get_list_url())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [])
+
+    def test_user_without_scope_gets_zero_count(self):
+        self.client.force_authenticate(self.fixture.user)
+        response = self.client.get(reverse('event-count'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'count': 0, 'exact': True})
+
+    def test_user_gets_empty_list_for_invisible_scope(self):
+        customer = structure_factories.CustomerFactory()
+        self.client.force_authenticate(self.fixture.user)
+        response = self.client.get(
+            factories.EventFactory.get_list_url(),
+            {'scope': structure_factories.CustomerFactory.get_url(customer)},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [])
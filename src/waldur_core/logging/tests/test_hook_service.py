@@ -2,9 +2,12 @@ from unittest import mock
 
 from django.conf import settings
 from django.core import mail
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework import test
 
 from waldur_core.logging import models as logging_models
+from waldur_core.logging import utils as logging_utils
 from waldur_core.logging.tasks import process_event
 from waldur_core.logging.tests.factories import EventFactory
 from waldur_core.structure import models as structure_models
@@ -79,3 +82,57 @@ class TestHookService(test.APITransactionTestCase):
         # If event is not mutated, exception is not raised, see also SENTRY-1396
         email_hook.process(self.event)
         email_hook.process(self.event)
+
+    def test_disabled_hook_is_removed_from_index(self):
+        email_hook = logging_models.EmailHook.objects.create(
+            user=self.owner, email=self.owner.email, event_types=[self.event_type]
+        )
+        process_event(self.event.id)
+        self.assertEqual(len(mail.outbox), 1)
+
+        email_hook.is_active = False
+        email_hook.save()
+        process_event(self.event.id)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_hooks_of_other_event_types_are_not_indexed(self):
+        logging_models.EmailHook.objects.create(
+            user=self.owner, email=self.owner.email, event_types=[self.other_event]
+        )
+        hooks_index = logging_utils.get_hooks_index()
+        self.assertEqual(
+            [hook.user for hook in hooks_index[self.event_type]], [self.other_user]
+        )
+
+    def test_hooks_index_is_invalidated_when_user_email_is_changed(self):
+        logging_models.EmailHook.objects.create(
+            user=self.owner, email=self.owner.email, event_types=[self.event_type]
+        )
+        logging_utils.get_hooks_index()
+
+        self.owner.email = 'new@example.com'
+        self.owner.save()
+
+        hooks_index = logging_utils.get_hooks_index()
+        self.assertIn(
+            'new@example.com',
+            [hook.user.email for hook in hooks_index[self.event_type]],
+        )
+
+    @mock.patch('requests.post')
+    def test_number_of_queries_does_not_depend_on_number_of_hooks(self, requests_post):
+        def count_queries():
+            logging_utils.get_hooks_index()
+            with CaptureQueriesContext(connection) as context:
+                process_event(self.event.id)
+            return len(context.captured_queries)
+
+        initial_count = count_queries()
+        for _ in range(5):
+            logging_models.WebHook.objects.create(
+                user=structure_factories.UserFactory(),
+                destination_url='http://example.com/',
+                event_types=[self.event_type],
+            )
+        self.assertEqual(count_queries(), initial_count)
+        self.assertEqual(requests_post.call_count, 0)
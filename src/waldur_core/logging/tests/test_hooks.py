@@ -4,7 +4,7 @@ from django.urls import reverse
 from rest_framework import status, test
 
 from waldur_core.core.tests.helpers import override_waldur_core_settings
-from waldur_core.logging import loggers, models, tasks
+from waldur_core.logging import loggers, models, tasks, utils
 from waldur_core.logging.tests.factories import PushHookFactory, WebHookFactory
 from waldur_core.structure.tests import factories as structure_factories
 from waldur_core.structure.tests import fixtures as structure_fixtures
@@ -224,3 +224,26 @@ class SystemNotificationTest(test.APITransactionTestCase):
         tasks.process_event(self.event.id)
         self.assertEqual(len(mail.outbox), 1)
         self.assertEqual(mail.outbox[0].subject, 'Test Subject')
+
+
+class EventVisibleUsersTest(test.APITransactionTestCase):
+    def setUp(self):
+        self.fixture = structure_fixtures.ServiceFixture()
+        self.event = factories.EventFactory()
+        other_customer = structure_factories.CustomerFactory()
+        models.Feed.objects.create(scope=other_customer, event=self.event)
+
+    def test_user_is_allowed_if_any_feed_is_visible(self):
+        models.Feed.objects.create(scope=self.fixture.resource, event=self.event)
+        visible_user_ids = utils.get_event_visible_users(
+            self.event, [self.fixture.admin]
+        )
+        self.assertEqual(visible_user_ids, {self.fixture.admin.id})
+
+    def test_user_is_not_allowed_if_feeds_are_not_visible(self):
+        other_resource = structure_factories.TestNewInstanceFactory()
+        models.Feed.objects.create(scope=other_resource, event=self.event)
+        visible_user_ids = utils.get_event_visible_users(
+            self.event, [self.fixture.admin]
+        )
+        self.assertEqual(visible_user_ids, set())
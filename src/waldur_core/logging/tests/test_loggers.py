@@ -0,0 +1,73 @@
+from unittest import mock
+
+from django.db import transaction
+from rest_framework import test
+
+from waldur_core.logging import loggers, models
+from waldur_core.structure.log import event_logger
+from waldur_core.structure.tests import factories as structure_factories
+
+
+class BufferedEventsTest(test.APITransactionTestCase):
+    def setUp(self):
+        self.customer = structure_factories.CustomerFactory()
+
+    def log_event(self):
+        event_logger.customer.info(
+            'Customer {customer_name} has been updated.',
+            event_type='customer_update_succeeded',
+            event_context={'customer': self.customer},
+        )
+
+    def get_events(self):
+        return models.Event.objects.filter(event_type='customer_update_succeeded')
+
+    @mock.patch('waldur_core.logging.tasks.process_events')
+    def test_events_are_stored_when_block_is_exited(self, process_events):
+        with loggers.buffered_events():
+            self.log_event()
+            self.log_event()
+            self.assertEqual(self.get_events().count(), 0)
+
+        self.assertEqual(self.get_events().count(), 2)
+        self.assertEqual(
+            models.Feed.objects.filter(
+                scope=self.customer, event__in=self.get_events()
+            ).count(),
+            2,
+        )
+        process_events.delay.assert_called_once()
+
+    @mock.patch('waldur_core.logging.tasks.process_events')
+    def test_events_are_flushed_when_buffer_is_full(self, process_events):
+        with loggers.buffered_events(batch_size=2):
+            self.log_event()
+            self.log_event()
+            self.log_event()
+            self.assertEqual(self.get_events().count(), 2)
+
+        self.assertEqual(self.get_events().count(), 3)
+        self.assertEqual(process_events.delay.call_count, 2)
+
+    @mock.patch('waldur_core.logging.tasks.process_events')
+    def test_pending_events_are_stored_if_exception_is_raised(self, process_events):
+        with self.assertRaises(ValueError):
+            with loggers.buffered_events():
+                self.log_event()
+                raise ValueError
+
+        self.assertEqual(self.get_events().count(), 1)
+        process_events.delay.assert_called_once()
+
+    @mock.patch('waldur_core.logging.tasks.process_events')
+    def test_pending_events_are_discarded_if_transaction_is_rolled_back(
+        self, process_events
+    ):
+        with self.assertRaises(ValueError):
+            with transaction.atomic():
+                with loggers.buffered_events():
+                    self.log_event()
+                    raise ValueError
+
+        self.assertEqual(self.get_events().count(), 0)
+        process_events.delay.assert_not_called()
@@ -0,0 +1,53 @@
+import gzip
+import json
+import tempfile
+from io import StringIO
+
+from dateutil.relativedelta import relativedelta
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from waldur_core.logging import models
+from waldur_core.logging.tests import factories
+from waldur_core.structure.tests import factories as structure_factories
+
+
+class CleanupEventsCommandTest(TestCase):
+    def setUp(self):
+        customer = structure_factories.CustomerFactory()
+        self.old_event = factories.EventFactory(
+            created=timezone.now() - relativedelta(months=3)
+        )
+        models.Feed.objects.create(scope=customer, event=self.old_event)
+        self.new_event = factories.EventFactory()
+        models.Feed.objects.create(scope=customer, event=self.new_event)
+
+    def test_old_events_and_feeds_are_deleted(self):
+        call_command('cleanup_events', months=1, stdout=StringIO())
+
+        self.assertFalse(models.Event.objects.filter(id=self.old_event.id).exists())
+        self.assertFalse(
+            models.Feed.objects.filter(event_id=self.old_event.id).exists()
+        )
+        self.assertTrue(models.Event.objects.filter(id=self.new_event.id).exists())
+
+    def test_events_are_not_deleted_in_dry_run_mode(self):
+        call_command('cleanup_events', months=1, dry_run=True, stdout=StringIO())
+        self.assertTrue(models.Event.objects.filter(id=self.old_event.id).exists())
+
+    def test_events_are_archived_before_deletion(self):
+        with tempfile.TemporaryDirectory() as archive_dir:
+            call_command(
+                'cleanup_events', months=1, archive_dir=archive_dir, stdout=StringIO()
+            )
+            path = '%s/events-%s.json.gz' % (
+                archive_dir,
+                self.old_event.created.strftime('%Y-%m'),
+            )
+            with gzip.open(path, 'rt') as archive:
+                records = [json.loads(line) for line in archive]
+
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]['uuid'], self.old_event.uuid.hex)
+        self.assertEqual(len(records[0]['feeds']), 1)
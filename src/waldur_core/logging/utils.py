@@ -1,13 +1,26 @@
+import collections
 import datetime
 import os
 import tarfile
+import threading
+import uuid
 from io import BytesIO
 
 from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
 from django.core.files.base import ContentFile
+from django.db.models import Q
 
 from waldur_core.core.utils import datetime_to_timestamp
-from waldur_core.logging.loggers import LoggableMixin
+from waldur_core.logging import models
+from waldur_core.logging.loggers import LoggableMixin, expand_event_groups
+
+HOOKS_INDEX_VERSION_CACHE_KEY = 'waldur_core.logging.hooks_index_version'
+# Hooks index caches owners of hooks, so it is invalidated when these fields are changed.
+HOOK_USER_FIELDS = ('email', 'is_staff', 'is_support', 'is_active')
+
+_locals = threading.local()
 
 
 def get_loggable_models():
@@ -48,3 +61,114 @@ def create_report_archive(log_directory, interval):
             archive.add(filename)
 
     return ContentFile(stream.getvalue())
+
+
+def get_hooks_index_version():
+    version = cache.get(HOOKS_INDEX_VERSION_CACHE_KEY)
+    if version is None:
+        version = uuid.uuid4().hex
+        cache.set(HOOKS_INDEX_VERSION_CACHE_KEY, version, None)
+    return version
+
+
+def invalidate_hooks_index():
+    """
+    Drop hooks index of the current process and force other processes
+    to rebuild their indexes on next event.
+    """
+    _locals.hooks_index = None
+    cache.set(HOOKS_INDEX_VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+
+
+def build_hooks_index():
+    """
+    Return mapping from event type to the list of active hooks subscribed to it.
+    System notification event types are merged into hooks of matching type
+    in the same way as BaseHook.all_event_types does.
+    """
+    system_event_types = collections.defaultdict(set)
+    for notification in models.SystemNotification.objects.all():
+        event_types = system_event_types[notification.hook_content_type_id]
+        event_types.update(notification.event_types)
+        event_types.update(expand_event_groups(notification.event_groups))
+
+    index = collections.defaultdict(list)
+    for hook_model in models.BaseHook.get_all_models():
+        hook_ct = ContentType.objects.get_for_model(hook_model)
+        extra_event_types = system_event_types.get(hook_ct.id, set())
+        for hook in hook_model.objects.filter(is_active=True).select_related('user'):
+            for event_type in set(hook.event_types) | extra_event_types:
+                index[event_type].append(hook)
+    return dict(index)
+
+
+def get_hooks_index():
+    version = get_hooks_index_version()
+    cached = getattr(_locals, 'hooks_index', None)
+    if cached is None or cached[0] != version:
+        cached = (version, build_hooks_index())
+        _locals.hooks_index = cached
+    return cached[1]
+
+
+def get_event_visible_users(event, users):
+    """
+    Return IDs of users from the given list who are allowed to see the event.
+    User is allowed to see the event if any of its feeds is visible to the user.
+    Customer and project feeds of the event are resolved against active
+    permissions of all users with a single query. Other feeds are checked
+    using get_permitted_objects only for users who are not allowed yet.
+    """
+    from waldur_core.core.models import User
+    from waldur_core.structure import models as structure_models
+
+    user_ids = {user.id for user in users}
+    if not user_ids:
+        return set()
+
+    feeds = collections.defaultdict(set)
+    for content_type_id, object_id in models.Feed.objects.filter(
+        event=event
+    ).values_list('content_type_id', 'object_id'):
+        feeds[content_type_id].add(object_id)
+    if not feeds:
+        return set()
+
+    customer_ct = ContentType.objects.get_for_model(structure_models.Customer)
+    project_ct = ContentType.objects.get_for_model(structure_models.Project)
+    customer_ids = feeds.pop(customer_ct.id, set())
+    project_ids = feeds.pop(project_ct.id, set())
+
+    query = Q(is_staff=True) | Q(is_support=True)
+    if customer_ids:
+        query |= Q(
+            customerpermission__customer_id__in=customer_ids,
+            customerpermission__role=structure_models.CustomerRole.OWNER,
+            customerpermission__is_active=True,
+        )
+    if project_ids:
+        projects = structure_models.Project.objects.filter(id__in=project_ids)
+        query |= Q(
+            customerpermission__customer__projects__in=projects,
+            customerpermission__is_active=True,
+        ) | Q(
+            projectpermission__project__in=projects, projectpermission__is_active=True,
+        )
+    visible_user_ids = set(
+        User.objects.filter(query, id__in=user_ids)
+        .values_list('id', flat=True)
+        .distinct()
+    )
+
+    if not feeds:
+        return visible_user_ids
+
+    for user in users:
+        if user.id in visible_user_ids:
+            continue
+        for content_type_id, object_ids in feeds.items():
+            model = ContentType.objects.get_for_id(content_type_id).model_class()
+            if model.get_permitted_objects(user).filter(id__in=object_ids).exists():
+                visible_user_ids.add(user.id)
+                break
+    return visible_user_ids
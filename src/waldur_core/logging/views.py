@@ -2,6 +2,7 @@ from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import decorators, mixins, permissions, response, status, viewsets
 
 from waldur_core.core import filters as core_filters
+from waldur_core.core import pagination as core_pagination
 from waldur_core.core import permissions as core_permissions
 from waldur_core.core.managers import SummaryQuerySet
 from waldur_core.logging import filters, models, serializers, utils
@@ -17,6 +18,7 @@ class EventViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = serializers.EventSerializer
     filter_backends = (DjangoFilterBackend, filters.EventFilterBackend)
     filterset_class = filters.EventFilter
+    pagination_class = core_pagination.ApproximateCountLinkHeaderPagination
 
     @decorators.action(detail=False)
     def count(self, request, *args, **kwargs):
@@ -24,16 +26,23 @@ class EventViewSet(viewsets.ReadOnlyModelViewSet):
         To get a count of events - run **GET** against */api/events/count/* as authenticated user.
         Endpoint support same filters as events list.
 
+        For large result sets count is estimated by database planner or taken
+        from cache, which is indicated by "exact" field of the response.
+        In order to get exact count, pass "exact_count=true" query parameter.
+
         Response example:
 
         .. code-block:: javascript
 
-            {"count": 12321}
+            {"count": 12321, "exact": true}
         """
 
         self.queryset = self.filter_queryset(self.get_queryset())
+        count, exact = core_pagination.get_queryset_count(
+            self.queryset, core_pagination.is_exact_count_requested(request)
+        )
         return response.Response(
-            {'count': self.queryset.count()}, status=status.HTTP_200_OK
+            {'count': count, 'exact': exact}, status=status.HTTP_200_OK
         )
 
     @decorators.action(detail=False)
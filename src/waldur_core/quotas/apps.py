@@ -15,6 +15,7 @@ class QuotasConfig(AppConfig):
         from waldur_core.structure import signals as structure_signals
         from waldur_core.structure import models as structure_models
         from waldur_core.quotas import handlers, utils
+        from waldur_core.quotas import signals as quotas_signals
 
         Quota = self.get_model('Quota')
 
@@ -72,6 +73,24 @@ class QuotasConfig(AppConfig):
             dispatch_uid='waldur_core.quotas.handle_aggregated_quotas_pre_delete',
         )
 
+        signals.post_save.connect(
+            handlers.invalidate_quotas_snapshot,
+            sender=Quota,
+            dispatch_uid='waldur_core.quotas.invalidate_quotas_snapshot_post_save',
+        )
+
+        signals.post_delete.connect(
+            handlers.invalidate_quotas_snapshot,
+            sender=Quota,
+            dispatch_uid='waldur_core.quotas.invalidate_quotas_snapshot_post_delete',
+        )
+
+        quotas_signals.quotas_usage_updated.connect(
+            handlers.invalidate_quotas_snapshot,
+            sender=Quota,
+            dispatch_uid='waldur_core.quotas.invalidate_quotas_snapshot_usage_updated',
+        )
+
         structure_signals.project_moved.connect(
             handlers.projects_customer_has_been_changed,
             sender=structure_models.Project,
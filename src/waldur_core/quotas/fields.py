@@ -1,8 +1,10 @@
 from functools import reduce
 
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ObjectDoesNotExist
 from django.db import models
-from django.db.models import F, Sum
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum
 
 from . import exceptions
 
@@ -158,6 +160,15 @@ class QuotaField:
     def recalculate_usage(self, scope):
         pass
 
+    def get_current_usages(self, scopes):
+        """
+        Compute current usage for all given scopes at once.
+
+        Return dictionary where key is scope ID and value is current usage
+        or None if quota usage is not calculated by field.
+        """
+        return None
+
 
 class CounterQuotaField(QuotaField):
     """ Provides limitation on target models instances count.
@@ -226,6 +237,30 @@ class CounterQuotaField(QuotaField):
         current_usage = self.get_current_usage(self.target_models, scope)
         scope.set_quota_usage(self.name, current_usage)
 
+    def get_usage_aggregate(self):
+        return Count('pk')
+
+    def get_current_usages(self, scopes):
+        if self._raw_get_current_usage is not None:
+            return {
+                scope.id: self.get_current_usage(self.target_models, scope)
+                for scope in scopes
+            }
+
+        filter_path_to_scope = self.path_to_scope.replace('.', '__')
+        usages = {scope_id: 0 for scope_id in scopes.values_list('id', flat=True)}
+        for model in self.target_models:
+            rows = (
+                model.objects.filter(**{filter_path_to_scope + '__in': scopes})
+                .order_by()
+                .values(filter_path_to_scope)
+                .annotate(usage=self.get_usage_aggregate())
+                .values_list(filter_path_to_scope, 'usage')
+            )
+            for scope_id, usage in rows:
+                usages[scope_id] = usages.get(scope_id, 0) + (usage or 0)
+        return usages
+
     def add_usage(self, target_instance, delta):
         try:
             scope = self._get_scope(target_instance)
@@ -274,6 +309,9 @@ class TotalQuotaField(CounterQuotaField):
     def get_delta(self, target_instance):
         return getattr(target_instance, self.target_field)
 
+    def get_usage_aggregate(self):
+        return Sum(self.target_field)
+
 
 class AggregatorQuotaField(QuotaField):
     """ Aggregates sum of quota scope children with the same name.
@@ -285,27 +323,92 @@ class AggregatorQuotaField(QuotaField):
             nc_resource_count = quotas_fields.UsageAggregatorQuotaField(
                 get_children=lambda customer: customer.projects.all(),
             )
+
+        If child_model and path_to_scope (path from child model to scope) are defined,
+        usage of all scopes could be recalculated with a single grouped query.
     """
 
     aggregation_field = NotImplemented
 
-    def __init__(self, get_children, child_quota_name=None, **kwargs):
+    def __init__(
+        self,
+        get_children,
+        child_quota_name=None,
+        child_model=None,
+        path_to_scope=None,
+        **kwargs
+    ):
         self.get_children = get_children
         self._child_quota_name = child_quota_name
+        self._raw_child_model = child_model
+        self.path_to_scope = path_to_scope
         super(AggregatorQuotaField, self).__init__(**kwargs)
 
+    @property
+    def child_model(self):
+        if callable(self._raw_child_model) and not isinstance(
+            self._raw_child_model, type
+        ):
+            return self._raw_child_model()
+        return self._raw_child_model
+
     def get_child_quota_name(self):
         return (
             self._child_quota_name if self._child_quota_name is not None else self.name
         )
 
-    def recalculate_usage(self, scope):
+    def get_current_usage(self, scope):
+        """ Compute sum of children quotas with a single query. """
         children = self.get_children(scope)
-        current_usage = 0
-        for child in children:
-            child_quota = child.quotas.get(name=self.get_child_quota_name())
-            current_usage += getattr(child_quota, self.aggregation_field)
-        scope.set_quota_usage(self.name, current_usage)
+        if isinstance(children, models.QuerySet):
+            query = Q(
+                content_type=ContentType.objects.get_for_model(children.model),
+                object_id__in=children.values('pk'),
+            )
+        else:
+            query = Q(pk__in=[])
+            for child in children:
+                query |= Q(
+                    content_type=ContentType.objects.get_for_model(child),
+                    object_id=child.pk,
+                )
+        quotas = scope.quotas.model.objects.filter(
+            query, name=self.get_child_quota_name()
+        )
+        result = quotas.aggregate(value=Sum(self.aggregation_field))['value']
+        return result or 0
+
+    def recalculate_usage(self, scope):
+        scope.set_quota_usage(self.name, self.get_current_usage(scope))
+
+    def get_current_usages(self, scopes):
+        if self.child_model is None or self.path_to_scope is None:
+            return {scope.id: self.get_current_usage(scope) for scope in scopes}
+
+        filter_path_to_scope = self.path_to_scope.replace('.', '__')
+        children = self.child_model.objects.filter(
+            **{filter_path_to_scope + '__in': scopes}
+        )
+        child_scope = children.filter(pk=OuterRef('object_id')).values(
+            filter_path_to_scope
+        )[:1]
+        rows = (
+            apps.get_model('quotas', 'Quota')
+            .objects.filter(
+                content_type=ContentType.objects.get_for_model(self.child_model),
+                object_id__in=children.values('pk'),
+                name=self.get_child_quota_name(),
+            )
+            .order_by()
+            .annotate(scope_id=Subquery(child_scope))
+            .values('scope_id')
+            .annotate(usage=Sum(self.aggregation_field))
+            .values_list('scope_id', 'usage')
+        )
+        usages = {scope_id: 0 for scope_id in scopes.values_list('id', flat=True)}
+        for scope_id, usage in rows:
+            usages[scope_id] = usage or 0
+        return usages
 
     def post_child_quota_save(self, scope, child_quota, created=False):
         current_value = getattr(child_quota, self.aggregation_field)
@@ -56,15 +56,11 @@ def count_quota_handler_factory(count_quota_field):
 def handle_aggregated_quotas(sender, instance, **kwargs):
     """ Call aggregated quotas fields update methods """
     quota = instance
-    # aggregation is not supported for global quotas.
-    if quota.scope is None:
-        return
-    quota_field = quota.get_field()
-    # usage aggregation should not count another usage aggregator field to avoid calls duplication.
-    if isinstance(quota_field, fields.UsageAggregatorQuotaField) or quota_field is None:
-        return
     signal = kwargs['signal']
-    for aggregator_quota in quota_field.get_aggregator_quotas(quota):
+    for aggregator_quota in utils.get_aggregator_quotas(quota):
+        if utils.is_aggregation_deferred():
+            utils.mark_aggregator_quota_dirty(aggregator_quota)
+            continue
         field = aggregator_quota.get_field()
         if signal == signals.post_save:
             field.post_child_quota_save(
@@ -74,6 +70,10 @@ def handle_aggregated_quotas(sender, instance, **kwargs):
             field.pre_child_quota_delete(aggregator_quota.scope, child_quota=quota)
 
 
+def invalidate_quotas_snapshot(sender, **kwargs):
+    utils.invalidate_quotas_snapshot()
+
+
 def projects_customer_has_been_changed(
     sender, project, old_customer, new_customer, created=False, **kwargs
 ):
@@ -1,50 +1,132 @@
-from django.core.management.base import BaseCommand
-from django.db import transaction
+import multiprocessing
 
-from waldur_core.quotas import exceptions, fields, models, signals
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.db import connections, transaction
+
+from waldur_core.core.utils import DryRunCommand, chunks
+from waldur_core.quotas import exceptions, fields, models, signals, utils
 from waldur_core.quotas.utils import get_models_with_quotas
 
 
-class Command(BaseCommand):
-    """ Recalculate all quotas """
+def get_quota_field(model, field_name):
+    return next(f for f in model.get_quotas_fields() if f.name == field_name)
+
+
+def recalculate_shard(shard):
+    """ Recalculate quota usage for scopes with IDs in the given range. """
+    model_label, field_name, min_id, max_id, dry_run = shard
+    model = apps.get_model(model_label)
+    quota_field = get_quota_field(model, field_name)
+    scopes = model.objects.filter(id__gte=min_id, id__lte=max_id)
+    report = utils.recalculate_quotas_usage(model, quota_field, scopes, dry_run)
+    return model_label, field_name, report
+
+
+def get_id_ranges(model, count):
+    ids = list(model.objects.order_by('id').values_list('id', flat=True))
+    if not ids:
+        return []
+    size = -(-len(ids) // count)
+    return [(chunk[0], chunk[-1]) for chunk in chunks(ids, size)]
+
+
+class Command(DryRunCommand):
+    help = """Recalculate all quotas.
+    Counter, total and aggregator quotas are computed with grouped queries
+    for all scopes of the model at once and only changed quotas are updated."""
 
-    def handle(self, *args, **options):
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument(
+            '--parallel',
+            type=int,
+            default=1,
+            help='Number of worker processes used for quotas recalculation.',
+        )
+
+    def handle(self, dry_run, parallel, *args, **options):
         # TODO: implement other quotas recalculation
         # TODO: implement global stale quotas deletion
+        self.dry_run = dry_run
+        self.verbosity = options['verbosity']
+        self.parallel = max(parallel, 1)
+        if dry_run:
+            self.stdout.write('Dry run mode: quotas are not going to be changed.')
         self.delete_stale_quotas()
         self.init_missing_quotas()
         self.recalculate_global_quotas()
         self.recalculate_counter_quotas()
         self.recalculate_aggregator_quotas()
-        self.stdout.write(
-            'XXX: Second time to make sure that aggregators of aggregators where calculated properly.'
-        )
-        self.recalculate_aggregator_quotas()
+        if not dry_run:
+            self.stdout.write(
+                'XXX: Second time to make sure that aggregators of aggregators where calculated properly.'
+            )
+            self.recalculate_aggregator_quotas()
         self.recalculate_custom_quotas()
 
     def delete_stale_quotas(self):
         self.stdout.write('Deleting stale quotas')
         for model in get_models_with_quotas():
-            for obj in model.objects.all():
-                quotas_names = model.get_quotas_names()
-                obj.quotas.exclude(name__in=quotas_names).delete()
+            stale_quotas = models.Quota.objects.filter(
+                content_type=ContentType.objects.get_for_model(model),
+                object_id__in=model.objects.values('id'),
+            ).exclude(name__in=model.get_quotas_names())
+            if self.dry_run:
+                count = stale_quotas.count()
+                if count:
+                    self.stdout.write(
+                        '%s: %s stale quotas would be deleted.'
+                        % (model._meta.label, count)
+                    )
+            else:
+                stale_quotas.delete()
         self.stdout.write('...done')
 
     def init_missing_quotas(self):
         self.stdout.write('Initializing missing quotas')
         for model in get_models_with_quotas():
+            existing_quotas = set(
+                models.Quota.objects.filter(
+                    content_type=ContentType.objects.get_for_model(model)
+                ).values_list('object_id', 'name')
+            )
+            missing_count = 0
             for obj in model.objects.all():
                 for field in obj.get_quotas_fields():
+                    if (obj.id, field.name) in existing_quotas:
+                        continue
+                    if not field.is_connected_to_scope(obj):
+                        continue
+                    missing_count += 1
+                    if self.dry_run:
+                        continue
                     try:
                         field.get_or_create_quota(scope=obj)
                     except exceptions.CreationConditionFailedQuotaError:
                         pass
+            if self.dry_run and missing_count:
+                self.stdout.write(
+                    '%s: %s missing quotas would be created.'
+                    % (model._meta.label, missing_count)
+                )
         self.stdout.write('...done')
 
     def recalculate_global_quotas(self):
         self.stdout.write('Recalculating global quotas')
         for model in get_models_with_quotas():
             if hasattr(model, 'GLOBAL_COUNT_QUOTA_NAME'):
+                if self.dry_run:
+                    quota = models.Quota.objects.filter(
+                        name=model.GLOBAL_COUNT_QUOTA_NAME
+                    ).first()
+                    usage = model.objects.count()
+                    if quota and quota.usage != usage:
+                        self.stdout.write(
+                            '%s: usage would be changed from %s to %s.'
+                            % (quota.name, quota.usage, usage)
+                        )
+                    continue
                 with transaction.atomic():
                     quota, _ = models.Quota.objects.get_or_create(
                         name=model.GLOBAL_COUNT_QUOTA_NAME
@@ -55,26 +137,62 @@ class Command(BaseCommand):
 
     def recalculate_counter_quotas(self):
         self.stdout.write('Recalculating counter quotas')
-        for model in get_models_with_quotas():
-            for counter_field in model.get_quotas_fields(
-                field_class=fields.CounterQuotaField
-            ):
-                for instance in model.objects.all():
-                    counter_field.recalculate(scope=instance)
+        self.recalculate_quotas(fields.CounterQuotaField)
         self.stdout.write('...done')
 
     def recalculate_aggregator_quotas(self):
         # TODO: recalculate child quotas first
         self.stdout.write('Recalculating aggregator quotas')
-        for model in get_models_with_quotas():
-            for aggregator_field in model.get_quotas_fields(
-                field_class=fields.AggregatorQuotaField
-            ):
-                for instance in model.objects.all():
-                    aggregator_field.recalculate(scope=instance)
+        self.recalculate_quotas(fields.AggregatorQuotaField)
         self.stdout.write('...done')
 
     def recalculate_custom_quotas(self):
+        if self.dry_run:
+            self.stdout.write('Skipping custom quotas recalculation in dry run mode')
+            return
         self.stdout.write('Recalculating custom quotas')
         signals.recalculate_quotas.send(sender=self)
         self.stdout.write('...done')
+
+    def recalculate_quotas(self, field_class):
+        shards = []
+        for model in get_models_with_quotas():
+            quota_fields = model.get_quotas_fields(field_class=field_class)
+            if not quota_fields:
+                continue
+            for min_id, max_id in get_id_ranges(model, self.parallel):
+                for quota_field in quota_fields:
+                    shards.append(
+                        (
+                            model._meta.label,
+                            quota_field.name,
+                            min_id,
+                            max_id,
+                            self.dry_run,
+                        )
+                    )
+
+        if self.parallel > 1 and len(shards) > 1:
+            # Database connections should not be shared between processes.
+            connections.close_all()
+            context = multiprocessing.get_context('fork')
+            with context.Pool(self.parallel) as pool:
+                results = pool.map(recalculate_shard, shards)
+        else:
+            results = map(recalculate_shard, shards)
+
+        for model_label, field_name, report in results:
+            self.write_report(model_label, field_name, report)
+
+    def write_report(self, model_label, field_name, report):
+        if not report:
+            return
+        action = 'would be changed' if self.dry_run else 'have been changed'
+        self.stdout.write(
+            '%s: %s %s quotas %s.' % (model_label, len(report), field_name, action)
+        )
+        if self.verbosity > 1:
+            for object_id, old_usage, new_usage in report:
+                self.stdout.write(
+                    '  %s #%s: %s -> %s' % (field_name, object_id, old_usage, new_usage)
+                )
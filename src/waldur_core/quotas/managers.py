@@ -5,7 +5,30 @@ from django.db.models import Q
 from waldur_core.core.managers import GenericKeyMixin
 
 
-class QuotaManager(GenericKeyMixin, models.Manager):
+class QuotaQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        # Bulk operations do not emit signals, so quotas snapshot is invalidated explicitly.
+        from waldur_core.quotas import utils
+
+        utils.invalidate_quotas_snapshot()
+        return super(QuotaQuerySet, self).update(**kwargs)
+
+    def bulk_update(self, objs, fields, batch_size=None):
+        from waldur_core.quotas import utils
+
+        utils.invalidate_quotas_snapshot()
+        return super(QuotaQuerySet, self).bulk_update(objs, fields, batch_size)
+
+    def bulk_create(self, objs, batch_size=None, ignore_conflicts=False):
+        from waldur_core.quotas import utils
+
+        utils.invalidate_quotas_snapshot()
+        return super(QuotaQuerySet, self).bulk_create(
+            objs, batch_size, ignore_conflicts
+        )
+
+
+class QuotaManager(GenericKeyMixin, models.Manager.from_queryset(QuotaQuerySet)):
     def filtered_for_user(self, user, queryset=None):
         from waldur_core.quotas import utils
 
@@ -3,7 +3,6 @@ import logging
 
 from django.contrib.contenttypes import fields as ct_fields
 from django.contrib.contenttypes import models as ct_models
-from django.core.exceptions import ObjectDoesNotExist
 from django.db import models, transaction
 from django.db.models import F, Sum
 from django.utils.translation import ugettext_lazy as _
@@ -13,7 +12,7 @@ from reversion import revisions as reversion
 from waldur_core.core.models import DescendantMixin, ReversionMixin, UuidMixin
 from waldur_core.logging.loggers import LoggableMixin
 from waldur_core.logging.models import AlertThresholdMixin
-from waldur_core.quotas import exceptions, fields, managers
+from waldur_core.quotas import exceptions, fields, managers, signals
 
 logger = logging.getLogger(__name__)
 
@@ -212,11 +211,13 @@ class QuotaModelMixin(models.Model):
             ['ram quota limit: 1024, requires: 2048(instance#1)', ...]
 
         """
+        from waldur_core.quotas import utils
+
+        quotas = utils.get_scope_quotas(self)
         errors = []
         for name, delta in quota_deltas.items():
-            try:
-                quota = self.quotas.get(name=name)
-            except ObjectDoesNotExist:
+            quota = quotas.get(str(name))
+            if quota is None:
                 continue
             if quota.is_exceeded(delta):
                 errors.append(
@@ -231,6 +232,14 @@ class QuotaModelMixin(models.Model):
                     _('One or more quotas were exceeded: %s') % ';'.join(errors)
                 )
 
+    def get_cached_quotas(self):
+        """
+        Return list of quotas. If quotas snapshot is enabled, they are read from it.
+        """
+        from waldur_core.quotas import utils
+
+        return list(utils.get_scope_quotas(self, include_ancestors=False).values())
+
     def can_user_update_quotas(self, user):
         """
         Return True if user has permission to update quota
@@ -372,15 +381,123 @@ class SharedQuotaMixin:
         raise NotImplementedError()
 
     def apply_quota_changes(self, validate=False, mult=1):
-        scopes = self.get_quota_scopes()
-        deltas = self.get_quota_deltas()
-        for name, delta in deltas.items():
-            for scope in scopes:
-                if scope:
-                    scope.add_quota_usage(name, delta * mult, validate=validate)
+        deltas = {name: delta * mult for name, delta in self.get_quota_deltas().items()}
+        scope_deltas = [(scope, deltas) for scope in self.get_quota_scopes() if scope]
+        apply_quota_usage_deltas(scope_deltas, validate=validate)
 
     def increase_backend_quotas_usage(self, validate=True):
         self.apply_quota_changes(validate=validate)
 
     def decrease_backend_quotas_usage(self):
         self.apply_quota_changes(mult=-1)
+
+
+def _get_quota_key(scope, name):
+    content_type = ct_models.ContentType.objects.get_for_model(scope)
+    return content_type.id, scope.id, str(name)
+
+
+@transaction.atomic
+def apply_quota_usage_deltas(scope_deltas, validate=False):
+    """
+    Apply usage deltas to quotas of several scopes in one batch.
+
+    scope_deltas - iterable of (scope, {quota_name: delta}) pairs.
+
+    Unlike calling add_quota_usage for each pair, affected quotas are locked
+    with SELECT ... FOR UPDATE in primary key order, so that concurrent batches
+    do not deadlock. All deltas are validated before anything is written.
+
+    Semantics of add_quota_usage are preserved: negative delta is skipped if it
+    would result in negative usage and is applied without post_save signal,
+    positive delta is validated against limit if validate is True.
+
+    All changed quotas are written with a single bulk update. Instead of post_save
+    signal for each quota, aggregator quotas of increased quotas are updated once
+    for the whole batch and quotas_usage_updated signal is sent with all of them.
+    """
+    deltas = {}
+    scopes = {}
+    for scope, quota_deltas in scope_deltas:
+        for name, delta in quota_deltas.items():
+            if not delta:
+                continue
+            key = _get_quota_key(scope, name)
+            deltas[key] = deltas.get(key, 0) + delta
+            scopes[key] = (scope, name)
+
+    if not deltas:
+        return
+
+    query = models.Q()
+    for content_type_id, object_id, name in deltas:
+        query |= models.Q(
+            content_type_id=content_type_id, object_id=object_id, name=name
+        )
+    quotas = {
+        (quota.content_type_id, quota.object_id, quota.name): quota
+        for quota in Quota.objects.select_for_update().filter(query).order_by('pk')
+    }
+    for key, quota in quotas.items():
+        # Avoid extra query on scope fetching during aggregators lookup.
+        quota.scope = scopes[key][0]
+
+    # Missing quotas are created in the same way as add_quota_usage does it.
+    # Quota usage could not be decreased if quota does not exist.
+    for key in sorted(set(deltas) - set(quotas)):
+        if deltas[key] > 0:
+            scope, name = scopes[key]
+            quotas[key] = scope.get_or_create_quota(name)
+
+    if validate:
+        errors = []
+        for key, quota in quotas.items():
+            delta = deltas[key]
+            if quota.is_exceeded(delta):
+                scope, name = scopes[key]
+                errors.append(
+                    _(
+                        '%(quota)s "%(name)s" quota is over limit. Required: %(usage)s, limit: %(limit)s.'
+                    )
+                    % dict(
+                        quota=scope,
+                        name=name,
+                        usage=quota.usage + delta,
+                        limit=quota.limit,
+                    )
+                )
+        if errors:
+            raise exceptions.QuotaValidationError(errors)
+
+    # As in add_quota_usage, decreased usage is not propagated to receivers.
+    changed_quotas = []
+    increased_quotas = []
+    for key, delta in deltas.items():
+        quota = quotas.get(key)
+        if quota is None:
+            continue
+        if delta < 0:
+            if quota.usage >= -delta:
+                quota.usage += delta
+                changed_quotas.append(quota)
+            continue
+        quota.usage += delta
+        if quota.usage < 0:
+            scope, name = scopes[key]
+            logger.error(
+                '%(quota)s "%(name)s" quota usage should not be negative. '
+                'Current usage: %(usage)s, delta: %(usage_delta)s',
+                dict(quota=scope, name=name, usage=quota.usage, usage_delta=delta),
+            )
+            quota.usage = 0
+        changed_quotas.append(quota)
+        increased_quotas.append(quota)
+
+    if changed_quotas:
+        Quota.objects.bulk_update(changed_quotas, ['usage'])
+
+    if increased_quotas:
+        from waldur_core.quotas import utils
+
+        utils.aggregate_quotas_usage(increased_quotas)
+        signals.quotas_usage_updated.send(sender=Quota, quotas=increased_quotas)
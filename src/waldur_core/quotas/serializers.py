@@ -1,3 +1,4 @@
+from django.db.models import Manager
 from rest_framework import serializers
 
 from waldur_core.core.serializers import GenericRelatedField
@@ -30,3 +31,18 @@ class BasicQuotaSerializer(serializers.HyperlinkedModelSerializer):
         extra_kwargs = {
             'url': {'lookup_field': 'uuid'},
         }
+
+
+class QuotasSnapshotListSerializer(serializers.ListSerializer):
+    """
+    Serialize list of scopes within quotas snapshot. Quotas of all scopes
+    are loaded at once, so that they are not queried for each scope.
+    """
+
+    def to_representation(self, data):
+        with utils.quotas_snapshot():
+            # Queryset is iterated as is, so that its result cache
+            # and prefetched quotas are reused instead of being queried again.
+            scopes = list(data.all() if isinstance(data, Manager) else data)
+            utils.load_quotas_snapshot(scopes)
+            return super(QuotasSnapshotListSerializer, self).to_representation(scopes)
@@ -4,3 +4,7 @@ import django.dispatch
 # without introducing circular dependency between core quotas application and plugins.
 # It is called when recalculatequotas management command is called.
 recalculate_quotas = django.dispatch.Signal()
+
+# It is sent instead of post_save signal when usage of quotas is updated in bulk.
+# Usage of aggregator quotas is already updated when it is sent.
+quotas_usage_updated = django.dispatch.Signal(providing_args=['quotas'])
@@ -43,6 +43,8 @@ class ParentModel(
         )
         usage_aggregator_quota = fields.UsageAggregatorQuotaField(
             get_children=lambda scope: scope.children.all(),
+            child_model=lambda: ChildModel,
+            path_to_scope='parent',
         )
         limit_aggregator_quota = fields.LimitAggregatorQuotaField(
             get_children=lambda scope: scope.children.all(), default_limit=0,
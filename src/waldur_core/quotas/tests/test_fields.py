@@ -2,6 +2,7 @@ from django.test import TransactionTestCase
 from reversion.models import Version
 
 from waldur_core.core.utils import silent_call
+from waldur_core.quotas import utils
 from waldur_core.quotas.tests import models as test_models
 
 
@@ -214,6 +215,24 @@ class TestUsageAggregatorField(TransactionTestCase):
             )
             self.assertEqual(quota.usage, usage_value)
 
+    def test_aggregator_usage_is_recalculated_once_in_deferred_mode(self):
+        usage_value = 10
+        with utils.deferred_aggregation():
+            for child in self.children:
+                quota = child.quotas.get(name=self.child_quota_field)
+                quota.usage = usage_value
+                quota.save()
+
+            quota = self.grandparent.quotas.get(name=self.grandparent_quota_field)
+            self.assertEqual(quota.usage, 0)
+
+        for parent in self.parents:
+            quota = parent.quotas.get(name=self.parent_quota_field)
+            self.assertEqual(quota.usage, usage_value)
+
+        quota = self.grandparent.quotas.get(name=self.grandparent_quota_field)
+        self.assertEqual(quota.usage, usage_value * len(self.children))
+
 
 class TestLimitAggregatorField(TransactionTestCase):
     def setUp(self):
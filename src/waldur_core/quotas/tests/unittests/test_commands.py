@@ -1,3 +1,5 @@
+from io import StringIO
+
 from django.core.management import call_command
 from django.test import TestCase
 
@@ -22,3 +24,12 @@ class RecalculateCommandTest(TestCase):
 
         call_command('recalculatequotas')
         self.assertEqual(customer.quotas.get(name='nc_resource_count').usage, 0)
+
+    def test_quotas_are_not_changed_in_dry_run_mode(self):
+        customer = structure_factories.CustomerFactory()
+        structure_factories.ProjectFactory(customer=customer)
+
+        customer.quotas.filter(name='nc_project_count').update(usage=10)
+
+        call_command('recalculatequotas', dry_run=True, stdout=StringIO())
+        self.assertEqual(customer.quotas.get(name='nc_project_count').usage, 10)
@@ -1,9 +1,13 @@
 import random
+from unittest import mock
 
 from django.test import TestCase
+from rest_framework import serializers
 
-from waldur_core.quotas import exceptions
-from waldur_core.quotas.tests.models import GrandparentModel
+from waldur_core.quotas import exceptions, models
+from waldur_core.quotas import serializers as quotas_serializers
+from waldur_core.quotas import signals, utils
+from waldur_core.quotas.tests.models import ChildModel, GrandparentModel, ParentModel
 
 
 class QuotaModelMixinTest(TestCase):
@@ -89,3 +93,137 @@ class QuotaModelMixinTest(TestCase):
             instances, quota_names=['regular_quota'], fields=['limit']
         )
         self.assertEqual({'regular_quota': -1}, sum_of_quotas)
+
+
+class ApplyQuotaUsageDeltasTest(TestCase):
+    def setUp(self):
+        self.grandparent = GrandparentModel.objects.create()
+        self.parent = ParentModel.objects.create(parent=self.grandparent)
+        self.child = ChildModel.objects.create(parent=self.parent)
+
+    def get_usage(self, scope, name):
+        return scope.quotas.get(name=name).usage
+
+    def test_usage_is_increased_for_all_scopes(self):
+        models.apply_quota_usage_deltas(
+            [
+                (self.grandparent, {'regular_quota': 5}),
+                (self.child, {'regular_quota': 3}),
+            ]
+        )
+        self.assertEqual(self.get_usage(self.grandparent, 'regular_quota'), 5)
+        self.assertEqual(self.get_usage(self.child, 'regular_quota'), 3)
+
+    def test_nothing_is_changed_if_one_of_quotas_is_over_limit(self):
+        with self.assertRaises(exceptions.QuotaValidationError):
+            models.apply_quota_usage_deltas(
+                [
+                    (self.grandparent, {'quota_with_default_limit': 200}),
+                    (self.child, {'regular_quota': 3}),
+                ],
+                validate=True,
+            )
+        self.assertEqual(self.get_usage(self.child, 'regular_quota'), 0)
+
+    def test_usage_is_not_decreased_below_zero(self):
+        models.apply_quota_usage_deltas([(self.child, {'regular_quota': -3})])
+        self.assertEqual(self.get_usage(self.child, 'regular_quota'), 0)
+
+    def test_usage_aggregator_quotas_are_updated(self):
+        models.apply_quota_usage_deltas([(self.child, {'usage_aggregator_quota': 7})])
+        self.assertEqual(self.get_usage(self.parent, 'usage_aggregator_quota'), 7)
+        self.assertEqual(self.get_usage(self.grandparent, 'usage_aggregator_quota'), 7)
+
+    def test_positive_deltas_are_applied_with_grouped_signal(self):
+        handler = mock.Mock()
+        signals.quotas_usage_updated.connect(handler, sender=models.Quota)
+        self.addCleanup(
+            signals.quotas_usage_updated.disconnect, handler, sender=models.Quota
+        )
+
+        with mock.patch('django.db.models.signals.post_save.send') as mock_send:
+            models.apply_quota_usage_deltas(
+                [
+                    (self.child, {'regular_quota': 5, 'usage_aggregator_quota': 7}),
+                    (self.grandparent, {'regular_quota': 5}),
+                ]
+            )
+            mock_send.assert_not_called()
+
+        handler.assert_called_once()
+        self.assertEqual(len(handler.call_args[1]['quotas']), 3)
+        self.assertEqual(self.get_usage(self.parent, 'usage_aggregator_quota'), 7)
+
+    def test_negative_deltas_are_applied_in_one_query_without_signals(self):
+        models.apply_quota_usage_deltas(
+            [
+                (self.child, {'regular_quota': 5, 'usage_aggregator_quota': 7}),
+                (self.grandparent, {'regular_quota': 5}),
+            ]
+        )
+        with mock.patch('django.db.models.signals.post_save.send') as mock_send:
+            with self.assertNumQueries(4):
+                # Savepoint, select for update, bulk update and savepoint release
+                models.apply_quota_usage_deltas(
+                    [
+                        (
+                            self.child,
+                            {'regular_quota': -2, 'usage_aggregator_quota': -3},
+                        ),
+                        (self.grandparent, {'regular_quota': -1}),
+                    ]
+                )
+            mock_send.assert_not_called()
+
+        self.assertEqual(self.get_usage(self.child, 'regular_quota'), 3)
+        self.assertEqual(self.get_usage(self.child, 'usage_aggregator_quota'), 4)
+        self.assertEqual(self.get_usage(self.grandparent, 'regular_quota'), 4)
+        # Same as add_quota_usage, decrease is not propagated to aggregators
+        self.assertEqual(self.get_usage(self.parent, 'usage_aggregator_quota'), 7)
+
+
+class QuotasSnapshotTest(TestCase):
+    def setUp(self):
+        self.grandparent = GrandparentModel.objects.create()
+        self.parent = ParentModel.objects.create(parent=self.grandparent)
+        self.child = ChildModel.objects.create(parent=self.parent)
+
+    def test_ancestors_quotas_are_loaded_once(self):
+        with utils.quotas_snapshot():
+            self.child.validate_quota_change({'regular_quota': 1})
+            with self.assertNumQueries(0):
+                self.grandparent.validate_quota_change({'quota_with_default_limit': 1})
+
+    def test_snapshot_is_invalidated_on_quota_change(self):
+        with utils.quotas_snapshot():
+            self.assertFalse(
+                self.grandparent.validate_quota_change({'quota_with_default_limit': 1})
+            )
+            self.grandparent.add_quota_usage('quota_with_default_limit', 100)
+            self.assertTrue(
+                self.grandparent.validate_quota_change({'quota_with_default_limit': 1})
+            )
+
+    def test_snapshot_is_invalidated_on_bulk_create(self):
+        with utils.quotas_snapshot():
+            self.assertFalse(self.child.validate_quota_change({'extra_quota': 1}))
+            models.Quota.objects.bulk_create(
+                [models.Quota(scope=self.child, name='extra_quota', limit=0)]
+            )
+            self.assertTrue(self.child.validate_quota_change({'extra_quota': 1}))
+
+    def test_list_serializer_reuses_prefetched_quotas(self):
+        class GrandparentSerializer(serializers.Serializer):
+            quotas = serializers.SerializerMethodField()
+
+            class Meta:
+                list_serializer_class = quotas_serializers.QuotasSnapshotListSerializer
+
+            def get_quotas(self, scope):
+                return sorted(quota.name for quota in scope.get_cached_quotas())
+
+        scopes = GrandparentModel.objects.prefetch_related('quotas')
+        list(scopes)
+        with self.assertNumQueries(0):
+            data = GrandparentSerializer(scopes, many=True).data
+        self.assertIn('regular_quota', data[0]['quotas'])
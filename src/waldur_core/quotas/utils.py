@@ -1,7 +1,218 @@
+import threading
+from contextlib import contextmanager
+
 from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Q
+
+from waldur_core.quotas import fields, models
 
-from waldur_core.quotas import models
+_locals = threading.local()
 
 
 def get_models_with_quotas():
     return [m for m in apps.get_models() if issubclass(m, models.QuotaModelMixin)]
+
+
+@contextmanager
+def deferred_aggregation():
+    """
+    Defer propagation of child quotas changes to aggregator quotas.
+
+    Inside of this block aggregator quotas are not updated on each child quota
+    change. Instead, they are marked as dirty and each of them is recalculated
+    only once when the block is exited. If the block is executed inside
+    of transaction, recalculation is postponed until transaction is committed.
+
+    It is useful for bulk operations, such as resources pulling or import,
+    which change a lot of child quotas of the same aggregator.
+    """
+    if is_aggregation_deferred():
+        # Nested block is flushed by the outer one.
+        yield
+        return
+
+    _locals.dirty_quotas = {}
+    try:
+        yield
+    finally:
+        dirty_quotas = _locals.dirty_quotas
+        del _locals.dirty_quotas
+        if dirty_quotas:
+            transaction.on_commit(lambda: recalculate_aggregator_quotas(dirty_quotas))
+
+
+def is_aggregation_deferred():
+    return hasattr(_locals, 'dirty_quotas')
+
+
+def mark_aggregator_quota_dirty(aggregator_quota):
+    _locals.dirty_quotas[aggregator_quota.pk] = (
+        aggregator_quota.scope,
+        aggregator_quota.get_field(),
+    )
+
+
+def get_aggregator_quotas(quota):
+    # aggregation is not supported for global quotas.
+    if quota.scope is None:
+        return []
+    quota_field = quota.get_field()
+    # usage aggregation should not count another usage aggregator field to avoid calls duplication.
+    if isinstance(quota_field, fields.UsageAggregatorQuotaField) or quota_field is None:
+        return []
+    return quota_field.get_aggregator_quotas(quota)
+
+
+def aggregate_quotas_usage(quotas):
+    """
+    Update aggregator quotas of changed child quotas once for the whole batch.
+
+    Each aggregator quota is recalculated only once even if many of its child
+    quotas are changed. If aggregation is deferred, they are marked as dirty instead.
+    """
+    dirty_quotas = {}
+    for quota in quotas:
+        for aggregator_quota in get_aggregator_quotas(quota):
+            dirty_quotas[aggregator_quota.pk] = (
+                aggregator_quota.scope,
+                aggregator_quota.get_field(),
+            )
+
+    if is_aggregation_deferred():
+        _locals.dirty_quotas.update(dirty_quotas)
+    else:
+        recalculate_aggregator_quotas(dirty_quotas)
+
+
+def recalculate_aggregator_quotas(dirty_quotas):
+    """
+    Recalculate each of aggregator quotas with a single SUM query.
+
+    dirty_quotas - dictionary where key is quota ID and value is pair
+    of quota scope and quota field.
+    """
+    for pk, (scope, field) in sorted(dirty_quotas.items()):
+        models.Quota.objects.filter(pk=pk).update(usage=field.get_current_usage(scope))
+
+
+def get_quota_usage_changes(model, quota_field, scopes=None):
+    """
+    Compare stored usage of quotas with usage computed by quota field.
+
+    Current usage of all scopes is computed by grouped queries.
+    Return list of (quota, current_usage) pairs for quotas that should be updated.
+    """
+    if scopes is None:
+        scopes = model.objects.all()
+    usages = quota_field.get_current_usages(scopes)
+    if usages is None:
+        return []
+    quotas = models.Quota.objects.filter(
+        content_type=ContentType.objects.get_for_model(model),
+        object_id__in=scopes.values('id'),
+        name=quota_field.name,
+    ).only('id', 'object_id', 'usage')
+    changes = []
+    for quota in quotas.iterator():
+        usage = usages.get(quota.object_id)
+        if usage is not None and quota.usage != usage:
+            changes.append((quota, usage))
+    return changes
+
+
+def recalculate_quotas_usage(model, quota_field, scopes=None, dry_run=False):
+    """
+    Recalculate usage of quotas for all scopes of the model at once.
+
+    Only changed quotas are written with bulk update.
+    Return list of (object_id, old_usage, new_usage) tuples.
+    """
+    changes = get_quota_usage_changes(model, quota_field, scopes)
+    report = [(quota.object_id, quota.usage, usage) for quota, usage in changes]
+    if not dry_run and changes:
+        for quota, usage in changes:
+            quota.usage = usage
+        models.Quota.objects.bulk_update(
+            [quota for quota, usage in changes], ['usage'], batch_size=1000
+        )
+    return report
+
+
+@contextmanager
+def quotas_snapshot():
+    """
+    Cache quotas of scopes within the block.
+
+    Quotas of scope and all its ancestors are loaded with a single query
+    on first access and then are read from the snapshot. It allows to validate
+    quotas of many scopes with a constant number of queries.
+    Snapshot is invalidated on any quota change.
+    """
+    if is_snapshot_enabled():
+        yield
+        return
+
+    _locals.snapshot = {}
+    try:
+        yield
+    finally:
+        del _locals.snapshot
+
+
+def is_snapshot_enabled():
+    return hasattr(_locals, 'snapshot')
+
+
+def invalidate_quotas_snapshot():
+    if is_snapshot_enabled():
+        _locals.snapshot.clear()
+
+
+def _get_scope_key(scope):
+    return ContentType.objects.get_for_model(scope).id, scope.id
+
+
+def load_quotas_snapshot(scopes):
+    """
+    Load quotas of all given scopes into the snapshot with a single query.
+
+    Snapshot is a dictionary where key is (content_type_id, object_id) pair
+    and value is a dictionary of scope quotas where key is quota name.
+    """
+    query = Q()
+    for scope in scopes:
+        key = _get_scope_key(scope)
+        if key in _locals.snapshot:
+            continue
+        prefetched = getattr(scope, '_prefetched_objects_cache', {})
+        if 'quotas' in prefetched:
+            _locals.snapshot[key] = {q.name: q for q in prefetched['quotas']}
+        else:
+            _locals.snapshot[key] = {}
+            query |= Q(content_type_id=key[0], object_id=key[1])
+
+    if query:
+        for quota in models.Quota.objects.filter(query):
+            key = (quota.content_type_id, quota.object_id)
+            _locals.snapshot[key][quota.name] = quota
+
+
+def get_scope_quotas(scope, include_ancestors=True):
+    """
+    Return dictionary of scope quotas where key is quota name.
+
+    If snapshot is enabled, quotas of scope ancestors are loaded too,
+    because they are usually validated together.
+    """
+    if not is_snapshot_enabled():
+        return {quota.name: quota for quota in scope.quotas.all()}
+
+    key = _get_scope_key(scope)
+    if key not in _locals.snapshot:
+        scopes = [scope]
+        if include_ancestors:
+            scopes.extend(scope.get_quota_ancestors())
+        load_quotas_snapshot(scopes)
+    return _locals.snapshot[key]
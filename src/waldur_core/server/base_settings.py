@@ -214,17 +214,22 @@ CACHES = {
 CELERY_BEAT_SCHEDULE = {
     'pull-service-properties': {
         'task': 'waldur_core.structure.ServicePropertiesListPullTask',
-        'schedule': timedelta(hours=24),
+        'schedule': timedelta(minutes=5),
         'args': (),
     },
     'pull-service-resources': {
         'task': 'waldur_core.structure.ServiceResourcesListPullTask',
-        'schedule': timedelta(hours=1),
+        'schedule': timedelta(minutes=5),
         'args': (),
     },
     'pull-service-subresources': {
         'task': 'waldur_core.structure.ServiceSubResourcesListPullTask',
-        'schedule': timedelta(hours=2),
+        'schedule': timedelta(minutes=5),
+        'args': (),
+    },
+    'flush-token-activity': {
+        'task': 'waldur_core.core.flush_token_activity',
+        'schedule': timedelta(minutes=1),
         'args': (),
     },
     'check-expired-permissions': {
@@ -267,7 +272,15 @@ WALDUR_CORE = {
     'ALLOW_SIGNUP_WITHOUT_INVITATION': True,
     'VALIDATE_INVITATION_EMAIL': False,
     'TOKEN_LIFETIME': timedelta(hours=1),
+    # Token activity is written to database at most once per interval
+    'TOKEN_ACTIVITY_INTERVAL': timedelta(minutes=1),
     'INVITATION_LIFETIME': timedelta(weeks=1),
+    # Service settings are pulled when their adaptive interval has passed.
+    # Interval is bounded by default interval of the pull multiplied by these factors.
+    'PULL_MIN_INTERVAL_FACTOR': 0.25,
+    'PULL_MAX_INTERVAL_FACTOR': 4,
+    # Number of simultaneous pulls against the same backend URL
+    'PULL_CONCURRENCY_PER_BACKEND': 2,
     'OWNERS_CAN_MANAGE_OWNERS': False,
     'OWNER_CAN_MANAGE_CUSTOMER': False,
     'BACKEND_FIELDS_EDITABLE': True,
@@ -309,6 +322,8 @@ WALDUR_CORE = {
     'ATTACHMENT_LINK_MAX_AGE': timedelta(hours=1),
     'EMAIL_CHANGE_URL': 'https://example.com/#/user_email_change/{code}/',
     'EMAIL_CHANGE_MAX_AGE': timedelta(days=1),
+    'COUNT_ESTIMATE_THRESHOLD': 10000,
+    'COUNT_CACHE_TIMEOUT': timedelta(minutes=1),
 }
 
 WALDUR_CORE_PUBLIC_SETTINGS = [
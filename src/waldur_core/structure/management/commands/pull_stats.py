@@ -0,0 +1,62 @@
+import prettytable
+from django.core.management.base import BaseCommand
+
+from waldur_core.structure import models
+
+COLUMNS = (
+    'Service settings',
+    'Kind',
+    'Interval, s',
+    'Next pull',
+    'Duration, s',
+    'Items',
+    'Changed',
+    'Pulls',
+    'Error rate',
+)
+
+
+class Command(BaseCommand):
+    help = "Prints statistics of background pulls of service settings."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--type', dest='type', default=None, help='Filter by service type.',
+        )
+        parser.add_argument(
+            '--kind',
+            dest='kind',
+            default=None,
+            choices=[
+                choice for (choice, _) in models.ServiceSettingsPullStats.Kinds.CHOICES
+            ],
+            help='Filter by kind of pull.',
+        )
+
+    def handle(self, *args, **options):
+        stats = models.ServiceSettingsPullStats.objects.select_related(
+            'service_settings'
+        ).order_by('-duration')
+        if options['type']:
+            stats = stats.filter(service_settings__type=options['type'])
+        if options['kind']:
+            stats = stats.filter(kind=options['kind'])
+
+        table = prettytable.PrettyTable(COLUMNS)
+        for item in stats:
+            table.add_row(
+                [
+                    item.service_settings,
+                    item.kind,
+                    item.interval,
+                    item.next_pull_at.strftime('%Y-%m-%d %H:%M:%S')
+                    if item.next_pull_at
+                    else '',
+                    '%.2f' % item.duration,
+                    item.items,
+                    item.changed_items,
+                    item.pulls,
+                    '%.2f' % item.error_rate,
+                ]
+            )
+        self.stdout.write(table.get_string())
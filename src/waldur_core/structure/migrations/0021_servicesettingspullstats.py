@@ -0,0 +1,81 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('structure', '0020_drop_servicecertification_model'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ServiceSettingsPullStats',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                (
+                    'kind',
+                    models.CharField(
+                        choices=[
+                            ('properties', 'Properties'),
+                            ('resources', 'Resources'),
+                            ('subresources', 'Subresources'),
+                        ],
+                        max_length=30,
+                    ),
+                ),
+                (
+                    'interval',
+                    models.PositiveIntegerField(
+                        help_text='Current interval between pulls in seconds.'
+                    ),
+                ),
+                (
+                    'next_pull_at',
+                    models.DateTimeField(blank=True, db_index=True, null=True),
+                ),
+                ('last_started', models.DateTimeField(blank=True, null=True)),
+                ('last_finished', models.DateTimeField(blank=True, null=True)),
+                (
+                    'duration',
+                    models.FloatField(
+                        default=0, help_text='Average duration of pull in seconds.'
+                    ),
+                ),
+                (
+                    'items',
+                    models.PositiveIntegerField(
+                        default=0, help_text='Number of items after the last pull.'
+                    ),
+                ),
+                (
+                    'changed_items',
+                    models.PositiveIntegerField(
+                        default=0, help_text='Number of items changed by the last pull.'
+                    ),
+                ),
+                ('pulls', models.PositiveIntegerField(default=0)),
+                ('errors', models.PositiveIntegerField(default=0)),
+                (
+                    'service_settings',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='pull_stats',
+                        to='structure.ServiceSettings',
+                    ),
+                ),
+            ],
+            options={
+                'ordering': ('service_settings', 'kind'),
+                'unique_together': {('service_settings', 'kind')},
+            },
+        ),
+    ]
@@ -948,6 +948,58 @@ class PrivateServiceSettings(ServiceSettings):
         verbose_name_plural = _('Private provider settings')
 
 
+class ServiceSettingsPullStats(models.Model):
+    """
+    Statistics of background pulls of service settings used for adaptive scheduling.
+    """
+
+    class Kinds:
+        PROPERTIES = 'properties'
+        RESOURCES = 'resources'
+        SUBRESOURCES = 'subresources'
+
+        CHOICES = (
+            (PROPERTIES, 'Properties'),
+            (RESOURCES, 'Resources'),
+            (SUBRESOURCES, 'Subresources'),
+        )
+
+    class Meta:
+        unique_together = ('service_settings', 'kind')
+        ordering = ('service_settings', 'kind')
+
+    service_settings = models.ForeignKey(
+        on_delete=models.CASCADE, to=ServiceSettings, related_name='pull_stats'
+    )
+    kind = models.CharField(max_length=30, choices=Kinds.CHOICES)
+    interval = models.PositiveIntegerField(
+        help_text=_('Current interval between pulls in seconds.')
+    )
+    next_pull_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    last_started = models.DateTimeField(null=True, blank=True)
+    last_finished = models.DateTimeField(null=True, blank=True)
+    duration = models.FloatField(
+        default=0, help_text=_('Average duration of pull in seconds.')
+    )
+    items = models.PositiveIntegerField(
+        default=0, help_text=_('Number of items after the last pull.')
+    )
+    changed_items = models.PositiveIntegerField(
+        default=0, help_text=_('Number of items changed by the last pull.')
+    )
+    pulls = models.PositiveIntegerField(default=0)
+    errors = models.PositiveIntegerField(default=0)
+
+    @property
+    def error_rate(self):
+        if not self.pulls:
+            return 0
+        return self.errors / self.pulls
+
+    def __str__(self):
+        return '%s (%s)' % (self.service_settings, self.kind)
+
+
 class Service(
     core_models.UuidMixin,
     core_models.DescendantMixin,
@@ -0,0 +1,221 @@
+"""
+Adaptive scheduling of background pulls of service settings.
+
+Each service settings object is pulled when its own interval has passed instead
+of being pulled on fixed schedule. The interval is shortened when the pull changes
+a lot of items and extended when nothing changes, when pull fails or when pull
+takes significant part of the interval. Changes are counted with aggregate
+queries over the items updated by each kind of pull: items which have been
+modified since the pull has started, created and deleted items.
+Number of simultaneous pulls against the same backend URL is limited using
+slots stored in cache.
+"""
+import hashlib
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+from waldur_core.structure import SupportedServices
+from waldur_core.structure import models as structure_models
+
+logger = logging.getLogger(__name__)
+
+# If pull changes more than this part of items, interval is shortened
+HIGH_CHANGE_RATIO = 0.1
+# Interval is not allowed to be shorter than duration of pull multiplied by this factor
+DURATION_FACTOR = 10
+# Weight of the last pull in average duration
+DURATION_WEIGHT = 0.3
+
+
+def get_interval_bounds(default_interval):
+    default = default_interval.total_seconds()
+    return (
+        int(default * settings.WALDUR_CORE['PULL_MIN_INTERVAL_FACTOR']),
+        int(default * settings.WALDUR_CORE['PULL_MAX_INTERVAL_FACTOR']),
+    )
+
+
+def get_due_settings(queryset, kind, now=None):
+    """
+    Filter service settings which have never been pulled or pull of which is due.
+    """
+    now = now or timezone.now()
+    not_due = structure_models.ServiceSettingsPullStats.objects.filter(
+        kind=kind, next_pull_at__gt=now
+    ).values_list('service_settings_id', flat=True)
+    return queryset.exclude(id__in=not_due)
+
+
+def get_backend_key(service_settings):
+    """
+    Service settings with the same backend URL share concurrency limit.
+    Settings without backend URL are limited by their type.
+    """
+    backend = service_settings.backend_url or service_settings.type
+    digest = hashlib.md5(backend.encode('utf-8')).hexdigest()  # noqa: S303
+    return 'pull_slot:%s' % digest
+
+
+def acquire_slot(service_settings, owner, timeout):
+    """
+    Return cache key of acquired slot or None if all slots of the backend are busy.
+    """
+    prefix = get_backend_key(service_settings)
+    for index in range(settings.WALDUR_CORE['PULL_CONCURRENCY_PER_BACKEND']):
+        key = '%s:%s' % (prefix, index)
+        if cache.add(key, owner, timeout):
+            return key
+
+
+def release_slot(key, owner):
+    if cache.get(key) == owner:
+        cache.delete(key)
+
+
+def get_resource_querysets(service_settings):
+    """
+    Return querysets of resources of the service settings except subresources.
+    """
+    return [
+        model.objects.filter(service_project_link__service__settings=service_settings)
+        for model in SupportedServices.get_service_name_resources(service_settings.type)
+        if not issubclass(model, structure_models.SubResource)
+    ]
+
+
+def get_subresource_querysets(service_settings):
+    """
+    Return querysets of subresources connected to service project links of the service settings.
+    """
+    service_models = SupportedServices.get_service_models().get(service_settings.type)
+    if not service_models:
+        return []
+    link_model = service_models['service_project_link']
+    return [
+        model.objects.filter(service_project_link__service__settings=service_settings)
+        for model in structure_models.SubResource.get_all_models()
+        if model._meta.get_field('service_project_link').related_model is link_model
+    ]
+
+
+def get_property_querysets(service_settings):
+    """
+    Return querysets of properties of the service settings.
+    Properties which are not connected to settings are skipped.
+    """
+    service_models = SupportedServices.get_service_models().get(service_settings.type)
+    if not service_models:
+        return []
+    return [
+        model.objects.filter(settings=service_settings)
+        for model in service_models['properties']
+        if issubclass(model, structure_models.ServiceProperty)
+    ]
+
+
+def get_items_state(querysets):
+    """
+    Return number of items and maximal primary key of each queryset.
+    """
+    return [
+        queryset.aggregate(items=Count('pk'), max_pk=Max('pk')) for queryset in querysets
+    ]
+
+
+def has_modified_field(model):
+    try:
+        model._meta.get_field('modified')
+    except FieldDoesNotExist:
+        return False
+    return True
+
+
+def count_changes(querysets, states, started):
+    """
+    Return total number of items and number of items which have been created,
+    updated or deleted since the pull has started. Items are considered updated
+    if their modification time has moved past start of the pull, because pulled
+    fields are saved only if they are changed. Updates of items without
+    modification time are not counted.
+    """
+    items = 0
+    changed_items = 0
+    for queryset, state in zip(querysets, states):
+        max_pk = state['max_pk'] or 0
+        aggregates = dict(
+            items=Count('pk'), created=Count('pk', filter=Q(pk__gt=max_pk)),
+        )
+        if has_modified_field(queryset.model):
+            aggregates['updated'] = Count(
+                'pk', filter=Q(pk__lte=max_pk, modified__gte=started)
+            )
+        result = queryset.aggregate(**aggregates)
+        deleted = max(state['items'] + result['created'] - result['items'], 0)
+        items += result['items']
+        changed_items += result['created'] + result.get('updated', 0) + deleted
+    return items, changed_items
+
+
+def get_next_interval(stats, default_interval, duration, changed_items, failed):
+    min_interval, max_interval = get_interval_bounds(default_interval)
+    interval = stats.interval or int(default_interval.total_seconds())
+
+    if failed:
+        interval *= 2
+    elif changed_items > HIGH_CHANGE_RATIO * max(stats.items, 1):
+        interval //= 2
+    elif changed_items == 0:
+        interval = int(interval * 1.5)
+
+    interval = max(interval, int(duration * DURATION_FACTOR))
+    return min(max(interval, min_interval), max_interval)
+
+
+def get_stats(service_settings, kind, default_interval):
+    stats, _ = structure_models.ServiceSettingsPullStats.objects.get_or_create(
+        service_settings=service_settings,
+        kind=kind,
+        defaults={'interval': int(default_interval.total_seconds())},
+    )
+    return stats
+
+
+def record_pull(stats, default_interval, started, items, changed_items, failed):
+    now = timezone.now()
+    duration = (now - started).total_seconds()
+
+    stats.interval = get_next_interval(
+        stats, default_interval, duration, changed_items, failed
+    )
+    if stats.pulls:
+        stats.duration = (
+            DURATION_WEIGHT * duration + (1 - DURATION_WEIGHT) * stats.duration
+        )
+    else:
+        stats.duration = duration
+    stats.last_started = started
+    stats.last_finished = now
+    stats.next_pull_at = started + timedelta(seconds=stats.interval)
+    stats.items = items
+    stats.changed_items = changed_items
+    stats.pulls += 1
+    if failed:
+        stats.errors += 1
+    stats.save()
+
+    logger.debug(
+        'Pull of %s for %s took %.2f seconds, %s of %s items have changed. '
+        'Next pull is scheduled at %s.',
+        stats.kind,
+        stats.service_settings,
+        duration,
+        changed_items,
+        items,
+        stats.next_pull_at,
+    )
@@ -214,11 +214,14 @@ class ProjectSerializer(
     core_serializers.AugmentedSerializerMixin,
     serializers.HyperlinkedModelSerializer,
 ):
-    quotas = quotas_serializers.BasicQuotaSerializer(many=True, read_only=True)
+    quotas = quotas_serializers.BasicQuotaSerializer(
+        source='get_cached_quotas', many=True, read_only=True
+    )
     services = serializers.SerializerMethodField()
 
     class Meta:
         model = models.Project
+        list_serializer_class = quotas_serializers.QuotasSnapshotListSerializer
         fields = (
             'url',
             'uuid',
@@ -319,7 +322,9 @@ class CustomerSerializer(
     service_managers = BasicUserSerializer(
         source='get_service_managers', many=True, read_only=True
     )
-    quotas = quotas_serializers.BasicQuotaSerializer(many=True, read_only=True)
+    quotas = quotas_serializers.BasicQuotaSerializer(
+        source='get_cached_quotas', many=True, read_only=True
+    )
 
     COUNTRIES = core_fields.CountryField.COUNTRIES
     if settings.WALDUR_CORE.get('COUNTRIES'):
@@ -340,6 +345,7 @@ class CustomerSerializer(
 
     class Meta:
         model = models.Customer
+        list_serializer_class = quotas_serializers.QuotasSnapshotListSerializer
         fields = (
             'url',
             'uuid',
@@ -1087,6 +1093,24 @@ class MoveProjectSerializer(serializers.Serializer):
     )
 
 
+class ServiceSettingsPullStatsSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = models.ServiceSettingsPullStats
+        fields = (
+            'kind',
+            'interval',
+            'next_pull_at',
+            'last_started',
+            'last_finished',
+            'duration',
+            'items',
+            'changed_items',
+            'pulls',
+            'errors',
+            'error_rate',
+        )
+
+
 class ServiceSettingsSerializer(
     PermissionFieldFilteringMixin,
     core_serializers.RestrictedSerializerMixin,
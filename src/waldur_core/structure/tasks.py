@@ -1,6 +1,7 @@
 import functools
 import logging
 from datetime import timedelta
+from uuid import uuid4
 
 from celery import shared_task
 from django.conf import settings
@@ -12,9 +13,12 @@ from django.utils import timezone
 from waldur_core.core import models as core_models
 from waldur_core.core import tasks as core_tasks
 from waldur_core.core import utils as core_utils
+from waldur_core.logging.loggers import buffered_events
+from waldur_core.quotas import utils as quotas_utils
 from waldur_core.quotas.exceptions import QuotaValidationError
 from waldur_core.structure import ServiceBackendError, SupportedServices
 from waldur_core.structure import models as structure_models
+from waldur_core.structure import pull_scheduler
 
 logger = logging.getLogger(__name__)
 
@@ -108,11 +112,6 @@ class BackgroundPullTask(core_tasks.BackgroundTask):
         else:
             self.on_pull_success(instance)
 
-    def is_equal(self, other_task, serialized_instance):
-        return self.name == other_task.get(
-            'name'
-        ) and serialized_instance in other_task.get('args', [])
-
     def pull(self, instance):
         """ Pull instance from backend.
 
@@ -161,9 +160,6 @@ class BackgroundListPullTask(core_tasks.BackgroundTask):
     model = NotImplemented
     pull_task = NotImplemented
 
-    def is_equal(self, other_task):
-        return self.name == other_task.get('name')
-
     def get_pulled_objects(self):
         States = self.model.States
         return self.model.objects.filter(state__in=[States.ERRED, States.OK]).exclude(
@@ -177,32 +173,115 @@ class BackgroundListPullTask(core_tasks.BackgroundTask):
 
 
 class ServiceListPullTask(BackgroundListPullTask):
+    """ Schedules pull of service settings which are due according to their pull statistics. """
+
     model = structure_models.ServiceSettings
 
     def get_pulled_objects(self):
         States = self.model.States
-        return self.model.objects.filter(
+        queryset = self.model.objects.filter(
             state__in=[States.ERRED, States.OK], is_active=True
         )
+        return pull_scheduler.get_due_settings(queryset, self.pull_task.kind)
+
+
+class ServiceSettingsPullTask(BackgroundPullTask):
+    """ Pull service settings and collect statistics used for adaptive scheduling.
+
+        Pull is skipped if maximal number of pulls against the same backend
+        is already running. In this case it is scheduled again on next run
+        of list pull task, because statistics is not updated.
+    """
 
+    kind = NotImplemented
+    default_interval = NotImplemented
+
+    def run(self, serialized_instance):
+        service_settings = core_utils.deserialize_instance(serialized_instance)
+        owner = self.request.id or str(uuid4())
+        slot = pull_scheduler.acquire_slot(service_settings, owner, self.lock_timeout)
+        if not slot:
+            logger.info(
+                'Pull of %s for %s is postponed because backend is busy.',
+                self.kind,
+                service_settings,
+            )
+            return
+
+        try:
+            stats = pull_scheduler.get_stats(
+                service_settings, self.kind, self.default_interval
+            )
+            started = timezone.now()
+            querysets = self.get_pulled_querysets(service_settings)
+            states = pull_scheduler.get_items_state(querysets)
+            failed = True
+            try:
+                self.pull(service_settings)
+                failed = False
+            except ServiceBackendError as e:
+                self.on_pull_fail(service_settings, e)
+            finally:
+                items, changed_items = pull_scheduler.count_changes(
+                    querysets, states, started
+                )
+                pull_scheduler.record_pull(
+                    stats,
+                    self.default_interval,
+                    started,
+                    items,
+                    changed_items,
+                    failed,
+                )
+            if not failed:
+                self.on_pull_success(service_settings)
+        finally:
+            pull_scheduler.release_slot(slot, owner)
+
+    def get_pulled_querysets(self, service_settings):
+        """ Return querysets of items which are updated by the pull. """
+        raise NotImplementedError(
+            'Pull task should implement get_pulled_querysets method.'
+        )
+
+
+class ServicePropertiesPullTask(ServiceSettingsPullTask):
+    kind = structure_models.ServiceSettingsPullStats.Kinds.PROPERTIES
+    default_interval = timedelta(hours=24)
 
-class ServicePropertiesPullTask(BackgroundPullTask):
     def pull(self, service_settings):
         backend = service_settings.get_backend()
         backend.pull_service_properties()
 
+    def get_pulled_querysets(self, service_settings):
+        return pull_scheduler.get_property_querysets(service_settings)
+
+
+class ServiceResourcesPullTask(ServiceSettingsPullTask):
+    kind = structure_models.ServiceSettingsPullStats.Kinds.RESOURCES
+    default_interval = timedelta(hours=1)
 
-class ServiceResourcesPullTask(BackgroundPullTask):
     @reraise_exceptions
     def pull(self, service_settings):
         backend = service_settings.get_backend()
-        backend.pull_resources()
+        with quotas_utils.deferred_aggregation(), buffered_events():
+            backend.pull_resources()
+
+    def get_pulled_querysets(self, service_settings):
+        return pull_scheduler.get_resource_querysets(service_settings)
 
 
-class ServiceSubResourcesPullTask(BackgroundPullTask):
+class ServiceSubResourcesPullTask(ServiceSettingsPullTask):
+    kind = structure_models.ServiceSettingsPullStats.Kinds.SUBRESOURCES
+    default_interval = timedelta(hours=2)
+
     def pull(self, service_settings):
         backend = service_settings.get_backend()
-        backend.pull_subresources()
+        with quotas_utils.deferred_aggregation(), buffered_events():
+            backend.pull_subresources()
+
+    def get_pulled_querysets(self, service_settings):
+        return pull_scheduler.get_subresource_querysets(service_settings)
 
 
 class ServicePropertiesListPullTask(ServiceListPullTask):
@@ -275,9 +354,6 @@ class SetErredStuckResources(core_tasks.BackgroundTask):
 
     name = 'waldur_core.structure.SetErredStuckResources'
 
-    def is_equal(self, other_task):
-        return self.name == other_task.get('name')
-
     def run(self):
         cutoff = timezone.now() - timedelta(hours=3)
         states = (
@@ -2,12 +2,16 @@ from datetime import timedelta
 from unittest import mock
 
 from ddt import data, ddt
+from django.core.cache import cache
 from django.test import TestCase
 from django.utils import timezone
 from freezegun import freeze_time
 
 from waldur_core.core import utils
-from waldur_core.structure import tasks
+from waldur_core.core.tests.helpers import override_waldur_core_settings
+from waldur_core.structure import ServiceBackendError
+from waldur_core.structure import models as structure_models
+from waldur_core.structure import pull_scheduler, tasks
 from waldur_core.structure.tests import factories, models
 
 
@@ -89,3 +93,122 @@ class ExceptionTest(TestCase):
             service_settings.type,
         )
         self.assertRaisesRegex(KeyError, error_message, task.pull, service_settings)
+
+
+@mock.patch.object(tasks.ServiceResourcesPullTask, 'pull')
+class ServiceSettingsPullSchedulingTest(TestCase):
+    def setUp(self):
+        self.service_settings = factories.ServiceSettingsFactory(
+            backend_url='https://example.com'
+        )
+        self.serialized = utils.serialize_instance(self.service_settings)
+        self.task = tasks.ServiceResourcesPullTask()
+        self.default_interval = int(self.task.default_interval.total_seconds())
+
+    def tearDown(self):
+        cache.clear()
+
+    def get_stats(self):
+        return structure_models.ServiceSettingsPullStats.objects.get(
+            service_settings=self.service_settings, kind=self.task.kind
+        )
+
+    def test_interval_is_extended_if_nothing_has_changed(self, pull):
+        self.task.run(self.serialized)
+        stats = self.get_stats()
+        self.assertEqual(stats.pulls, 1)
+        self.assertEqual(stats.interval, int(self.default_interval * 1.5))
+
+    def test_interval_is_extended_and_error_is_counted_if_pull_has_failed(self, pull):
+        pull.side_effect = ServiceBackendError('Unavailable')
+        self.task.run(self.serialized)
+        stats = self.get_stats()
+        self.assertEqual(stats.errors, 1)
+        self.assertEqual(stats.error_rate, 1)
+        self.assertEqual(stats.interval, self.default_interval * 2)
+
+    def test_settings_are_not_pulled_until_interval_has_passed(self, pull):
+        self.task.run(self.serialized)
+        queryset = structure_models.ServiceSettings.objects.filter(
+            id=self.service_settings.id
+        )
+        self.assertFalse(
+            pull_scheduler.get_due_settings(queryset, self.task.kind).exists()
+        )
+
+        with freeze_time(timezone.now() + timedelta(days=1)):
+            self.assertTrue(
+                pull_scheduler.get_due_settings(queryset, self.task.kind).exists()
+            )
+
+    @override_waldur_core_settings(PULL_CONCURRENCY_PER_BACKEND=1)
+    def test_pull_is_postponed_if_backend_is_busy(self, pull):
+        other_settings = factories.ServiceSettingsFactory(
+            backend_url=self.service_settings.backend_url
+        )
+        pull_scheduler.acquire_slot(other_settings, 'other-task', 60)
+
+        self.task.run(self.serialized)
+        pull.assert_not_called()
+        self.assertFalse(
+            structure_models.ServiceSettingsPullStats.objects.filter(
+                service_settings=self.service_settings
+            ).exists()
+        )
+
+
+@mock.patch.object(tasks.ServiceResourcesPullTask, 'pull')
+class ServiceSettingsPullChangesTest(TestCase):
+    def setUp(self):
+        self.service_settings = factories.ServiceSettingsFactory()
+        self.link = factories.TestServiceProjectLinkFactory(
+            service__settings=self.service_settings
+        )
+        self.instance = factories.TestNewInstanceFactory(service_project_link=self.link)
+        self.serialized = utils.serialize_instance(self.service_settings)
+
+    def tearDown(self):
+        cache.clear()
+
+    def run_task(self, task_class):
+        task_class().run(self.serialized)
+        return structure_models.ServiceSettingsPullStats.objects.get(
+            service_settings=self.service_settings, kind=task_class.kind
+        )
+
+    def test_backend_field_change_is_counted(self, pull):
+        def update_instance(service_settings):
+            self.instance.backend_id = 'updated-backend-id'
+            self.instance.save()
+
+        pull.side_effect = update_instance
+        stats = self.run_task(tasks.ServiceResourcesPullTask)
+        self.assertEqual(stats.items, 1)
+        self.assertEqual(stats.changed_items, 1)
+
+    def test_untouched_items_are_not_counted(self, pull):
+        stats = self.run_task(tasks.ServiceResourcesPullTask)
+        self.assertEqual(stats.items, 1)
+        self.assertEqual(stats.changed_items, 0)
+
+    def test_created_and_deleted_items_are_counted(self, pull):
+        def replace_instance(service_settings):
+            self.instance.delete()
+            factories.TestNewInstanceFactory(service_project_link=self.link)
+
+        pull.side_effect = replace_instance
+        stats = self.run_task(tasks.ServiceResourcesPullTask)
+        self.assertEqual(stats.items, 1)
+        self.assertEqual(stats.changed_items, 2)
+
+    @mock.patch.object(tasks.ServiceSubResourcesPullTask, 'pull')
+    def test_subresources_pull_counts_only_subresources(self, pull_subresources, pull):
+        def update_items(service_settings):
+            self.instance.backend_id = 'updated-backend-id'
+            self.instance.save()
+            factories.TestSubResourceFactory(service_project_link=self.link)
+
+        pull_subresources.side_effect = update_items
+        stats = self.run_task(tasks.ServiceSubResourcesPullTask)
+        self.assertEqual(stats.items, 1)
+        self.assertEqual(stats.changed_items, 1)
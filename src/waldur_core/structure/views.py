@@ -29,6 +29,7 @@ from rest_framework.response import Response
 from waldur_core.core import managers as core_managers
 from waldur_core.core import mixins as core_mixins
 from waldur_core.core import models as core_models
+from waldur_core.core import pagination as core_pagination
 from waldur_core.core import signals as core_signals
 from waldur_core.core import validators as core_validators
 from waldur_core.core import views as core_views
@@ -1045,6 +1046,20 @@ class ServiceSettingsViewSet(core_mixins.EagerLoadMixin, core_views.ActionsViewS
 
         return Response(stats, status=status.HTTP_200_OK)
 
+    @action(detail=True)
+    def pull_stats(self, request, uuid=None):
+        """
+        This endpoint returns statistics of background pulls of current service settings,
+        which is used for adaptive scheduling of pulls. Interval and duration are specified in seconds.
+        """
+        service_settings = self.get_object()
+        serializer = serializers.ServiceSettingsPullStatsSerializer(
+            service_settings.pull_stats.all(), many=True
+        )
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    pull_stats_permissions = [permissions.is_staff]
+
 
 class ServiceMetadataViewSet(viewsets.GenericViewSet):
     # Fix for schema generation
@@ -1682,6 +1697,7 @@ class ResourceViewSet(core_mixins.ExecutorMixin, core_views.ActionsViewSet):
 
     lookup_field = 'uuid'
     filter_backends = (filters.GenericRoleFilter, DjangoFilterBackend)
+    pagination_class = core_pagination.ApproximateCountLinkHeaderPagination
     metadata_class = ActionsMetadata
     unsafe_methods_permissions = [permissions.is_administrator]
     update_validators = partial_update_validators = [
@@ -10,6 +10,7 @@ class FreeIPAConfig(AppConfig):
         from waldur_core.core import models as core_models
         from waldur_core.quotas.fields import QuotaField
         from waldur_core.quotas import models as quota_models
+        from waldur_core.quotas import signals as quotas_signals
         from waldur_core.structure import models as structure_models
         from waldur_core.structure import signals as structure_signals
 
@@ -50,6 +51,12 @@ class FreeIPAConfig(AppConfig):
             dispatch_uid='waldur_freeipa.handlers.schedule_sync_on_quota_save',
         )
 
+        quotas_signals.quotas_usage_updated.connect(
+            handlers.schedule_sync_on_quotas_usage_update,
+            sender=quota_models.Quota,
+            dispatch_uid='waldur_freeipa.handlers.schedule_sync_on_quotas_usage_update',
+        )
+
         signals.post_save.connect(
             handlers.schedule_ssh_key_sync_when_key_is_created,
             sender=core_models.SshPublicKey,
@@ -21,6 +21,11 @@ def schedule_sync_on_quota_change(sender, instance, created=False, **kwargs):
     tasks.schedule_sync()
 
 
+def schedule_sync_on_quotas_usage_update(sender, quotas, **kwargs):
+    if any(quota.name == utils.QUOTA_NAME for quota in quotas):
+        tasks.schedule_sync()
+
+
 def log_profile_event(sender, instance, created=False, **kwargs):
     profile = instance
 
@@ -7,6 +7,7 @@ class AnalyticsConfig(AppConfig):
     verbose_name = 'Analytics'
 
     def ready(self):
+        from waldur_core.quotas import signals as quotas_signals
         from waldur_core.quotas.models import Quota
         from waldur_core.structure.models import ResourceMixin
 
@@ -18,6 +19,12 @@ class AnalyticsConfig(AppConfig):
             dispatch_uid='waldur_mastermind.analytics.handlers.update_daily_quotas',
         )
 
+        quotas_signals.quotas_usage_updated.connect(
+            handlers.update_daily_quotas_in_bulk,
+            sender=Quota,
+            dispatch_uid='waldur_mastermind.analytics.handlers.update_daily_quotas_in_bulk',
+        )
+
         for index, model in enumerate(ResourceMixin.get_all_models()):
             signals.post_save.connect(
                 handlers.log_resource_created,
@@ -51,3 +51,8 @@ def update_daily_quotas(sender, instance, created=False, **kwargs):
         date=timezone.now().date(),
         usage=instance.usage,
     )
+
+
+def update_daily_quotas_in_bulk(sender, quotas, **kwargs):
+    for quota in quotas:
+        update_daily_quotas(sender, quota)
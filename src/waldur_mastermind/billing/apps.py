@@ -8,6 +8,7 @@ class BillingConfig(AppConfig):
 
     def ready(self):
         from waldur_mastermind.invoices import models as invoices_models
+        from waldur_mastermind.invoices import signals as invoices_signals
 
         from . import handlers, models
 
@@ -40,6 +41,18 @@ class BillingConfig(AppConfig):
             dispatch_uid='waldur_mastermind.billing.process_invoice_item',
         )
 
+        invoices_signals.invoice_items_updated.connect(
+            handlers.process_invoice_items,
+            sender=invoices_models.InvoiceItem,
+            dispatch_uid='waldur_mastermind.billing.process_invoice_items',
+        )
+
+        signals.post_delete.connect(
+            handlers.process_invoice_item_deletion,
+            sender=invoices_models.InvoiceItem,
+            dispatch_uid='waldur_mastermind.billing.process_invoice_item_deletion',
+        )
+
         signals.post_save.connect(
             handlers.log_price_estimate_limit_update,
             sender=models.PriceEstimate,
@@ -1,8 +1,12 @@
 import logging
 
+from django.contrib.contenttypes.models import ContentType
 from django.db import transaction
+from django.db.models import F
 
 from waldur_core.structure import models as structure_models
+from waldur_mastermind.invoices import models as invoices_models
+from waldur_mastermind.invoices import utils as invoices_utils
 
 from . import log, models
 
@@ -33,22 +37,115 @@ def update_estimates_for_customer(customer):
         estimate.save(update_fields=['total'])
 
 
+PRICE_FIELDS = ('unit', 'unit_price', 'quantity', 'start', 'end')
+
+
+def is_current_invoice(invoice):
+    # Estimates contain total only for current month
+    return (
+        invoice.year == invoices_utils.get_current_year()
+        and invoice.month == invoices_utils.get_current_month()
+    )
+
+
+def update_estimates_total(deltas):
+    """
+    Apply price deltas to estimates using atomic F() update.
+
+    deltas - list of (model, object_id, delta) tuples.
+    Limit is validated only if total is increased.
+    """
+    total_deltas = {}
+    for model, object_id, delta in deltas:
+        if object_id:
+            key = (model, object_id)
+            total_deltas[key] = total_deltas.get(key, 0) + delta
+
+    with transaction.atomic():
+        for (model, object_id), delta in total_deltas.items():
+            if not delta:
+                continue
+            content_type = ContentType.objects.get_for_model(model)
+            if delta < 0:
+                models.PriceEstimate.objects.filter(
+                    content_type=content_type, object_id=object_id
+                ).update(total=F('total') + float(delta))
+                continue
+            estimate, _ = models.PriceEstimate.objects.get_or_create(
+                content_type=content_type, object_id=object_id
+            )
+            models.PriceEstimate.objects.filter(pk=estimate.pk).update(
+                total=F('total') + float(delta)
+            )
+            estimate.refresh_from_db(fields=['total'])
+            estimate.validate_limit()
+
+
 def process_invoice_item(sender, instance, created=False, **kwargs):
-    if (
-        not created
-        and not instance.tracker.has_changed('unit_price')
-        and not instance.tracker.has_changed('start')
-        and not instance.tracker.has_changed('end')
+    tracker = instance.tracker
+    if not created and not any(
+        tracker.has_changed(field) for field in PRICE_FIELDS + ('project_id',)
     ):
         return
-    if not instance.project:
+
+    invoice = instance.invoice
+    if not is_current_invoice(invoice):
         return
-    with transaction.atomic():
-        for scope in [instance.project, instance.project.customer]:
-            estimate, _ = models.PriceEstimate.objects.get_or_create(scope=scope)
-            estimate.update_total()
-            estimate.validate_limit()
-            estimate.save(update_fields=['total'])
+
+    price = instance.price
+    if created:
+        previous_price = 0
+        previous_project_id = None
+    else:
+        previous_price = get_previous_price(instance)
+        previous_project_id = tracker.previous('project_id')
+
+    # If item is moved to another project, its price is moved between estimates
+    update_estimates_total(
+        [
+            (structure_models.Customer, invoice.customer_id, price - previous_price),
+            (structure_models.Project, previous_project_id, -previous_price),
+            (structure_models.Project, instance.project_id, price),
+        ]
+    )
+
+
+def process_invoice_items(sender, items, **kwargs):
+    # Items are updated in bulk, so price deltas of all of them are applied together
+    deltas = []
+    for item in items:
+        if not is_current_invoice(item.invoice):
+            continue
+        delta = item.price - get_previous_price(item)
+        deltas.append((structure_models.Customer, item.invoice.customer_id, delta))
+        deltas.append((structure_models.Project, item.project_id, delta))
+    update_estimates_total(deltas)
+
+
+def process_invoice_item_deletion(sender, instance, **kwargs):
+    try:
+        invoice = instance.invoice
+    except invoices_models.Invoice.DoesNotExist:
+        return
+
+    if not is_current_invoice(invoice):
+        return
+
+    # Price of item is computed from values it had before deletion
+    price = get_previous_price(instance)
+    update_estimates_total(
+        [
+            (structure_models.Customer, invoice.customer_id, -price),
+            (structure_models.Project, instance.tracker.previous('project_id'), -price),
+        ]
+    )
+
+
+def get_previous_price(invoice_item):
+    previous_item = invoices_models.InvoiceItem(
+        **{field: invoice_item.tracker.previous(field) for field in PRICE_FIELDS}
+    )
+    return previous_item.price
 
 
 def log_price_estimate_limit_update(sender, instance, created=False, **kwargs):
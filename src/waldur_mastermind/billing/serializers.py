@@ -1,3 +1,4 @@
+from django.contrib.contenttypes.models import ContentType
 from django.db.models import Sum
 from django.utils.translation import ugettext_lazy as _
 from rest_framework import serializers
@@ -7,7 +8,8 @@ from waldur_core.core import signals as core_signals
 from waldur_core.structure import models as structure_models
 from waldur_core.structure import serializers as structure_serializers
 
-from ..invoices import utils
+from ..invoices import models as invoices_models
+from ..invoices import pricing, utils
 from . import models
 
 
@@ -95,54 +97,71 @@ class PriceEstimateSerializer(serializers.HyperlinkedModelSerializer):
         return estimates.aggregate(Sum('limit'))['limit__sum'] or 0
 
 
-class NestedPriceEstimateSerializer(serializers.HyperlinkedModelSerializer):
-    total = serializers.SerializerMethodField()
-    current = serializers.SerializerMethodField()
-    tax = serializers.SerializerMethodField()
-    tax_current = serializers.SerializerMethodField()
+def parse_period(context):
+    request = context['request']
 
-    def _parse_period(self):
-        request = self.context['request']
+    try:
+        year = int(request.query_params.get('year', ''))
+        month = int(request.query_params.get('month', ''))
 
-        try:
-            year = int(request.query_params.get('year', ''))
-            month = int(request.query_params.get('month', ''))
+        if not utils.check_past_date(year, month):
+            raise ValueError()
+
+    except ValueError:
+        year = month = None
 
-            if not utils.check_past_date(year, month):
-                raise ValueError()
+    return year, month
 
-        except ValueError:
-            year = month = None
 
-        return year, month
+def get_current_period():
+    return utils.get_current_year(), utils.get_current_month()
 
-    def _get_current_period(self):
-        return utils.get_current_year(), utils.get_current_month()
+
+class NestedPriceEstimateSerializer(serializers.HyperlinkedModelSerializer):
+    total = serializers.SerializerMethodField()
+    current = serializers.SerializerMethodField()
+    tax = serializers.SerializerMethodField()
+    tax_current = serializers.SerializerMethodField()
+
+    def _get_sums(self, obj, year, month, current):
+        """
+        Return tuple of price and tax of the scope for the period.
+        Sums prefetched for the whole list are used if available.
+        """
+        sums = core_serializers.get_prefetched_data(
+            self, PRICE_ESTIMATE_SUMS_PREFETCH_KEY
+        )
+        if sums is not None and (year, month, current) in sums:
+            return sums[(year, month, current)].get(obj.object_id, (0, 0))
+        return (
+            obj.get_total(year=year, month=month, current=current),
+            obj.get_tax(year=year, month=month, current=current),
+        )
 
     def get_total(self, obj):
-        year, month = self._parse_period()
+        year, month = parse_period(self.context)
 
         if year and month:
-            return obj.get_total(year=year, month=month)
+            return self._get_sums(obj, year, month, current=False)[0]
 
         return obj.total
 
     def get_current(self, obj):
-        year, month = self._parse_period()
+        year, month = parse_period(self.context)
         if not year and not month:
-            year, month = self._get_current_period()
-        return obj.get_total(year=year, month=month, current=True)
+            year, month = get_current_period()
+        return self._get_sums(obj, year, month, current=True)[0]
 
     def get_tax(self, obj):
-        year, month = self._parse_period()
+        year, month = parse_period(self.context)
         if not year or not month:
-            year, month = self._get_current_period()
+            year, month = get_current_period()
 
-        return obj.get_tax(year=year, month=month)
+        return self._get_sums(obj, year, month, current=False)[1]
 
     def get_tax_current(self, obj):
-        year, month = self._get_current_period()
-        return obj.get_tax(year=year, month=month, current=True)
+        year, month = get_current_period()
+        return self._get_sums(obj, year, month, current=True)[1]
 
     class Meta:
         model = models.PriceEstimate
@@ -155,10 +174,27 @@ class NestedPriceEstimateSerializer(serializers.HyperlinkedModelSerializer):
         }
 
 
+PRICE_ESTIMATES_PREFETCH_KEY = 'billing_price_estimates'
+PRICE_ESTIMATE_SUMS_PREFETCH_KEY = 'billing_price_estimate_sums'
+ESTIMATED_SCOPE_SERIALIZERS = (
+    structure_serializers.ProjectSerializer,
+    structure_serializers.CustomerSerializer,
+)
+
+
 def get_price_estimate(serializer, scope):
-    try:
-        estimate = models.PriceEstimate.objects.get(scope=scope)
-    except models.PriceEstimate.DoesNotExist:
+    content_type = ContentType.objects.get_for_model(scope)
+    estimates = core_serializers.get_prefetched_data(
+        serializer, PRICE_ESTIMATES_PREFETCH_KEY
+    )
+    if estimates is not None:
+        estimate = estimates.get((content_type.id, scope.id))
+    else:
+        estimate = models.PriceEstimate.objects.filter(
+            content_type=content_type, object_id=scope.id
+        ).first()
+
+    if estimate is None:
         return {
             'threshold': 0.0,
             'total': 0.0,
@@ -175,13 +211,60 @@ def get_price_estimate(serializer, scope):
 
 
 def add_price_estimate(sender, fields, **kwargs):
+    if not issubclass(sender, ESTIMATED_SCOPE_SERIALIZERS):
+        return
     fields['billing_price_estimate'] = serializers.SerializerMethodField()
     setattr(sender, 'get_billing_price_estimate', get_price_estimate)
 
 
-core_signals.pre_serializer_fields.connect(
-    sender=structure_serializers.ProjectSerializer, receiver=add_price_estimate,
-)
-core_signals.pre_serializer_fields.connect(
-    sender=structure_serializers.CustomerSerializer, receiver=add_price_estimate,
-)
+def get_scopes_sums(model, scope_ids, year, month, current):
+    items = invoices_models.InvoiceItem.objects.filter(
+        invoice__year=year, invoice__month=month
+    )
+    if model == structure_models.Project:
+        group_by = 'project_id'
+    else:
+        group_by = 'invoice__customer_id'
+    items = items.filter(**{group_by + '__in': scope_ids})
+    return pricing.get_items_sums(items, group_by, current)
+
+
+def prefetch_price_estimates(sender, instances, serializer, **kwargs):
+    if not issubclass(sender, ESTIMATED_SCOPE_SERIALIZERS):
+        return
+
+    model = type(instances[0])
+    content_type = ContentType.objects.get_for_model(model)
+    scope_ids = [instance.id for instance in instances]
+    estimates = models.PriceEstimate.objects.filter(
+        content_type=content_type, object_id__in=scope_ids,
+    )
+    core_serializers.set_prefetched_data(
+        serializer,
+        PRICE_ESTIMATES_PREFETCH_KEY,
+        {
+            (estimate.content_type_id, estimate.object_id): estimate
+            for estimate in estimates
+        },
+    )
+
+    # Sums used by NestedPriceEstimateSerializer are computed for all scopes at once
+    year, month = parse_period(serializer.context)
+    current_year, current_month = get_current_period()
+    periods = {(current_year, current_month, True)}
+    if year and month:
+        periods.add((year, month, False))
+        periods.add((year, month, True))
+    else:
+        periods.add((current_year, current_month, False))
+    core_serializers.set_prefetched_data(
+        serializer,
+        PRICE_ESTIMATE_SUMS_PREFETCH_KEY,
+        {period: get_scopes_sums(model, scope_ids, *period) for period in periods},
+    )
+
+
+# Receivers are connected for all serializers and filter them by class,
+# so that subclasses of project and customer serializers are supported too
+core_signals.pre_serializer_fields.connect(receiver=add_price_estimate)
+core_signals.pre_serializer_prefetch.connect(receiver=prefetch_price_estimates)
@@ -0,0 +1,60 @@
+import logging
+
+from celery import shared_task
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Sum
+
+from waldur_core.structure import models as structure_models
+from waldur_mastermind.invoices import models as invoices_models
+from waldur_mastermind.invoices import pricing
+from waldur_mastermind.invoices import utils as invoices_utils
+
+from . import models
+
+logger = logging.getLogger(__name__)
+
+
+def get_current_totals(group_by):
+    items = invoices_models.InvoiceItem.objects.filter(
+        invoice__year=invoices_utils.get_current_year(),
+        invoice__month=invoices_utils.get_current_month(),
+    )
+    rows = (
+        pricing.annotate_price(items)
+        .order_by()
+        .values(group_by)
+        .annotate(scope_total=Sum('computed_price'))
+        .values_list(group_by, 'scope_total')
+    )
+    return {object_id: float(total) for object_id, total in rows if object_id}
+
+
+@shared_task(name='waldur_mastermind.billing.reconcile_price_estimates')
+def reconcile_price_estimates():
+    """
+    Price estimates are updated incrementally when invoice items are changed.
+    Recalculate totals of all estimates for current month in order to fix drift.
+    """
+    totals_map = {
+        structure_models.Project: get_current_totals('project_id'),
+        structure_models.Customer: get_current_totals('invoice__customer_id'),
+    }
+    changed_estimates = []
+    for model, totals in totals_map.items():
+        content_type = ContentType.objects.get_for_model(model)
+        for estimate in models.PriceEstimate.objects.filter(content_type=content_type):
+            total = totals.get(estimate.object_id, 0)
+            if abs(estimate.total - total) > 0.001:
+                logger.info(
+                    'Price estimate total for %s with ID %s is fixed from %s to %s.',
+                    model.__name__,
+                    estimate.object_id,
+                    estimate.total,
+                    total,
+                )
+                estimate.total = total
+                changed_estimates.append(estimate)
+    models.PriceEstimate.objects.bulk_update(
+        changed_estimates, ['total'], batch_size=1000
+    )
+    return len(changed_estimates)
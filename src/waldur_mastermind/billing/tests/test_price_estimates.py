@@ -1,14 +1,17 @@
 import decimal
 
 from ddt import data, ddt
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from freezegun import freeze_time
 from rest_framework import status, test
 
 from waldur_core.structure.tests import factories as structure_factories
 from waldur_core.structure.tests import fixtures as structure_fixtures
-from waldur_mastermind.billing import exceptions, models
+from waldur_mastermind.billing import exceptions, models, tasks
 from waldur_mastermind.billing.tests import factories
 from waldur_mastermind.common import utils as common_utils
+from waldur_mastermind.invoices import models as invoices_models
 from waldur_mastermind.invoices.tests import factories as invoice_factories
 from waldur_mastermind.marketplace_support.tests import (
     fixtures as marketplace_support_fixtures,
@@ -126,6 +129,70 @@ class PriceEstimateAPITest(test.APITransactionTestCase):
         self.assertEqual(estimate['total'], 100)
         self.assertEqual(estimate['limit'], 200)
 
+    def test_price_estimates_are_prefetched_for_project_list(self):
+        other_project = structure_factories.ProjectFactory(
+            customer=self.fixture.customer
+        )
+        models.PriceEstimate.objects.filter(scope=self.fixture.project).update(
+            total=100
+        )
+        models.PriceEstimate.objects.filter(scope=other_project).update(total=200)
+        self.client.force_authenticate(self.fixture.staff)
+
+        response = self.client.get(structure_factories.ProjectFactory.get_list_url())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        totals = {
+            row['uuid']: row['billing_price_estimate']['total'] for row in response.data
+        }
+        self.assertEqual(totals[self.fixture.project.uuid.hex], 100)
+        self.assertEqual(totals[other_project.uuid.hex], 200)
+
+    @freeze_time('2017-11-15')
+    def test_price_estimate_sums_are_computed_for_all_listed_projects_at_once(self):
+        invoice = invoice_factories.InvoiceFactory(
+            customer=self.fixture.customer, tax_percent=10
+        )
+        projects = [
+            self.fixture.project
+        ] + structure_factories.ProjectFactory.create_batch(
+            3, customer=self.fixture.customer
+        )
+        for index, project in enumerate(projects):
+            invoice_factories.InvoiceItemFactory(
+                invoice=invoice,
+                project=project,
+                unit=invoices_models.InvoiceItem.Units.QUANTITY,
+                quantity=2,
+                unit_price=decimal.Decimal(10 * (index + 1)),
+            )
+        self.client.force_authenticate(self.fixture.staff)
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(
+                structure_factories.ProjectFactory.get_list_url()
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        items_queries = [
+            query
+            for query in context.captured_queries
+            if 'invoices_invoiceitem' in query['sql']
+        ]
+        self.assertLessEqual(len(items_queries), 2)
+
+        estimates = {
+            row['uuid']: row['billing_price_estimate'] for row in response.data
+        }
+        for project in projects:
+            estimate = models.PriceEstimate.objects.get(scope=project)
+            row = estimates[project.uuid.hex]
+            self.assertEqual(row['current'], estimate.get_total(2017, 11, current=True))
+            self.assertEqual(row['tax'], estimate.get_tax(2017, 11))
+            self.assertEqual(
+                row['tax_current'], estimate.get_tax(2017, 11, current=True)
+            )
+
 
 @ddt
 @freeze_time('2017-01-01')
@@ -430,3 +497,59 @@ class PriceEstimateThresholdApiTest(test.APITransactionTestCase):
         self.assertEqual(
             threshold, response.data['billing_price_estimate']['threshold']
         )
+
+
+@freeze_time('2017-01-01')
+class PriceEstimateDeltaTest(test.APITransactionTestCase):
+    def setUp(self):
+        self.fixture = structure_fixtures.ProjectFixture()
+        self.invoice = invoice_factories.InvoiceFactory(customer=self.fixture.customer)
+        self.item = invoice_factories.InvoiceItemFactory(
+            invoice=self.invoice,
+            project=self.fixture.project,
+            unit=invoices_models.InvoiceItem.Units.QUANTITY,
+            quantity=1,
+            unit_price=10,
+        )
+
+    def get_total(self, scope):
+        return models.PriceEstimate.objects.get(scope=scope).total
+
+    def test_price_difference_is_applied_to_estimates(self):
+        self.assertEqual(self.get_total(self.fixture.project), 10)
+        self.assertEqual(self.get_total(self.fixture.customer), 10)
+
+        self.item.unit_price = 15
+        self.item.save()
+
+        self.assertEqual(self.get_total(self.fixture.project), 15)
+        self.assertEqual(self.get_total(self.fixture.customer), 15)
+
+    def test_quantity_change_is_applied_to_estimates(self):
+        self.item.quantity = 3
+        self.item.save()
+
+        self.assertEqual(self.get_total(self.fixture.project), 30)
+        self.assertEqual(self.get_total(self.fixture.customer), 30)
+
+    def test_price_of_deleted_item_is_subtracted_from_estimates(self):
+        self.item.delete()
+
+        self.assertEqual(self.get_total(self.fixture.project), 0)
+        self.assertEqual(self.get_total(self.fixture.customer), 0)
+
+    def test_price_is_moved_to_estimate_of_new_project(self):
+        new_project = structure_factories.ProjectFactory(customer=self.fixture.customer)
+        self.item.project = new_project
+        self.item.save()
+
+        self.assertEqual(self.get_total(self.fixture.project), 0)
+        self.assertEqual(self.get_total(new_project), 10)
+        self.assertEqual(self.get_total(self.fixture.customer), 10)
+
+    def test_reconciliation_fixes_drift(self):
+        models.PriceEstimate.objects.filter(scope=self.fixture.project).update(
+            total=100
+        )
+        tasks.reconcile_price_estimates()
+        self.assertEqual(self.get_total(self.fixture.project), 10)
@@ -3,7 +3,7 @@ from django.contrib import admin
 from django.forms import ModelChoiceField
 from django.forms.models import ModelForm
 from django.forms.widgets import CheckboxInput
-from django.http import HttpResponse
+from django.http import Http404, HttpResponse
 from django.shortcuts import redirect
 from django.urls import reverse
 from django.utils.html import format_html
@@ -107,7 +107,12 @@ class InvoiceAdmin(
 
     def pdf_file_view(self, request, pk=None):
         invoice = models.Invoice.objects.get(id=pk)
-        file_response = HttpResponse(invoice.file, content_type='application/pdf')
+        if not invoice.has_file():
+            raise Http404()
+        with invoice.file.open('rb') as pdf_file:
+            file_response = HttpResponse(
+                pdf_file.read(), content_type='application/pdf'
+            )
         filename = invoice.get_filename()
         file_response[
             'Content-Disposition'
@@ -229,7 +234,22 @@ class PaymentAdmin(admin.ModelAdmin):
     list_display = ('profile', 'date_of_payment', 'sum')
 
 
+class RolloverShardAdmin(core_admin.ReadOnlyAdminMixin, admin.ModelAdmin):
+    list_display = (
+        'run_id',
+        'year',
+        'month',
+        'min_customer_id',
+        'max_customer_id',
+        'state',
+        'created_count',
+    )
+    list_filter = ('state', 'year', 'month')
+    search_fields = ('run_id',)
+
+
 admin.site.register(models.Invoice, InvoiceAdmin)
 admin.site.register(models.ServiceDowntime, ServiceDowntimeAdmin)
 admin.site.register(models.PaymentProfile, PaymentProfileAdmin)
 admin.site.register(models.Payment, PaymentAdmin)
+admin.site.register(models.RolloverShard, RolloverShardAdmin)
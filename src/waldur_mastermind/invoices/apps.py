@@ -31,12 +31,6 @@ class InvoiceConfig(AppConfig):
             dispatch_uid='waldur_mastermind.invoices.emit_invoice_created_event',
         )
 
-        signals.post_save.connect(
-            handlers.update_invoice_pdf,
-            sender=models.Invoice,
-            dispatch_uid='waldur_mastermind.invoices.update_invoice_pdf',
-        )
-
         signals.post_save.connect(
             handlers.set_project_name_on_invoice_item_creation,
             sender=models.InvoiceItem,
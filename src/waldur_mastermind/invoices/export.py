@@ -0,0 +1,91 @@
+"""
+Streaming export of invoice items.
+
+Items are fetched from database in chunks and CSV rows are yielded one by one,
+so that report for all invoices of the month is never kept in memory at once.
+Prices of items and invoices are calculated by database query.
+"""
+from csv import DictWriter
+
+from django.conf import settings
+from django.db.models import DecimalField, F, Sum, Window
+
+from . import models, pricing, serializers
+
+EXPORT_CHUNK_SIZE = 1000
+
+
+class Echo:
+    """ File-like object which returns written value instead of storing it. """
+
+    def write(self, value):
+        return value
+
+
+def get_export_serializer_class():
+    if settings.WALDUR_INVOICES['INVOICE_REPORTING'].get('USE_SAF'):
+        return serializers.SAFReportSerializer
+    return serializers.InvoiceItemReportSerializer
+
+
+def get_export_items(invoices):
+    """
+    Return queryset of non-empty items of given invoices annotated with
+    price, tax and total of the item and of the invoice it belongs to.
+    Annotation names match the ones expected by report serializers.
+    """
+    items = pricing.annotate_price(
+        models.InvoiceItem.objects.filter(invoice__in=invoices)
+    )
+    # Item total is zero only if its price is zero, because tax is not negative
+    items = items.exclude(computed_price=0)
+
+    tax_rate = F('invoice__tax_percent') / pricing.number(100)
+    invoice_price = Window(
+        Sum('computed_price'),
+        partition_by=[F('invoice_id')],
+        output_field=DecimalField(),
+    )
+    return (
+        items.select_related('invoice', 'invoice__customer')
+        .annotate(
+            report_price=F('computed_price'),
+            report_tax=pricing.decimal_expression(F('computed_price') * tax_rate),
+            report_invoice_price=invoice_price,
+        )
+        .annotate(
+            report_total=pricing.decimal_expression(
+                F('report_price') + F('report_tax')
+            ),
+            report_invoice_tax=pricing.decimal_expression(
+                F('report_invoice_price') * tax_rate
+            ),
+        )
+        .annotate(
+            report_invoice_total=pricing.decimal_expression(
+                F('report_invoice_price') + F('report_invoice_tax')
+            ),
+        )
+        .order_by('invoice_id', 'id')
+    )
+
+
+def iterate_export_rows(invoices, serializer_class=None):
+    serializer_class = serializer_class or get_export_serializer_class()
+    # Serializer fields are built only once and reused for every item
+    serializer = serializer_class()
+    items = get_export_items(invoices)
+    for item in items.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield serializer.to_representation(item)
+
+
+def stream_invoices_csv(invoices, serializer_class=None):
+    """ Yield CSV report for given invoices line by line. """
+    serializer_class = serializer_class or get_export_serializer_class()
+    fields = serializer_class.Meta.fields
+    csv_params = settings.WALDUR_INVOICES['INVOICE_REPORTING']['CSV_PARAMS']
+    writer = DictWriter(Echo(), fieldnames=fields, **csv_params)
+
+    yield writer.writerow(dict(zip(fields, fields)))
+    for row in iterate_export_rows(invoices, serializer_class):
+        yield writer.writerow(row)
@@ -38,6 +38,8 @@ class InvoicesExtension(WaldurExtension):
             'SEND_CUSTOMER_INVOICES': False,
             # The front-end invoice link template must include {uuid} parameter, e.g. http://example.com/invoice/{uuid}
             'INVOICE_LINK_TEMPLATE': '',
+            # Number of customers processed by single task during monthly invoices rollover
+            'ROLLOVER_SHARD_SIZE': 500,
         }
 
     @staticmethod
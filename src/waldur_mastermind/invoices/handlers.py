@@ -13,7 +13,7 @@ from waldur_core.core import utils as core_utils
 from waldur_mastermind.invoices import signals as cost_signals
 from waldur_mastermind.marketplace import models as marketplace_models
 
-from . import log, models, registrators, tasks
+from . import log, models, registrators
 
 logger = logging.getLogger(__name__)
 
@@ -202,19 +202,6 @@ def downtime_has_been_deleted(sender, instance, **kwargs):
     ).delete()
 
 
-def update_invoice_pdf(sender, instance, created=False, **kwargs):
-    if created:
-        return
-
-    invoice = instance
-
-    if not invoice.tracker.has_changed('current_cost'):
-        return
-
-    serialized_invoice = core_utils.serialize_instance(invoice)
-    tasks.create_invoice_pdf.delay(serialized_invoice)
-
-
 def projects_customer_has_been_changed(
     sender, project, old_customer, new_customer, created=False, **kwargs
 ):
@@ -0,0 +1,85 @@
+import time
+
+from django.db import transaction
+from django.utils import timezone
+
+from waldur_core.core.utils import DryRunCommand, month_start
+from waldur_mastermind.invoices import models, tasks
+
+
+class Command(DryRunCommand):
+    help = """Create invoices for the given month synchronously and report time
+    spent by each invoice item registrator. Notifications are not sent.
+    In dry run mode all changes are rolled back, so it could be used
+    to estimate duration of monthly invoices rollover.
+    If --run-id option is specified, failed shards of the sharded rollover
+    are processed again and rollover is finalized if all of its shards are done."""
+
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        now = timezone.now()
+        parser.add_argument(
+            '--year', type=int, default=now.year, help='Invoice year.',
+        )
+        parser.add_argument(
+            '--month', type=int, default=now.month, help='Invoice month.',
+        )
+        parser.add_argument(
+            '--run-id', help='ID of sharded rollover which failed shards are retried.',
+        )
+
+    def handle(self, dry_run, year, month, run_id, *args, **options):
+        if run_id:
+            self.retry_shards(run_id, dry_run)
+            return
+
+        date = month_start(timezone.datetime(year=year, month=month, day=1))
+        timings = {}
+
+        started = time.perf_counter()
+        if dry_run:
+            with transaction.atomic():
+                created_count = tasks.rollover_invoices(date, timings=timings)
+                transaction.set_rollback(True)
+        else:
+            created_count = tasks.rollover_invoices(date, timings=timings)
+        elapsed = time.perf_counter() - started
+
+        action = 'would be created' if dry_run else 'have been created'
+        self.stdout.write(
+            '%s invoices %s for %04d-%02d in %.2f seconds.'
+            % (created_count, action, year, month, elapsed)
+        )
+        if timings:
+            self.stdout.write('Time spent by registrators in seconds:')
+            for name, seconds in sorted(
+                timings.items(), key=lambda item: item[1], reverse=True
+            ):
+                self.stdout.write('  %-35s %10.2f' % (name, seconds))
+
+    def retry_shards(self, run_id, dry_run):
+        shards = models.RolloverShard.objects.filter(
+            run_id=run_id, state=models.RolloverShard.States.ERRED
+        )
+        if not shards.exists():
+            self.stdout.write('There are no failed shards of rollover %s.' % run_id)
+            return
+
+        for shard in shards:
+            if dry_run:
+                self.stdout.write('Shard would be retried: %s.' % shard)
+                continue
+            try:
+                created_count = tasks.process_rollover_shard(shard)
+            except Exception as e:
+                self.stdout.write('Shard has failed again: %s. Error: %s' % (shard, e))
+                tasks.complete_rollover_shard(
+                    shard.id, models.RolloverShard.States.ERRED, error_message=str(e)
+                )
+                continue
+            self.stdout.write(
+                '%s invoices have been created by shard: %s.' % (created_count, shard)
+            )
+            tasks.complete_rollover_shard(
+                shard.id, models.RolloverShard.States.DONE, created_count=created_count
+            )
@@ -0,0 +1,109 @@
+import base64
+import hashlib
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import migrations, models
+
+CUSTOMER_FIELDS = (
+    'name',
+    'address',
+    'country',
+    'email',
+    'postal',
+    'phone_number',
+    'bank_name',
+    'bank_account',
+    'vat_code',
+)
+
+
+def get_deployment_logo():
+    logo_path = settings.WALDUR_CORE['SITE_LOGO']
+    if logo_path:
+        with open(logo_path, 'rb') as image_file:
+            return base64.b64encode(image_file.read()).decode('utf-8')
+
+
+def get_invoice_pdf_version(invoice, item_fields, deployment_logo):
+    # The same as waldur_mastermind.invoices.utils.get_invoice_pdf_version
+    data = [
+        invoice.number,
+        invoice.year,
+        invoice.month,
+        invoice.state,
+        invoice.invoice_date,
+        invoice.due_date,
+        invoice.tax_percent,
+        sorted(settings.WALDUR_INVOICES['ISSUER_DETAILS'].items()),
+        settings.WALDUR_CORE['CURRENCY_NAME'],
+        deployment_logo,
+        [getattr(invoice.customer, field) for field in CUSTOMER_FIELDS],
+        list(invoice.items.order_by('id').values_list(*item_fields)),
+    ]
+    return hashlib.sha256(str(data).encode('utf-8')).hexdigest()
+
+
+def move_invoice_pdf_to_storage(apps, schema_editor):
+    Invoice = apps.get_model('invoices', 'Invoice')
+    InvoiceItem = apps.get_model('invoices', 'InvoiceItem')
+
+    item_fields = sorted(
+        field.attname
+        for field in InvoiceItem._meta.concrete_fields
+        if field.attname != 'invoice_id'
+    )
+    deployment_logo = get_deployment_logo()
+
+    for invoice in (
+        Invoice.objects.exclude(_file='').select_related('customer').iterator()
+    ):
+        content = base64.b64decode(invoice._file)
+        name = 'invoices/%s.pdf' % hashlib.sha256(content).hexdigest()
+        if not default_storage.exists(name):
+            default_storage.save(name, ContentFile(content))
+        # Stored PDF is considered to be up to date,
+        # so that it is not rendered again on first access.
+        version = get_invoice_pdf_version(invoice, item_fields, deployment_logo)
+        Invoice.objects.filter(id=invoice.id).update(file=name, file_version=version)
+
+
+def move_invoice_pdf_to_database(apps, schema_editor):
+    Invoice = apps.get_model('invoices', 'Invoice')
+
+    for invoice in Invoice.objects.exclude(file='').only('id', 'file').iterator():
+        if not default_storage.exists(invoice.file.name):
+            continue
+        with default_storage.open(invoice.file.name, 'rb') as pdf_file:
+            content = base64.b64encode(pdf_file.read()).decode('utf-8')
+        Invoice.objects.filter(id=invoice.id).update(_file=content)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('invoices', '0042_update_invoice_items_resource_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='invoice',
+            name='file',
+            field=models.FileField(
+                blank=True, editable=False, help_text='Invoice PDF.', upload_to='invoices',
+            ),
+        ),
+        migrations.AddField(
+            model_name='invoice',
+            name='file_version',
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                help_text='Hash of invoice data which has been rendered in PDF.',
+                max_length=64,
+            ),
+        ),
+        migrations.RunPython(move_invoice_pdf_to_storage, move_invoice_pdf_to_database),
+        migrations.RemoveField(model_name='invoice', name='_file',),
+    ]
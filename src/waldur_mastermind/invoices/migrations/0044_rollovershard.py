@@ -0,0 +1,70 @@
+import django.utils.timezone
+import model_utils.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('invoices', '0043_invoice_pdf_file'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RolloverShard',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                (
+                    'created',
+                    model_utils.fields.AutoCreatedField(
+                        default=django.utils.timezone.now,
+                        editable=False,
+                        verbose_name='created',
+                    ),
+                ),
+                (
+                    'modified',
+                    model_utils.fields.AutoLastModifiedField(
+                        default=django.utils.timezone.now,
+                        editable=False,
+                        verbose_name='modified',
+                    ),
+                ),
+                ('run_id', models.CharField(db_index=True, max_length=32)),
+                ('year', models.PositiveSmallIntegerField()),
+                ('month', models.PositiveSmallIntegerField()),
+                ('min_customer_id', models.PositiveIntegerField()),
+                (
+                    'max_customer_id',
+                    models.PositiveIntegerField(
+                        blank=True,
+                        help_text='Last shard of rollover is open-ended.',
+                        null=True,
+                    ),
+                ),
+                (
+                    'state',
+                    models.CharField(
+                        choices=[
+                            ('pending', 'Pending'),
+                            ('done', 'Done'),
+                            ('erred', 'Erred'),
+                        ],
+                        default='pending',
+                        max_length=30,
+                    ),
+                ),
+                ('created_count', models.PositiveIntegerField(default=0)),
+                ('error_message', models.TextField(blank=True)),
+            ],
+            options={'ordering': ('run_id', 'min_customer_id'),},
+        ),
+    ]
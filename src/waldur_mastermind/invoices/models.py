@@ -1,10 +1,8 @@
-import base64
 import datetime
 import decimal
 import logging
 from calendar import monthrange
 from datetime import timedelta
-from io import BytesIO
 
 from django.conf import settings
 from django.contrib.contenttypes.fields import GenericForeignKey
@@ -97,7 +95,15 @@ class Invoice(core_models.UuidMixin, models.Model):
         blank=True,
         help_text=_('Date then invoice moved from state pending to created.'),
     )
-    _file = models.TextField(blank=True, editable=False)
+    file = models.FileField(
+        upload_to='invoices', blank=True, editable=False, help_text=_('Invoice PDF.'),
+    )
+    file_version = models.CharField(
+        max_length=64,
+        blank=True,
+        editable=False,
+        help_text=_('Hash of invoice data which has been rendered in PDF.'),
+    )
 
     tracker = FieldTracker()
 
@@ -162,20 +168,8 @@ class Invoice(core_models.UuidMixin, models.Model):
         self.invoice_date = timezone.now().date()
         self.save(update_fields=['state', 'invoice_date'])
 
-    @property
-    def file(self):
-        if not self._file:
-            return
-
-        content = base64.b64decode(self._file)
-        return BytesIO(content)
-
-    @file.setter
-    def file(self, value):
-        self._file = value
-
     def has_file(self):
-        return bool(self._file)
+        return bool(self.file)
 
     def get_filename(self):
         return 'invoice_{}.pdf'.format(self.uuid)
@@ -463,6 +457,47 @@ class ServiceDowntime(models.Model):
             )
 
 
+class RolloverShard(core_models.TimeStampedModel):
+    """
+    Progress of monthly invoices rollover for range of customers.
+    Rollover is finalized only when all its shards are done.
+    """
+
+    class Meta:
+        ordering = ('run_id', 'min_customer_id')
+
+    class States:
+        PENDING = 'pending'
+        DONE = 'done'
+        ERRED = 'erred'
+
+        CHOICES = (
+            (PENDING, _('Pending')),
+            (DONE, _('Done')),
+            (ERRED, _('Erred')),
+        )
+
+    run_id = models.CharField(max_length=32, db_index=True)
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    min_customer_id = models.PositiveIntegerField()
+    max_customer_id = models.PositiveIntegerField(
+        null=True, blank=True, help_text=_('Last shard of rollover is open-ended.')
+    )
+    state = models.CharField(
+        max_length=30, choices=States.CHOICES, default=States.PENDING
+    )
+    created_count = models.PositiveIntegerField(default=0)
+    error_message = models.TextField(blank=True)
+
+    def __str__(self):
+        return 'Invoices rollover %s for customers from %s to %s' % (
+            self.run_id,
+            self.min_customer_id,
+            self.max_customer_id or '...',
+        )
+
+
 class PaymentType(models.CharField):
     FIXED_PRICE = 'fixed_price'
     MONTHLY_INVOICES = 'invoices'
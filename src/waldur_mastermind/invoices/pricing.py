@@ -0,0 +1,213 @@
+"""
+Database-side implementation of invoice items pricing.
+
+Expressions below mirror InvoiceItem.get_factor and InvoiceItem.price,
+so that prices of all items of many invoices are computed by PostgreSQL
+with a single aggregate query instead of loading every item into Python.
+Any change of pricing rules in models should be reflected here as well.
+"""
+import decimal
+
+from django.db.models import (
+    Case,
+    DateTimeField,
+    DecimalField,
+    ExpressionWrapper,
+    F,
+    Func,
+    Q,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Abs, Ceil, Floor, Least, Sign
+from django.utils import timezone
+
+from waldur_mastermind.common.mixins import UnitPriceMixin
+from waldur_mastermind.common.utils import quantize_price
+
+Units = UnitPriceMixin.Units
+
+
+class Numeric(Func):
+    template = '(%(expressions)s)::numeric'
+    output_field = DecimalField()
+
+
+class DayOfMonth(Func):
+    template = "EXTRACT(DAY FROM %(expressions)s AT TIME ZONE 'UTC')::numeric"
+    output_field = DecimalField()
+
+
+class DaysInMonth(Func):
+    template = (
+        "EXTRACT(DAY FROM DATE_TRUNC('month', %(expressions)s AT TIME ZONE 'UTC') "
+        "+ INTERVAL '1 month - 1 day')::numeric"
+    )
+    output_field = DecimalField()
+
+
+class SecondsBetween(Func):
+    """ Number of seconds between two datetime expressions: end - start """
+
+    arity = 2
+    arg_joiner = ' - '
+    template = 'EXTRACT(EPOCH FROM %(expressions)s)::numeric'
+    output_field = DecimalField()
+
+
+def number(value):
+    return Value(decimal.Decimal(value), output_field=DecimalField())
+
+
+def decimal_expression(expression):
+    return ExpressionWrapper(expression, output_field=DecimalField())
+
+
+def round_up(expression):
+    """ SQL counterpart of quantize_price: round away from zero to 2 decimal places. """
+    return decimal_expression(
+        Sign(expression) * Ceil(Abs(expression) * number(100)) / number(100)
+    )
+
+
+def annotate_factor(queryset, current=False, now=None):
+    """
+    Annotate invoice items queryset with computed_factor,
+    which is equal to the value returned by InvoiceItem.get_factor.
+    """
+    if current:
+        now = now or timezone.now()
+        end = Least(F('end'), Value(now, output_field=DateTimeField()))
+    else:
+        end = F('end')
+
+    queryset = queryset.annotate(
+        pricing_start_day=DayOfMonth(F('start')),
+        pricing_end_day=DayOfMonth(F('end')),
+        pricing_month_days=DaysInMonth(F('start')),
+    )
+
+    start_day = F('pricing_start_day')
+    end_day = F('pricing_end_day')
+    month_days = F('pricing_month_days')
+    half_month = decimal_expression(month_days / number(2))
+
+    full_hours = Ceil(SecondsBetween(end, F('start')) / number(60 * 60))
+    full_days = Ceil(SecondsBetween(end, F('start')) / number(24 * 60 * 60))
+    usage_days = Ceil(SecondsBetween(F('end'), F('start')) / number(24 * 60 * 60))
+    elapsed_days = Floor(SecondsBetween(F('end'), F('start')) / number(24 * 60 * 60))
+
+    half_month_factor = Case(
+        When(
+            Q(pricing_start_day=1, pricing_end_day=15)
+            | Q(pricing_start_day=16, pricing_end_day=month_days),
+            then=number(1),
+        ),
+        When(Q(pricing_start_day=1, pricing_end_day=month_days), then=number(2)),
+        When(
+            Q(pricing_start_day=1, pricing_end_day__gt=15),
+            then=round_up(number(1) + (end_day - number(15)) / half_month),
+        ),
+        When(
+            Q(pricing_start_day__lt=16, pricing_end_day=month_days),
+            then=round_up(number(1) + (number(16) - start_day) / half_month),
+        ),
+        default=round_up((end_day - start_day + number(1)) / half_month),
+        output_field=DecimalField(),
+    )
+
+    month_factor = Case(
+        When(Q(pricing_start_day=1, pricing_end_day=month_days), then=number(1)),
+        default=round_up((elapsed_days + number(1)) / month_days),
+        output_field=DecimalField(),
+    )
+
+    return queryset.annotate(
+        computed_factor=Case(
+            When(unit=Units.QUANTITY, then=Numeric(F('quantity'))),
+            When(unit=Units.PER_HOUR, then=full_hours),
+            When(unit=Units.PER_DAY, then=full_days if current else usage_days),
+            When(unit=Units.PER_HALF_MONTH, then=half_month_factor),
+            default=month_factor,
+            output_field=DecimalField(),
+        )
+    )
+
+
+def get_factor_value(computed_factor):
+    """
+    Convert computed_factor annotation to the value returned by InvoiceItem.get_factor,
+    which is integer unless factor is fractional.
+    """
+    if computed_factor == computed_factor.to_integral_value():
+        return int(computed_factor)
+    return computed_factor
+
+
+def annotate_price(queryset, current=False, now=None):
+    """
+    Annotate invoice items queryset with computed_price, which is equal
+    to InvoiceItem.price or to InvoiceItem.price_current if current is True.
+    """
+    queryset = annotate_factor(queryset, current, now)
+    return queryset.annotate(
+        computed_price=round_up(F('unit_price') * F('computed_factor'))
+    )
+
+
+def get_invoices_prices(invoices, current=False, now=None):
+    """
+    Return dictionary mapping invoice ID to the invoice price.
+    Price of all invoices is calculated using single aggregate query.
+    Invoices without items are not included.
+    """
+    from waldur_mastermind.invoices.models import InvoiceItem
+
+    items = annotate_price(
+        InvoiceItem.objects.filter(invoice__in=invoices), current, now
+    )
+    rows = (
+        items.order_by()
+        .values('invoice_id')
+        .annotate(invoice_price=Sum('computed_price'))
+        .values_list('invoice_id', 'invoice_price')
+    )
+    return {invoice_id: quantize_price(price) for invoice_id, price in rows}
+
+
+def get_invoices_totals(invoices, current=False, now=None):
+    """
+    Return dictionary mapping invoice ID to the tuple of price, tax and total,
+    which are equal to Invoice.price, Invoice.tax and Invoice.total properties
+    or to their current counterparts if current is True.
+    """
+    prices = get_invoices_prices(invoices, current, now)
+    totals = {}
+    for invoice_id, tax_percent in invoices.values_list('id', 'tax_percent'):
+        price = prices.get(invoice_id, decimal.Decimal('0.00'))
+        tax = price * tax_percent / 100
+        totals[invoice_id] = (price, tax, price + tax)
+    return totals
+
+
+def get_items_sums(items, group_by, current=False, now=None):
+    """
+    Return dictionary mapping value of group_by field of invoice items to the tuple
+    of sum of their prices and sum of their taxes, which are equal to sums of
+    InvoiceItem.price and InvoiceItem.tax or their current counterparts.
+    Sums for all groups are calculated using single aggregate query.
+    """
+    rows = (
+        annotate_price(items, current, now)
+        .order_by()
+        .values(group_by, 'invoice__tax_percent')
+        .annotate(items_price=Sum('computed_price'))
+        .values_list(group_by, 'invoice__tax_percent', 'items_price')
+    )
+    sums = {}
+    for key, tax_percent, price in rows:
+        total_price, total_tax = sums.get(key, (0, 0))
+        # Tax is computed per tax rate to keep the same precision as sum of item taxes
+        sums[key] = (total_price + price, total_tax + price * tax_percent / 100)
+    return sums
@@ -12,6 +12,8 @@ RegistrationManager represents the highest level of business logic and should be
 used for invoice items registration and termination.
 Registrators defines items creation and termination logic for each invoice item.
 """
+import time
+
 from django.contrib.contenttypes.models import ContentType
 from django.db import transaction
 from django.utils import timezone
@@ -126,7 +128,12 @@ class RegistrationManager:
         return cls._registrators[cls.get_key(source)]
 
     @classmethod
-    def get_or_create_invoice(cls, customer, date, **kwargs):
+    def get_or_create_invoice(cls, customer, date, timings=None, **kwargs):
+        """
+        Create invoice for given month and register items of all sources in it.
+        If timings dictionary is provided, time spent by each registrator
+        in seconds is accumulated in it using registrator class name as a key.
+        """
         from . import models
 
         invoice, created = models.Invoice.objects.get_or_create(
@@ -135,8 +142,12 @@ class RegistrationManager:
 
         if created:
             for registrator in cls.get_registrators():
+                started = time.perf_counter()
                 sources = registrator.get_sources(customer)
                 registrator.register(sources, invoice, date, **kwargs)
+                if timings is not None:
+                    name = registrator.__class__.__name__
+                    timings[name] = timings.get(name, 0) + time.perf_counter() - started
 
         return invoice, created
 
@@ -131,9 +131,7 @@ class InvoiceSerializer(
         }
 
     def get_file(self, obj):
-        if not obj.has_file():
-            return None
-
+        # PDF is rendered on demand, therefore link is provided even if file does not exist yet
         return reverse(
             'invoice-pdf',
             kwargs={'uuid': obj.uuid.hex},
@@ -146,6 +144,22 @@ class InvoiceSerializer(
         return serializer.data
 
 
+class ReportDecimalField(serializers.DecimalField):
+    """
+    Use value annotated by export query if it is available,
+    otherwise fall back to the value calculated by model property.
+    """
+
+    def __init__(self, annotation, **kwargs):
+        self.annotation = annotation
+        super(ReportDecimalField, self).__init__(**kwargs)
+
+    def get_attribute(self, instance):
+        if hasattr(instance, self.annotation):
+            return getattr(instance, self.annotation)
+        return super(ReportDecimalField, self).get_attribute(instance)
+
+
 class InvoiceItemReportSerializer(serializers.ModelSerializer):
     invoice_number = serializers.ReadOnlyField(source='invoice.number')
     invoice_uuid = serializers.ReadOnlyField(source='invoice.uuid')
@@ -200,8 +214,13 @@ class InvoiceItemReportSerializer(serializers.ModelSerializer):
 
     def build_field(self, field_name, info, model_class, nested_depth):
         if field_name in self.Meta.decimal_fields:
-            field_class = serializers.DecimalField
-            field_kwargs = dict(max_digits=20, decimal_places=2, coerce_to_string=True,)
+            field_class = ReportDecimalField
+            field_kwargs = dict(
+                max_digits=20,
+                decimal_places=2,
+                coerce_to_string=True,
+                annotation='report_%s' % field_name,
+            )
             default_kwargs = self.Meta.decimal_fields_extra_kwargs.get(field_name)
             if default_kwargs:
                 field_kwargs.update(default_kwargs)
@@ -292,10 +311,16 @@ class SAFReportSerializer(serializers.Serializer):
         return invoice_item.get_factor(False)
 
     def get_total(self, invoice_item):
-        return quantize_price(invoice_item.price)
+        price = getattr(invoice_item, 'report_price', None)
+        if price is None:
+            price = invoice_item.price
+        return quantize_price(price)
 
     def get_tax(self, invoice_item):
-        return quantize_price(invoice_item.tax)
+        tax = getattr(invoice_item, 'report_tax', None)
+        if tax is None:
+            tax = invoice_item.tax
+        return quantize_price(tax)
 
     def get_project(self, invoice_item):
         return settings.WALDUR_INVOICES['INVOICE_REPORTING']['SAF_PARAMS']['ARTPROJEKT']
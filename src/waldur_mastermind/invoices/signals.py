@@ -1,3 +1,4 @@
 import django.dispatch
 
 invoice_created = django.dispatch.Signal(providing_args=['invoice', 'issuer_details'])
+invoice_items_updated = django.dispatch.Signal(providing_args=['items'])
@@ -1,11 +1,11 @@
-import base64
 import logging
-from csv import DictWriter
-from io import StringIO
+import uuid
 
 import pdfkit
 from celery import chain, shared_task
 from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
 from django.db.models import Q
 from django.template.loader import render_to_string
 from django.utils import timezone
@@ -14,36 +14,207 @@ from waldur_core.core import utils as core_utils
 from waldur_core.structure import models as structure_models
 from waldur_mastermind.invoices.utils import get_previous_month
 
-from . import models, registrators, serializers, utils
+from . import export, models, registrators, utils
 
 logger = logging.getLogger(__name__)
 
 
-@shared_task(name='invoices.create_monthly_invoices')
-def create_monthly_invoices():
+def rollover_invoices(date, min_id=None, max_id=None, timings=None):
     """
-    - For every customer change state of the invoices for previous months from "pending" to "billed"
-      and freeze their items.
-    - Create new invoice for every customer in current month if not created yet.
+    - Change state of the pending invoices for previous months to "created"
+      for customers with ID in the given range.
+    - Create invoice for month of the given date for these customers if not created yet.
+
+    Every customer is processed in a separate transaction, therefore processing
+    could be safely restarted after failure: customers which already have
+    invoice for the current month are skipped.
     """
-    date = timezone.now()
+    customers = structure_models.Customer.objects.order_by('id')
+    if min_id is not None:
+        customers = customers.filter(id__gte=min_id)
+    if max_id is not None:
+        customers = customers.filter(id__lte=max_id)
 
     old_invoices = models.Invoice.objects.filter(
         Q(state=models.Invoice.States.PENDING, year__lt=date.year)
         | Q(state=models.Invoice.States.PENDING, year=date.year, month__lt=date.month)
-    )
+    ).filter(customer__in=customers)
     for invoice in old_invoices:
         invoice.set_created()
 
-    customers = structure_models.Customer.objects.all()
     if settings.WALDUR_CORE['ENABLE_ACCOUNTING_START_DATE']:
         customers = customers.filter(accounting_start_date__lt=timezone.now())
 
+    created_count = 0
     for customer in customers.iterator():
-        registrators.RegistrationManager.get_or_create_invoice(
-            customer, core_utils.month_start(date)
+        with transaction.atomic():
+            _, created = registrators.RegistrationManager.get_or_create_invoice(
+                customer, core_utils.month_start(date), timings=timings
+            )
+        created_count += created
+    return created_count
+
+
+@shared_task(name='invoices.create_monthly_invoices')
+def create_monthly_invoices():
+    """
+    Customers are split to shards of ROLLOVER_SHARD_SIZE customers by ID.
+    If there is only one shard, invoices are processed in the current task.
+    Otherwise every shard is processed by separate task and its progress is stored
+    in database, so that invoices are finalized when the last shard is done.
+    """
+    date = timezone.now()
+    shard_size = settings.WALDUR_INVOICES['ROLLOVER_SHARD_SIZE']
+    customer_ids = list(
+        structure_models.Customer.objects.order_by('id').values_list('id', flat=True)
+    )
+    shards = [
+        (chunk[0], chunk[-1]) for chunk in core_utils.chunks(customer_ids, shard_size)
+    ]
+    if shards:
+        # The last shard is open-ended, so that customers created
+        # after the list of customers has been fetched get invoices too
+        shards[-1] = (shards[-1][0], None)
+
+    if len(shards) <= 1:
+        rollover_invoices(date)
+        finalize_monthly_invoices()
+        return
+
+    run_id = uuid.uuid4().hex
+    shards = models.RolloverShard.objects.bulk_create(
+        models.RolloverShard(
+            run_id=run_id,
+            year=date.year,
+            month=date.month,
+            min_customer_id=min_id,
+            max_customer_id=max_id,
+        )
+        for min_id, max_id in shards
+    )
+    logger.info(
+        'Invoices rollover %s for %s customers has been split to %s shards.',
+        run_id,
+        len(customer_ids),
+        len(shards),
+    )
+    for shard in shards:
+        create_monthly_invoices_for_shard.delay(shard.id)
+
+
+def process_rollover_shard(shard):
+    """
+    Create invoices for customers of the shard and return number of created invoices.
+    """
+    date = core_utils.month_start(
+        timezone.datetime(year=shard.year, month=shard.month, day=1)
+    )
+    return rollover_invoices(date, shard.min_customer_id, shard.max_customer_id)
+
+
+def complete_rollover_shard(shard_id, state, created_count=0, error_message=''):
+    """
+    Store result of the shard and finalize invoices if all shards of rollover are done.
+    Shards of the same rollover are locked, so that exactly one of them finalizes it.
+    Finalization is held if any of the shards has failed.
+    """
+    if _store_rollover_shard_result(shard_id, state, created_count, error_message):
+        finalize_monthly_invoices.delay()
+
+
+def _store_rollover_shard_result(shard_id, state, created_count, error_message):
+    """
+    Return True if rollover should be finalized.
+    """
+    States = models.RolloverShard.States
+    with transaction.atomic():
+        run_id = (
+            models.RolloverShard.objects.filter(id=shard_id)
+            .values_list('run_id', flat=True)
+            .get()
+        )
+        shards = list(
+            models.RolloverShard.objects.filter(run_id=run_id)
+            .order_by('id')
+            .select_for_update()
+        )
+        shard = next(shard for shard in shards if shard.id == shard_id)
+        if shard.state == States.DONE:
+            # Shard has been already processed by another attempt
+            return False
+
+        shard.state = state
+        shard.created_count = created_count
+        shard.error_message = error_message
+        shard.save(update_fields=['state', 'created_count', 'error_message'])
+
+        states = {shard.state for shard in shards}
+        remaining = len([shard for shard in shards if shard.state == States.PENDING])
+        logger.info(
+            'Invoices rollover %s: shard for customers from %s to %s is %s, '
+            '%s invoices have been created, %s shards remaining.',
+            run_id,
+            shard.min_customer_id,
+            shard.max_customer_id,
+            state,
+            created_count,
+            remaining,
+        )
+        if States.PENDING in states:
+            return False
+        if States.ERRED in states:
+            logger.error(
+                'Invoices rollover %s is not finalized because some of its shards '
+                'have failed. Retry them using rollover_invoices --run-id %s command.',
+                run_id,
+                run_id,
+            )
+            return False
+        return True
+
+
+@shared_task(
+    name='invoices.create_monthly_invoices_for_shard',
+    bind=True,
+    max_retries=3,
+    default_retry_delay=60,
+)
+def create_monthly_invoices_for_shard(self, shard_id):
+    shard = models.RolloverShard.objects.get(id=shard_id)
+    if shard.state == models.RolloverShard.States.DONE:
+        return
+
+    try:
+        created_count = process_rollover_shard(shard)
+    except Exception as e:
+        if self.request.retries < self.max_retries:
+            logger.warning(
+                'Invoices rollover %s has failed for customers from %s to %s. '
+                'Task is going to be retried.',
+                shard.run_id,
+                shard.min_customer_id,
+                shard.max_customer_id,
+            )
+            raise self.retry(exc=e)
+        logger.exception(
+            'Invoices rollover %s has failed for customers from %s to %s '
+            'and retries are exhausted.',
+            shard.run_id,
+            shard.min_customer_id,
+            shard.max_customer_id,
         )
+        complete_rollover_shard(
+            shard.id, models.RolloverShard.States.ERRED, error_message=str(e)
+        )
+        return
+
+    complete_rollover_shard(
+        shard.id, models.RolloverShard.States.DONE, created_count=created_count
+    )
+
 
+@shared_task(name='invoices.finalize_monthly_invoices')
+def finalize_monthly_invoices():
     if settings.WALDUR_INVOICES['INVOICE_REPORTING']['ENABLE']:
         send_invoice_report.delay()
 
@@ -85,13 +256,14 @@ def send_invoice_notification(invoice_uuid):
     attachment = None
     content_type = None
 
-    if invoice._file:
+    if invoice.has_file():
         filename = '%s_%s_%s.pdf' % (
             settings.WALDUR_CORE['SITE_NAME'].replace(' ', '_'),
             invoice.year,
             invoice.month,
         )
-        attachment = base64.b64decode(invoice._file)
+        with invoice.file.open('rb') as pdf_file:
+            attachment = pdf_file.read()
         content_type = 'application/pdf'
 
     logger.debug(
@@ -129,8 +301,8 @@ def send_invoice_report():
             customer__accounting_start_date__lte=core_utils.month_end(date)
         )
 
-    # Report should not include customers with 0 invoice items.
-    invoices = [invoice for invoice in invoices if invoice.items.count() > 0]
+    # Report does not include empty invoice items, so customers
+    # without non-empty items are skipped as well.
     text_message = format_invoice_csv(invoices)
 
     # Please note that email body could be empty if there are no valid invoices
@@ -146,34 +318,10 @@ def send_invoice_report():
 
 
 def format_invoice_csv(invoices):
-    if not isinstance(invoices, list):
+    if isinstance(invoices, models.Invoice):
         invoices = [invoices]
 
-    csv_params = settings.WALDUR_INVOICES['INVOICE_REPORTING']['CSV_PARAMS']
-
-    if settings.WALDUR_INVOICES['INVOICE_REPORTING'].get('USE_SAF'):
-        fields = serializers.SAFReportSerializer.Meta.fields
-        stream = StringIO()
-        writer = DictWriter(stream, fieldnames=fields, **csv_params)
-        writer.writeheader()
-
-        for invoice in invoices:
-            items = utils.filter_invoice_items(invoice.items.all())
-            serializer = serializers.SAFReportSerializer(items, many=True)
-            writer.writerows(serializer.data)
-        return stream.getvalue()
-
-    fields = serializers.InvoiceItemReportSerializer.Meta.fields
-    stream = StringIO()
-    writer = DictWriter(stream, fieldnames=fields, **csv_params)
-    writer.writeheader()
-
-    for invoice in invoices:
-        items = utils.filter_invoice_items(invoice.items.all())
-        serializer = serializers.InvoiceItemReportSerializer(items, many=True)
-        writer.writerows(serializer.data)
-
-    return stream.getvalue()
+    return ''.join(export.stream_invoices_csv(invoices))
 
 
 @shared_task(name='invoices.update_invoices_current_cost')
@@ -181,14 +329,17 @@ def update_invoices_current_cost():
     year = utils.get_current_year()
     month = utils.get_current_month()
 
-    for invoice in models.Invoice.objects.filter(year=year, month=month):
-        invoice.update_current_cost()
+    invoices = models.Invoice.objects.filter(year=year, month=month)
+    utils.update_current_cost(invoices)
 
 
-@shared_task
+@shared_task(is_heavy_task=True)
 def create_invoice_pdf(serialized_invoice):
     invoice = core_utils.deserialize_instance(serialized_invoice)
-    utils.create_invoice_pdf(invoice)
+    try:
+        utils.create_invoice_pdf(invoice)
+    finally:
+        cache.delete(utils.get_invoice_pdf_lock_key(invoice))
 
 
 @shared_task
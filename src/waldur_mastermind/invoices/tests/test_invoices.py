@@ -12,6 +12,7 @@ from rest_framework import status, test
 
 from waldur_core.core.tests.helpers import override_waldur_core_settings
 from waldur_core.media.utils import dummy_image
+from waldur_core.server.celery import PriorityRouter
 from waldur_core.structure.tests import factories as structure_factories
 from waldur_mastermind.common.mixins import UnitPriceMixin
 from waldur_mastermind.invoices import models, tasks, utils
@@ -518,28 +519,89 @@ class InvoicePDFTest(test.APITransactionTestCase):
         utils.create_invoice_pdf(self.invoice)
         self.assertTrue(self.invoice.has_file())
 
-    @mock.patch('waldur_mastermind.invoices.handlers.tasks')
-    def test_create_invoice_pdf_is_not_called_if_invoice_cost_has_not_been_changed(
-        self, mock_tasks
+    @mock.patch('waldur_mastermind.invoices.utils.pdfkit')
+    def test_invoice_pdf_is_not_rendered_again_if_content_has_not_been_changed(
+        self, mock_pdfkit
     ):
-        with freeze_time('2019-01-02'):
-            invoice = factories.InvoiceFactory()
-            factories.InvoiceItemFactory(invoice=invoice, unit_price=Decimal(10))
-            self.assertEqual(mock_tasks.create_invoice_pdf.delay.call_count, 1)
-            invoice.update_current_cost()
-            self.assertEqual(mock_tasks.create_invoice_pdf.delay.call_count, 1)
+        mock_pdfkit.from_string.return_value = b'pdf_content'
+        utils.create_invoice_pdf(self.invoice)
+        utils.create_invoice_pdf(self.invoice)
+        self.assertEqual(mock_pdfkit.from_string.call_count, 1)
+        self.assertTrue(utils.is_invoice_pdf_actual(self.invoice))
+
+    @mock.patch('waldur_mastermind.invoices.utils.pdfkit')
+    def test_invoice_pdf_is_outdated_if_content_has_been_changed(self, mock_pdfkit):
+        mock_pdfkit.from_string.return_value = b'pdf_content'
+        utils.create_invoice_pdf(self.invoice)
+        factories.InvoiceItemFactory(invoice=self.invoice, unit_price=Decimal(10))
+        self.assertFalse(utils.is_invoice_pdf_actual(self.invoice))
+
+    @mock.patch('waldur_mastermind.invoices.utils.pdfkit')
+    def test_invoice_pdf_is_outdated_if_issuer_details_have_been_changed(
+        self, mock_pdfkit
+    ):
+        mock_pdfkit.from_string.return_value = b'pdf_content'
+        utils.create_invoice_pdf(self.invoice)
+        with test_utils.override_invoices_settings(
+            ISSUER_DETAILS={'company': 'New company'}
+        ):
+            self.assertFalse(utils.is_invoice_pdf_actual(self.invoice))
 
-    @mock.patch('waldur_mastermind.invoices.handlers.tasks')
-    def test_create_invoice_pdf_is_called_if_invoice_cost_has_been_changed(
-        self, mock_tasks
+    @mock.patch('waldur_mastermind.invoices.utils.render_invoice_html')
+    @mock.patch('waldur_mastermind.invoices.utils.pdfkit')
+    def test_pdf_freshness_is_checked_without_rendering_invoice(
+        self, mock_pdfkit, mock_render
+    ):
+        mock_render.return_value = '<html></html>'
+        mock_pdfkit.from_string.return_value = b'pdf_content'
+        utils.create_invoice_pdf(self.invoice)
+        mock_render.reset_mock()
+
+        self.assertTrue(utils.is_invoice_pdf_actual(self.invoice))
+        mock_render.assert_not_called()
+
+    def test_pdf_link_is_provided_before_file_is_rendered(self):
+        staff = structure_factories.UserFactory(is_staff=True)
+        self.client.force_authenticate(staff)
+        response = self.client.get(factories.InvoiceFactory.get_url(self.invoice))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['file'].endswith('/pdf/'))
+
+    @test_utils.override_invoices_settings(SEND_CUSTOMER_INVOICES=False)
+    @mock.patch('waldur_mastermind.invoices.tasks.send_invoice_report')
+    @mock.patch('waldur_mastermind.invoices.tasks.create_pdf_for_new_invoices')
+    def test_pdf_is_rendered_on_rollover_if_invoices_are_not_sent(
+        self, mock_task, mock_report
     ):
+        tasks.finalize_monthly_invoices()
+        mock_task.delay.assert_called_once_with()
+
+    @mock.patch('waldur_mastermind.invoices.tasks.create_invoice_pdf')
+    def test_invoice_cost_update_does_not_render_pdf(self, mock_task):
         with freeze_time('2019-01-02'):
             invoice = factories.InvoiceFactory()
             factories.InvoiceItemFactory(invoice=invoice, unit_price=Decimal(10))
-            self.assertEqual(mock_tasks.create_invoice_pdf.delay.call_count, 1)
-            factories.InvoiceItemFactory(invoice=invoice, unit_price=Decimal(10))
             invoice.update_current_cost()
-            self.assertEqual(mock_tasks.create_invoice_pdf.delay.call_count, 2)
+            self.assertEqual(mock_task.apply_async.call_count, 0)
+            self.assertEqual(mock_task.delay.call_count, 0)
+
+    @mock.patch('waldur_mastermind.invoices.tasks.create_invoice_pdf')
+    def test_pdf_rendering_is_scheduled_only_once(self, mock_task):
+        staff = structure_factories.UserFactory(is_staff=True)
+        self.client.force_authenticate(staff)
+        url = factories.InvoiceFactory.get_url(self.invoice, action='pdf')
+
+        for attempt in range(2):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        self.assertEqual(mock_task.delay.call_count, 1)
+
+    def test_pdf_rendering_is_routed_to_heavy_tasks_queue(self):
+        router = PriorityRouter()
+        self.assertEqual(
+            router.route_for_task(tasks.create_invoice_pdf.name), {'queue': 'heavy'}
+        )
 
 
 @ddt
@@ -0,0 +1,105 @@
+import datetime
+import decimal
+from unittest import mock
+
+from ddt import data, ddt
+from django.test import TestCase
+from django.utils import timezone
+from freezegun import freeze_time
+
+from waldur_mastermind.invoices import models, pricing, tasks
+from waldur_mastermind.invoices.tests import factories
+
+Units = models.InvoiceItem.Units
+
+PERIODS = (
+    # (start, end) of invoice item usage in November 2018
+    ((2018, 11, 1, 0, 0), (2018, 11, 30, 23, 59)),
+    ((2018, 11, 1, 0, 0), (2018, 11, 15, 23, 59)),
+    ((2018, 11, 16, 0, 0), (2018, 11, 30, 23, 59)),
+    ((2018, 11, 1, 0, 0), (2018, 11, 20, 10, 30)),
+    ((2018, 11, 5, 12, 0), (2018, 11, 30, 23, 59)),
+    ((2018, 11, 5, 12, 0), (2018, 11, 12, 8, 15)),
+    ((2018, 11, 20, 0, 0), (2018, 11, 20, 0, 0)),
+    ((2018, 11, 10, 0, 0), (2018, 11, 10, 5, 30)),
+)
+
+
+def make_datetime(value):
+    return datetime.datetime(*value, tzinfo=timezone.utc)
+
+
+@ddt
+@freeze_time('2018-11-18 13:45')
+class InvoicePricingParityTest(TestCase):
+    def setUp(self):
+        self.invoice = factories.InvoiceFactory(
+            tax_percent=decimal.Decimal('20.5'), month=11, year=2018
+        )
+        for start, end in PERIODS:
+            for unit_price in ('10.1234567', '0.0000001', '-3.3333333'):
+                factories.InvoiceItemFactory(
+                    invoice=self.invoice,
+                    unit=Units.PER_DAY,
+                    unit_price=decimal.Decimal(unit_price),
+                    quantity=7,
+                    start=make_datetime(start),
+                    end=make_datetime(end),
+                )
+        self.invoice.refresh_from_db()
+
+    def assert_parity(self):
+        invoices = models.Invoice.objects.filter(id=self.invoice.id)
+        items = {
+            item.id: item for item in pricing.annotate_factor(self.invoice.items.all())
+        }
+        for item in items.values():
+            self.assertEqual(item.computed_factor, item.get_factor(), item)
+
+        price, tax, total = pricing.get_invoices_totals(invoices)[self.invoice.id]
+        self.assertEqual(price, self.invoice.price)
+        self.assertEqual(tax, self.invoice.tax)
+        self.assertEqual(total, self.invoice.total)
+
+        price_current = pricing.get_invoices_prices(invoices, current=True)
+        self.assertEqual(price_current[self.invoice.id], self.invoice.price_current)
+
+    @data(
+        Units.QUANTITY,
+        Units.PER_HOUR,
+        Units.PER_DAY,
+        Units.PER_HALF_MONTH,
+        Units.PER_MONTH,
+    )
+    def test_database_price_is_equal_to_python_price(self, unit):
+        self.invoice.items.update(unit=unit)
+        self.assert_parity()
+
+    def test_current_cost_is_updated_by_task(self):
+        self.invoice.items.update(unit=Units.PER_HOUR)
+        models.Invoice.objects.filter(id=self.invoice.id).update(current_cost=0)
+
+        tasks.update_invoices_current_cost()
+
+        self.invoice.refresh_from_db()
+        self.assertEqual(
+            self.invoice.current_cost,
+            self.invoice.total_current.quantize(decimal.Decimal('0.01')),
+        )
+
+    def test_invoice_created_after_totals_are_calculated_is_skipped(self):
+        models.Invoice.objects.filter(id=self.invoice.id).update(current_cost=0)
+
+        with mock.patch.object(pricing, 'get_invoices_totals', return_value={}):
+            tasks.update_invoices_current_cost()
+
+        self.invoice.refresh_from_db()
+        self.assertEqual(self.invoice.current_cost, 0)
+
+    def test_invoice_without_items_has_zero_price(self):
+        self.invoice.items.all().delete()
+        invoices = models.Invoice.objects.filter(id=self.invoice.id)
+        self.assertEqual(
+            pricing.get_invoices_totals(invoices)[self.invoice.id][0],
+            self.invoice.price,
+        )
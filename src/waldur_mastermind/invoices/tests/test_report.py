@@ -2,11 +2,13 @@ import datetime
 from unittest import mock
 
 from django.test import TransactionTestCase
+from django.urls import reverse
 from django.utils import timezone
 from freezegun import freeze_time
 
 from waldur_core.core.tests.helpers import override_waldur_core_settings
-from waldur_mastermind.invoices import models, tasks
+from waldur_core.structure.tests import factories as structure_factories
+from waldur_mastermind.invoices import export, models, tasks
 from waldur_mastermind.invoices import utils as invoices_utils
 from waldur_mastermind.invoices.tasks import format_invoice_csv
 from waldur_mastermind.invoices.tests import factories, fixtures, utils
@@ -76,6 +78,32 @@ class GenericReportFormatterTest(BaseReportFormatterTest):
         self.assertEqual(3, len(lines))
         self.assertTrue('OFFERING-001' in ''.join(lines))
 
+    def test_prices_are_calculated_by_database(self):
+        self.resource.set_state_ok()
+        self.resource.save()
+        rows = list(export.iterate_export_rows([self.invoice]))
+        self.assertEqual(len(rows), 2)
+        for row in rows:
+            self.assertEqual(row['invoice_price'], '%.2f' % self.invoice.price)
+            self.assertEqual(row['invoice_total'], '%.2f' % self.invoice.total)
+
+        items = {item.name: item for item in self.invoice.items.all()}
+        for row in rows:
+            item = items[row['name']]
+            self.assertEqual(row['price'], '%.2f' % item.price)
+            self.assertEqual(row['total'], '%.2f' % item.total)
+
+    def test_report_is_streamed_by_api(self):
+        staff = structure_factories.UserFactory(is_staff=True)
+        self.client.force_login(staff)
+        response = self.client.get(
+            reverse('invoice-export'), {'customer_uuid': self.customer.uuid.hex}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content).decode()
+        self.assertEqual(content, format_invoice_csv(self.invoice))
+
 
 INVOICE_REPORTING = {
     'ENABLE': True,
@@ -1,8 +1,10 @@
 from datetime import timedelta
+from io import StringIO
 from unittest import mock
 
 from ddt import data, ddt
 from django.core import mail
+from django.core.management import call_command
 from django.test import TestCase, override_settings
 from django.utils import timezone
 from freezegun import freeze_time
@@ -92,6 +94,96 @@ class CheckAccountingStartDateTest(TestCase):
             )
 
 
+@override_settings(task_always_eager=True)
+@test_utils.override_invoices_settings(ROLLOVER_SHARD_SIZE=1)
+@mock.patch('waldur_mastermind.invoices.tasks.finalize_monthly_invoices')
+class ShardedRolloverTest(TestCase):
+    def test_invoices_are_created_for_all_shards(self, mock_finalize):
+        with freeze_time('2020-01-15'):
+            old_invoice = factories.InvoiceFactory()
+            customers = structure_factories.CustomerFactory.create_batch(2)
+
+        with freeze_time('2020-02-01'):
+            tasks.create_monthly_invoices()
+
+        old_invoice.refresh_from_db()
+        self.assertEqual(old_invoice.state, models.Invoice.States.CREATED)
+        for customer in customers + [old_invoice.customer]:
+            self.assertTrue(
+                models.Invoice.objects.filter(
+                    customer=customer, year=2020, month=2
+                ).exists()
+            )
+        mock_finalize.delay.assert_called_once()
+
+    def create_shard(self, customer, run_id='run', **kwargs):
+        return models.RolloverShard.objects.create(
+            run_id=run_id,
+            year=2020,
+            month=2,
+            min_customer_id=customer.id,
+            max_customer_id=customer.id,
+            **kwargs
+        )
+
+    def test_retried_shard_is_not_processed_twice(self, mock_finalize):
+        customer = structure_factories.CustomerFactory()
+        shard = self.create_shard(customer)
+        self.create_shard(customer)
+
+        for _ in range(2):
+            tasks.create_monthly_invoices_for_shard(shard.id)
+
+        shard.refresh_from_db()
+        self.assertEqual(shard.state, models.RolloverShard.States.DONE)
+        self.assertEqual(shard.created_count, 1)
+        self.assertEqual(
+            models.Invoice.objects.filter(
+                customer=customer, year=2020, month=2
+            ).count(),
+            1,
+        )
+        mock_finalize.delay.assert_not_called()
+
+    @mock.patch('waldur_mastermind.invoices.tasks.rollover_invoices')
+    def test_rollover_is_not_finalized_if_shard_has_failed(
+        self, mock_rollover, mock_finalize
+    ):
+        mock_rollover.side_effect = ValueError()
+        customer = structure_factories.CustomerFactory()
+        shard = self.create_shard(customer)
+
+        tasks.create_monthly_invoices_for_shard.apply(
+            args=(shard.id,),
+            retries=tasks.create_monthly_invoices_for_shard.max_retries,
+        )
+
+        shard.refresh_from_db()
+        self.assertEqual(shard.state, models.RolloverShard.States.ERRED)
+        mock_finalize.delay.assert_not_called()
+
+    def test_rollover_is_finalized_when_failed_shard_is_retried(self, mock_finalize):
+        customer = structure_factories.CustomerFactory()
+        self.create_shard(customer, state=models.RolloverShard.States.DONE)
+        shard = self.create_shard(customer, state=models.RolloverShard.States.ERRED)
+
+        call_command('rollover_invoices', run_id='run', stdout=StringIO())
+
+        shard.refresh_from_db()
+        self.assertEqual(shard.state, models.RolloverShard.States.DONE)
+        mock_finalize.delay.assert_called_once()
+
+    @mock.patch('waldur_mastermind.invoices.tasks.create_monthly_invoices_for_shard')
+    def test_last_shard_is_open_ended(self, mock_shard_task, mock_finalize):
+        customers = structure_factories.CustomerFactory.create_batch(2)
+
+        tasks.create_monthly_invoices()
+
+        shards = [call[0][3:] for call in mock_shard_task.delay.call_args_list]
+        self.assertEqual(shards[-1], (customers[-1].id, None))
+        self.assertTrue(all(max_id for _, max_id in shards[:-1]))
+
+
 @override_settings(task_always_eager=True)
 @test_utils.override_invoices_settings(
     INVOICE_LINK_TEMPLATE='http://example.com/invoice/{uuid}'
@@ -1,5 +1,6 @@
 import base64
 import datetime
+import hashlib
 import logging
 import re
 from calendar import monthrange
@@ -7,6 +8,10 @@ from decimal import Decimal
 
 import pdfkit
 from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
 from django.db.models import Sum
 from django.template.loader import render_to_string
 from django.utils import timezone
@@ -14,10 +19,12 @@ from django.utils import timezone
 from waldur_core.core import utils as core_utils
 from waldur_mastermind.common.mixins import UnitPriceMixin
 
-from . import models
+from . import models, pricing, signals
 
 logger = logging.getLogger(__name__)
 
+INVOICE_PDF_LOCK_TIMEOUT = 10 * 60
+
 
 def get_current_month():
     return timezone.now().month
@@ -92,32 +99,156 @@ def get_previous_month():
     return datetime.date(year, month, 1)
 
 
+def update_current_cost(invoices):
+    """
+    Compute current cost of invoices with single aggregate query
+    and write changed values with single bulk update.
+    """
+    totals = pricing.get_invoices_totals(invoices, current=True)
+    changed_invoices = []
+    for invoice in invoices:
+        # Invoice may be created after totals have been calculated
+        if invoice.id not in totals:
+            continue
+        total_current = totals[invoice.id][2]
+        if invoice.current_cost != total_current:
+            invoice.current_cost = total_current
+            changed_invoices.append(invoice)
+    models.Invoice.objects.bulk_update(changed_invoices, ['current_cost'])
+
+
+def bulk_update_invoice_items(items, fields):
+    """
+    Update invoice items with single query instead of saving them one by one.
+    Instead of post_save signal, invoice_items_updated signal is sent once
+    for all items, so that receivers adjust dependent totals in grouped form.
+    Previous values of items are still available via their field trackers.
+    Current cost of affected invoices is updated once per invoice.
+    """
+    items = list(items)
+    if not items:
+        return
+    models.InvoiceItem.objects.bulk_update(items, fields)
+    signals.invoice_items_updated.send(sender=models.InvoiceItem, items=items)
+    for item in items:
+        item.tracker.set_saved_fields()
+
+    invoice_ids = {item.invoice_id for item in items}
+    transaction.on_commit(
+        lambda: update_current_cost(models.Invoice.objects.filter(id__in=invoice_ids))
+    )
+
+
 def filter_invoice_items(items):
     return [
         item for item in items if item.total != 0
     ]  # skip empty, but leave in credit and debit
 
 
-def create_invoice_pdf(invoice):
-    all_items = filter_invoice_items(invoice.items.all())
+def get_deployment_logo():
     logo_path = settings.WALDUR_CORE['SITE_LOGO']
     if logo_path:
         with open(logo_path, 'rb') as image_file:
-            deployment_logo = base64.b64encode(image_file.read()).decode("utf-8")
-    else:
-        deployment_logo = None
+            return base64.b64encode(image_file.read()).decode("utf-8")
 
+
+def render_invoice_html(invoice):
+    all_items = filter_invoice_items(invoice.items.all())
     context = dict(
         invoice=invoice,
         issuer_details=settings.WALDUR_INVOICES['ISSUER_DETAILS'],
         currency=settings.WALDUR_CORE['CURRENCY_NAME'],
-        deployment_logo=deployment_logo,
+        deployment_logo=get_deployment_logo(),
         items=all_items,
     )
-    html = render_to_string('invoices/invoice.html', context)
+    return render_to_string('invoices/invoice.html', context)
+
+
+def get_invoice_pdf_version(invoice):
+    """
+    Return hash of invoice data which is rendered in PDF. It covers the same
+    context as render_invoice_html, but is computed using single query for
+    invoice items, so that it is cheap to check if PDF is up to date
+    without rendering invoice again.
+    """
+    customer = invoice.customer
+    # Fields are sorted so that version does not depend on their declaration order
+    item_fields = sorted(
+        field.attname
+        for field in models.InvoiceItem._meta.concrete_fields
+        if field.attname != 'invoice_id'
+    )
+    data = [
+        invoice.number,
+        invoice.year,
+        invoice.month,
+        invoice.state,
+        invoice.invoice_date,
+        invoice.due_date,
+        invoice.tax_percent,
+        sorted(settings.WALDUR_INVOICES['ISSUER_DETAILS'].items()),
+        settings.WALDUR_CORE['CURRENCY_NAME'],
+        get_deployment_logo(),
+        [
+            getattr(customer, field)
+            for field in (
+                'name',
+                'address',
+                'country',
+                'email',
+                'postal',
+                'phone_number',
+                'bank_name',
+                'bank_account',
+                'vat_code',
+            )
+        ],
+        list(invoice.items.order_by('id').values_list(*item_fields)),
+    ]
+    return hashlib.sha256(str(data).encode('utf-8')).hexdigest()
+
+
+def is_invoice_pdf_actual(invoice):
+    if not invoice.has_file():
+        return False
+    return invoice.file_version == get_invoice_pdf_version(invoice)
+
+
+def create_invoice_pdf(invoice):
+    version = get_invoice_pdf_version(invoice)
+    if invoice.has_file() and invoice.file_version == version:
+        return
+
+    html = render_invoice_html(invoice)
     pdf = pdfkit.from_string(html, False)
-    invoice.file = str(base64.b64encode(pdf), 'utf-8')
-    invoice.save()
+    name = default_storage.save(
+        'invoices/%s_%s.pdf' % (invoice.uuid.hex, version), ContentFile(pdf)
+    )
+
+    old_name = invoice.file.name
+    invoice.file.name = name
+    invoice.file_version = version
+    invoice.save(update_fields=['file', 'file_version'])
+
+    if old_name and not models.Invoice.objects.filter(file=old_name).exists():
+        default_storage.delete(old_name)
+
+
+def schedule_invoice_pdf(invoice):
+    """
+    Schedule rendering of invoice PDF unless it is already
+    scheduled for the same invoice.
+    """
+    from . import tasks
+
+    lock_key = get_invoice_pdf_lock_key(invoice)
+    if not cache.add(lock_key, True, INVOICE_PDF_LOCK_TIMEOUT):
+        return
+    tasks.create_invoice_pdf.delay(core_utils.serialize_instance(invoice))
+
+
+def get_invoice_pdf_lock_key(invoice):
+    return 'invoice_pdf_%s' % invoice.uuid.hex
 
 
 def get_price_per_day(price, unit):
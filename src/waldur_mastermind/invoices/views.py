@@ -5,13 +5,14 @@ from celery import chain
 from dateutil.relativedelta import relativedelta
 from django.db import transaction
 from django.db.models import Sum
-from django.http import Http404, HttpResponse
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.utils.translation import ugettext_lazy as _
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import exceptions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
+from waldur_core.core import pagination as core_pagination
 from waldur_core.core import utils as core_utils
 from waldur_core.core import validators as core_validators
 from waldur_core.core import views as core_views
@@ -21,7 +22,7 @@ from waldur_core.structure import permissions as structure_permissions
 from waldur_mastermind.common.utils import quantize_price
 from waldur_mastermind.marketplace import models as marketplace_models
 
-from . import filters, log, models, serializers, tasks
+from . import export, filters, log, models, pricing, serializers, tasks, utils
 
 
 class InvoiceViewSet(core_views.ReadOnlyActionsViewSet):
@@ -34,6 +35,7 @@ class InvoiceViewSet(core_views.ReadOnlyActionsViewSet):
         DjangoFilterBackend,
     )
     filterset_class = filters.InvoiceFilter
+    pagination_class = core_pagination.ApproximateCountLinkHeaderPagination
 
     def _is_invoice_created(invoice):
         if invoice.state != models.Invoice.States.CREATED:
@@ -65,17 +67,34 @@ class InvoiceViewSet(core_views.ReadOnlyActionsViewSet):
     @action(detail=True)
     def pdf(self, request, uuid=None):
         invoice = self.get_object()
+        if not utils.is_invoice_pdf_actual(invoice):
+            utils.schedule_invoice_pdf(invoice)
         if not invoice.has_file():
-            tasks.create_invoice_pdf.delay(core_utils.serialize_instance(invoice))
             raise Http404()
 
-        file_response = HttpResponse(invoice.file, content_type='application/pdf')
+        with invoice.file.open('rb') as pdf_file:
+            file_response = HttpResponse(
+                pdf_file.read(), content_type='application/pdf'
+            )
         filename = invoice.get_filename()
         file_response[
             'Content-Disposition'
         ] = 'attachment; filename="{filename}"'.format(filename=filename)
         return file_response
 
+    @action(detail=False)
+    def export(self, request):
+        """
+        Stream CSV report with non-empty items of filtered invoices.
+        Report format is the same as the one of monthly accounting report.
+        """
+        invoices = self.filter_queryset(self.get_queryset())
+        response = StreamingHttpResponse(
+            export.stream_invoices_csv(invoices), content_type='text/csv'
+        )
+        response['Content-Disposition'] = 'attachment; filename="invoices.csv"'
+        return response
+
     @transaction.atomic
     @action(detail=True, methods=['post'])
     def paid(self, request, uuid=None):
@@ -214,13 +233,19 @@ class InvoiceViewSet(core_views.ReadOnlyActionsViewSet):
             key = f'{current_month.year}-{current_month.month}'
             row = customer_periods[key] = {}
             subtotal = 0
-            for invoice in invoices.filter(customer_id__in=majors):
-                value = is_accounting_mode and invoice.price or invoice.total
+            totals = pricing.get_invoices_totals(invoices)
+            value_index = 0 if is_accounting_mode else 2
+            for invoice in invoices.filter(customer_id__in=majors).select_related(
+                'customer'
+            ):
+                value = totals[invoice.id][value_index]
                 subtotal += value
                 row[invoice.customer.uuid.hex] = value
             other_periods[key] = sum(
-                is_accounting_mode and invoice.price or invoice.total
-                for invoice in invoices.filter(customer_id__in=minors)
+                totals[invoice_id][value_index]
+                for invoice_id in invoices.filter(customer_id__in=minors).values_list(
+                    'id', flat=True
+                )
             )
             total_periods[key] = subtotal + other_periods[key]
             current_month += relativedelta(months=1)
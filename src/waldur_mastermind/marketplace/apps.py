@@ -12,6 +12,8 @@ class MarketplaceConfig(AppConfig):
         from waldur_core.structure import SupportedServices
         from waldur_core.structure import models as structure_models
         from waldur_core.structure import signals as structure_signals
+        from waldur_mastermind.invoices import models as invoices_models
+        from waldur_mastermind.invoices import signals as invoices_signals
 
         from . import (
             handlers,
@@ -119,6 +121,12 @@ class MarketplaceConfig(AppConfig):
             dispatch_uid='waldur_mastermind.marketplace.add_component_usage',
         )
 
+        marketplace_signals.component_usages_updated.connect(
+            handlers.add_component_usages,
+            sender=models.ComponentUsage,
+            dispatch_uid='waldur_mastermind.marketplace.add_component_usages',
+        )
+
         signals.post_save.connect(
             handlers.disable_archived_service_settings_without_existing_resource,
             sender=models.Resource,
@@ -187,3 +195,21 @@ class MarketplaceConfig(AppConfig):
             sender=structure_models.Customer,
             dispatch_uid='waldur_mastermind.marketplace.drop_offering_permissions_if_service_manager_role_is_revoked',
         )
+
+        signals.post_save.connect(
+            handlers.invalidate_offering_stats,
+            sender=invoices_models.InvoiceItem,
+            dispatch_uid='waldur_mastermind.marketplace.invalidate_offering_stats_post_save',
+        )
+
+        signals.post_delete.connect(
+            handlers.invalidate_offering_stats,
+            sender=invoices_models.InvoiceItem,
+            dispatch_uid='waldur_mastermind.marketplace.invalidate_offering_stats_post_delete',
+        )
+
+        invoices_signals.invoice_items_updated.connect(
+            handlers.invalidate_offering_stats_on_items_update,
+            sender=invoices_models.InvoiceItem,
+            dispatch_uid='waldur_mastermind.marketplace.invalidate_offering_stats_on_items_update',
+        )
@@ -3,7 +3,7 @@ import logging
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ObjectDoesNotExist
 from django.db import transaction
-from django.db.models import Count, signals
+from django.db.models import Count, Q, signals
 from django.utils.timezone import now
 
 from waldur_core.core import utils as core_utils
@@ -383,6 +383,69 @@ def add_component_usage(sender, instance, created=False, **kwargs):
         pass
 
 
+def add_component_usages(sender, usages, **kwargs):
+    """
+    Grouped counterpart of add_component_usage for usages stored in bulk.
+    Invoice items of all resources are fetched and updated with single query.
+    """
+    usages = [
+        usage
+        for usage in usages
+        if isinstance(usage.resource, models.Resource) and usage.plan_period
+    ]
+    if not usages:
+        return
+
+    periods = Q()
+    for usage in usages:
+        periods |= Q(
+            invoice__year=usage.billing_period.year,
+            invoice__month=usage.billing_period.month,
+        )
+    items = {}
+    for item in invoices_models.InvoiceItem.objects.filter(
+        periods,
+        content_type=ContentType.objects.get_for_model(models.Resource),
+        object_id__in={usage.resource_id for usage in usages},
+        details__has_key='offering_component_type',
+    ).select_related('invoice'):
+        key = (
+            item.object_id,
+            item.invoice.year,
+            item.invoice.month,
+            item.details['offering_component_type'],
+        )
+        items.setdefault(key, []).append(item)
+
+    changed_items = {}
+    for usage in usages:
+        plan_period = usage.plan_period
+        plan_period_start = plan_period.start or core_utils.month_start(
+            usage.billing_period
+        )
+        plan_period_end = plan_period.end or core_utils.month_end(usage.billing_period)
+        key = (
+            usage.resource_id,
+            usage.billing_period.year,
+            usage.billing_period.month,
+            usage.component.type,
+        )
+        matching_items = [
+            item
+            for item in items.get(key, [])
+            if item.start >= plan_period_start and item.end <= plan_period_end
+        ]
+        # Item is updated only if it is matched unambiguously
+        if len(matching_items) != 1:
+            continue
+        item = matching_items[0]
+        item.details.setdefault('usages', {})[usage.component.type] = usage.usage
+        changed_items[item.id] = item
+
+    # Usages are stored in details, so that item price is not changed
+    invoices_models.InvoiceItem.objects.bulk_update(changed_items.values(), ['details'])
+
+
 def log_offering_permission_granted(
     sender, structure, user, role=None, created_by=None, **kwargs
 ):
@@ -526,3 +589,25 @@ def enable_service_settings_when_not_archived(
         return
 
     enable_nonempty_service_settings(instance)
+
+
+def get_past_offering_uuids(items):
+    current_period = core_utils.month_start(now())
+    return {
+        item.details['offering_uuid']
+        for item in items
+        if item.start < current_period and item.details.get('offering_uuid')
+    }
+
+
+def invalidate_offering_stats(sender, instance, **kwargs):
+    # Statistics are cached only for past periods.
+    offering_uuids = get_past_offering_uuids([instance])
+    if offering_uuids:
+        utils.invalidate_offering_stats(offering_uuids)
+
+
+def invalidate_offering_stats_on_items_update(sender, items, **kwargs):
+    offering_uuids = get_past_offering_uuids(items)
+    if offering_uuids:
+        utils.invalidate_offering_stats(offering_uuids)
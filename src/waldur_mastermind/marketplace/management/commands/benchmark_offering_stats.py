@@ -0,0 +1,105 @@
+from dateutil.relativedelta import relativedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from waldur_core.core.utils import measure_latency, month_start
+from waldur_core.structure.models import Customer
+from waldur_mastermind.invoices import models as invoice_models
+from waldur_mastermind.marketplace import models, utils
+
+
+class Command(BaseCommand):
+    help = """Measure latency of offering costs and component statistics calculation.
+    Existing invoice items of the offering are copied to every month of the given period
+    until the requested number of items is reached. All generated data is rolled back."""
+
+    def add_arguments(self, parser):
+        parser.add_argument('offering_uuid', help='UUID of the offering.')
+        parser.add_argument(
+            '--items',
+            type=int,
+            default=10000,
+            help='Number of invoice items to generate. Default is 10000.',
+        )
+        parser.add_argument(
+            '--months',
+            type=int,
+            default=12,
+            help='Number of months in the period. Default is 12.',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Number of times each calculation is executed.',
+        )
+
+    def handle(self, offering_uuid, items, months, repeat, *args, **options):
+        try:
+            offering = models.Offering.objects.get(uuid=offering_uuid)
+        except models.Offering.DoesNotExist:
+            raise CommandError('Offering with UUID %s is not found.' % offering_uuid)
+
+        templates = list(
+            invoice_models.InvoiceItem.objects.filter(
+                details__offering_uuid=offering.uuid.hex
+            ).select_related('invoice')[:100]
+        )
+        if not templates:
+            raise CommandError('There are no invoice items for this offering.')
+
+        end = month_start(timezone.now()).date()
+        start = end - relativedelta(months=max(months, 1) - 1)
+        active_customers = Customer.objects.all()
+
+        with transaction.atomic():
+            self.generate_items(templates, start, months, items)
+            self.stdout.write('Latency in milliseconds (median of %s runs):' % repeat)
+            for name, func in (
+                ('costs', utils.calculate_offering_costs),
+                ('component stats', utils.calculate_offering_component_stats),
+            ):
+                latency = measure_latency(
+                    lambda: func(offering, active_customers, start, end), repeat
+                )
+                self.stdout.write('  %-20s %10.2f' % (name, latency))
+            transaction.set_rollback(True)
+
+    def generate_items(self, templates, start, months, count):
+        self.stdout.write('Generating %s invoice items...' % count)
+        months = max(months, 1)
+        per_month = -(-count // months)
+        generated = 0
+        for index in range(months):
+            date = start + relativedelta(months=index)
+            item_start = month_start(date)
+            item_end = item_start + relativedelta(months=1, seconds=-1)
+            invoices = {}
+            batch = []
+            for i in range(min(per_month, count - generated)):
+                template = templates[i % len(templates)]
+                customer_id = template.invoice.customer_id
+                if customer_id not in invoices:
+                    invoice, _ = invoice_models.Invoice.objects.get_or_create(
+                        customer_id=customer_id, year=date.year, month=date.month
+                    )
+                    invoices[customer_id] = invoice
+                batch.append(
+                    invoice_models.InvoiceItem(
+                        invoice=invoices[customer_id],
+                        content_type_id=template.content_type_id,
+                        object_id=template.object_id,
+                        project_id=template.project_id,
+                        name=template.name,
+                        details=template.details,
+                        unit=template.unit,
+                        unit_price=template.unit_price,
+                        quantity=template.quantity,
+                        start=item_start,
+                        end=item_end,
+                    )
+                )
+            invoice_models.InvoiceItem.objects.bulk_create(batch)
+            generated += len(batch)
+        self.stdout.write('...done')
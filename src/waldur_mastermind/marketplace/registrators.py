@@ -1,7 +1,7 @@
 import logging
 
 from django.contrib.contenttypes.models import ContentType
-from django.db.models import signals
+from django.db.models import Q, signals
 from django.utils import timezone
 
 from waldur_core.core import utils as core_utils
@@ -9,8 +9,10 @@ from waldur_core.structure.models import Project
 from waldur_mastermind.common import mixins as common_mixins
 from waldur_mastermind.invoices import models as invoice_models
 from waldur_mastermind.invoices import registrators
+from waldur_mastermind.invoices import utils as invoices_utils
 from waldur_mastermind.marketplace import PLUGIN_NAME
 from waldur_mastermind.marketplace import models as marketplace_models
+from waldur_mastermind.marketplace import signals as marketplace_signals
 
 logger = logging.getLogger(__name__)
 
@@ -210,46 +212,7 @@ class MarketplaceRegistrator(registrators.BaseRegistrator):
             item.unit_price = plan_component.price
             item.save()
         except invoice_models.InvoiceItem.DoesNotExist:
-            customer = resource.project.customer
-            invoice, created = registrators.RegistrationManager.get_or_create_invoice(
-                customer, component_usage.date
-            )
-
-            details = cls.get_component_details(resource, plan_component)
-            details['plan_period_id'] = plan_period.id
-
-            month_start = core_utils.month_start(component_usage.date)
-            month_end = core_utils.month_end(component_usage.date)
-
-            start = (
-                month_start
-                if not component_usage.plan_period.start
-                else max(component_usage.plan_period.start, month_start)
-            )
-            end = (
-                month_end
-                if not component_usage.plan_period.end
-                else min(component_usage.plan_period.end, month_end)
-            )
-
-            invoice_models.InvoiceItem.objects.create(
-                content_type=ContentType.objects.get_for_model(
-                    component_usage.resource
-                ),
-                object_id=component_usage.resource.id,
-                project=resource.project,
-                invoice=invoice,
-                start=start,
-                end=end,
-                details=details,
-                unit_price=plan_component.price,
-                quantity=component_usage.usage,
-                unit=common_mixins.UnitPriceMixin.Units.QUANTITY,
-                product_code=offering_component.product_code or plan.product_code,
-                article_code=offering_component.article_code or plan.article_code,
-                name=resource.name + ' / ' + offering_component.name,
-            )
-
+            cls.create_component_usage_item(component_usage, plan_component)
         except marketplace_models.PlanComponent.DoesNotExist:
             logger.warning(
                 'Plan component for usage component %s is not found.',
@@ -264,6 +227,135 @@ class MarketplaceRegistrator(registrators.BaseRegistrator):
                 component_usage.date,
             )
 
+    @classmethod
+    def create_component_usage_item(cls, component_usage, plan_component):
+        resource = component_usage.resource
+        plan_period = component_usage.plan_period
+        plan = plan_period.plan
+        offering_component = component_usage.component
+
+        customer = resource.project.customer
+        invoice, created = registrators.RegistrationManager.get_or_create_invoice(
+            customer, component_usage.date
+        )
+
+        details = cls.get_component_details(resource, plan_component)
+        details['plan_period_id'] = plan_period.id
+
+        month_start = core_utils.month_start(component_usage.date)
+        month_end = core_utils.month_end(component_usage.date)
+
+        start = (
+            month_start
+            if not plan_period.start
+            else max(plan_period.start, month_start)
+        )
+        end = month_end if not plan_period.end else min(plan_period.end, month_end)
+
+        invoice_models.InvoiceItem.objects.create(
+            content_type=ContentType.objects.get_for_model(resource),
+            object_id=resource.id,
+            project=resource.project,
+            invoice=invoice,
+            start=start,
+            end=end,
+            details=details,
+            unit_price=plan_component.price,
+            quantity=component_usage.usage,
+            unit=common_mixins.UnitPriceMixin.Units.QUANTITY,
+            product_code=offering_component.product_code or plan.product_code,
+            article_code=offering_component.article_code or plan.article_code,
+            name=resource.name + ' / ' + offering_component.name,
+        )
+
+    @classmethod
+    def add_component_usages(cls, sender, usages, **kwargs):
+        """
+        Grouped counterpart of add_component_usage for usages stored in bulk.
+        Plan components and invoice items of all usages are fetched with single
+        query each and existing invoice items are updated with single query.
+        Missing invoice items are created one by one.
+        """
+        usages = [
+            usage for usage in usages if usage.resource.offering.type == cls.plugin_name
+        ]
+        for usage in usages:
+            if not usage.plan_period:
+                logger.warning(
+                    'Skipping processing of component usage with ID %s because '
+                    'plan period is not defined.',
+                    usage.id,
+                )
+        usages = [usage for usage in usages if usage.plan_period]
+        if not usages:
+            return
+
+        plan_components = {
+            (plan_component.plan_id, plan_component.component_id): plan_component
+            for plan_component in marketplace_models.PlanComponent.objects.filter(
+                plan_id__in={usage.plan_period.plan_id for usage in usages}
+            )
+        }
+
+        periods = Q()
+        for usage in usages:
+            periods |= Q(
+                invoice__year=usage.billing_period.year,
+                invoice__month=usage.billing_period.month,
+            )
+        items = {}
+        for item in invoice_models.InvoiceItem.objects.filter(
+            periods,
+            content_type=ContentType.objects.get_for_model(marketplace_models.Resource),
+            object_id__in={usage.resource_id for usage in usages},
+        ).select_related('invoice'):
+            key = (
+                item.object_id,
+                item.details.get('plan_period_id'),
+                item.details.get('plan_component_id'),
+                item.invoice.year,
+                item.invoice.month,
+            )
+            items.setdefault(key, []).append(item)
+
+        changed_items = []
+        for usage in usages:
+            plan_component = plan_components.get(
+                (usage.plan_period.plan_id, usage.component_id)
+            )
+            if not plan_component:
+                logger.warning(
+                    'Plan component for usage component %s is not found.', usage.id,
+                )
+                continue
+
+            key = (
+                usage.resource_id,
+                usage.plan_period_id,
+                plan_component.id,
+                usage.billing_period.year,
+                usage.billing_period.month,
+            )
+            matching_items = items.get(key, [])
+            if not matching_items:
+                cls.create_component_usage_item(usage, plan_component)
+            elif len(matching_items) > 1:
+                logger.warning(
+                    'Skipping the invoice item unit price update '
+                    'because multiple InvoiceItem objects found. Resource: %s, date: %s.',
+                    usage.resource_id,
+                    usage.date,
+                )
+            else:
+                item = matching_items[0]
+                item.quantity = usage.usage
+                item.unit_price = plan_component.price
+                changed_items.append(item)
+
+        invoices_utils.bulk_update_invoice_items(
+            changed_items, ['quantity', 'unit_price']
+        )
+
     @classmethod
     def connect(cls):
         registrators.RegistrationManager.add_registrator(cls.plugin_name, cls)
@@ -279,3 +371,9 @@ class MarketplaceRegistrator(registrators.BaseRegistrator):
             sender=marketplace_models.ComponentUsage,
             dispatch_uid='%s.add_component_usage' % cls.__name__,
         )
+
+        marketplace_signals.component_usages_updated.connect(
+            cls.add_component_usages,
+            sender=marketplace_models.ComponentUsage,
+            dispatch_uid='%s.add_component_usages' % cls.__name__,
+        )
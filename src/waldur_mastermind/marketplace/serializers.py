@@ -27,7 +27,9 @@ from waldur_core.core import utils as core_utils
 from waldur_core.core import validators as core_validators
 from waldur_core.core.fields import NaturalChoiceField
 from waldur_core.core.serializers import GenericRelatedField
+from waldur_core.logging.loggers import buffered_events
 from waldur_core.media.serializers import ProtectedFileField, ProtectedImageField
+from waldur_core.quotas import utils as quotas_utils
 from waldur_core.quotas.serializers import BasicQuotaSerializer
 from waldur_core.structure import SupportedServices
 from waldur_core.structure import models as structure_models
@@ -48,7 +50,7 @@ from waldur_mastermind.marketplace.processors import CreateResourceProcessor
 from waldur_mastermind.marketplace.utils import validate_attributes
 from waldur_pid import models as pid_models
 
-from . import log, models, permissions, plugins, tasks, utils
+from . import log, models, permissions, plugins, signals, tasks, utils
 
 logger = logging.getLogger(__name__)
 
@@ -1612,29 +1614,30 @@ def create_order(project, user, items, request):
     order_params = dict(project=project, created_by=user)
     order = models.Order.objects.create(**order_params)
 
-    for item in items:
-        if (
-            item.type
-            in (models.OrderItem.Types.UPDATE, models.OrderItem.Types.TERMINATE)
-            and item.resource
-            and models.OrderItem.objects.filter(
-                resource=item.resource,
-                state__in=(
-                    models.OrderItem.States.PENDING,
-                    models.OrderItem.States.EXECUTING,
-                ),
-            ).exists()
-        ):
-            raise rf_exceptions.ValidationError(
-                _('Pending order item for resource already exists.')
-            )
+    with quotas_utils.quotas_snapshot():
+        for item in items:
+            if (
+                item.type
+                in (models.OrderItem.Types.UPDATE, models.OrderItem.Types.TERMINATE)
+                and item.resource
+                and models.OrderItem.objects.filter(
+                    resource=item.resource,
+                    state__in=(
+                        models.OrderItem.States.PENDING,
+                        models.OrderItem.States.EXECUTING,
+                    ),
+                ).exists()
+            ):
+                raise rf_exceptions.ValidationError(
+                    _('Pending order item for resource already exists.')
+                )
 
-        try:
-            params = get_item_params(item)
-            order_item = order.add_item(**params)
-        except ValidationError as e:
-            raise rf_exceptions.ValidationError(e)
-        utils.validate_order_item(order_item, request)
+            try:
+                params = get_item_params(item)
+                order_item = order.add_item(**params)
+            except ValidationError as e:
+                raise rf_exceptions.ValidationError(e)
+            utils.validate_order_item(order_item, request)
 
     order.init_total_cost()
     order.save()
@@ -2142,6 +2145,222 @@ class ComponentUsageCreateSerializer(serializers.Serializer):
                 log.log_component_usage_update_succeeded(usage)
 
 
+class ComponentUsageBulkItemSerializer(serializers.Serializer):
+    usages = ComponentUsageItemSerializer(many=True)
+    plan_period = serializers.UUIDField()
+
+
+class ComponentUsageBulkCreateSerializer(serializers.Serializer):
+    """
+    Usages of many resources are validated and stored together.
+    Errors are reported per resource plan period instead of rejecting whole request.
+    """
+
+    items = ComponentUsageBulkItemSerializer(many=True)
+
+    def validate_items(self, items):
+        plan_periods = [item['plan_period'] for item in items]
+        if len(plan_periods) != len(set(plan_periods)):
+            raise serializers.ValidationError(
+                _('Usages of plan period should be submitted only once.')
+            )
+        return items
+
+    def get_plan_periods(self, items):
+        plan_periods = models.ResourcePlanPeriod.objects.filter(
+            uuid__in=[item['plan_period'] for item in items]
+        ).select_related('resource__offering__customer', 'resource__project')
+        return {plan_period.uuid: plan_period for plan_period in plan_periods}
+
+    def get_usage_components(self, plan_periods):
+        components = {}
+        for component in models.OfferingComponent.objects.filter(
+            offering_id__in={
+                plan_period.resource.offering_id for plan_period in plan_periods
+            },
+            billing_type=models.OfferingComponent.BillingTypes.USAGE,
+        ):
+            components.setdefault(component.offering_id, {})[component.type] = component
+        return components
+
+    def validate_item(self, item, plan_period, components, permitted_offerings):
+        """ Apply the same rules as ComponentUsageCreateSerializer does. """
+        if not plan_period:
+            return _('Plan period is not found.')
+
+        resource = plan_period.resource
+        offering = resource.offering
+        if offering.id not in permitted_offerings:
+            user = self.context['request'].user
+            permitted_offerings[offering.id] = structure_permissions._has_owner_access(
+                user, offering.customer
+            ) or offering.has_user(user)
+        if not permitted_offerings[offering.id]:
+            return _(
+                'Only staff, service provider owner and service manager are allowed '
+                'to submit usage data for marketplace resource.'
+            )
+
+        if plan_period.end and plan_period.end < core_utils.month_start(
+            datetime.date.today()
+        ):
+            return _('Billing period is closed.')
+
+        States = models.Resource.States
+        if resource.state not in (States.OK, States.UPDATING, States.TERMINATING):
+            return _('Resource is not in valid state.')
+
+        valid_components = set(components.get(offering.id, {}).keys())
+        actual_components = {usage['type'] for usage in item['usages']}
+
+        missing_components = ', '.join(sorted(valid_components - actual_components))
+        invalid_components = ', '.join(sorted(actual_components - valid_components))
+
+        if invalid_components:
+            return _('These components are invalid: %s.') % invalid_components
+
+        if missing_components:
+            return _('These components are missing: %s.') % missing_components
+
+    @transaction.atomic
+    def save(self):
+        """
+        Create or update component usages using bulk queries and return
+        list of results in the same order as items are submitted.
+        Invoice items of usages which have been created or changed are
+        updated in grouped form by receivers of component_usages_updated signal.
+        """
+        items = self.validated_data['items']
+        plan_periods = self.get_plan_periods(items)
+        components = self.get_usage_components(plan_periods.values())
+        now = timezone.now()
+        billing_period = core_utils.month_start(now)
+
+        results = []
+        valid_items = []
+        permitted_offerings = {}
+        for item in items:
+            plan_period = plan_periods.get(item['plan_period'])
+            error = self.validate_item(
+                item, plan_period, components, permitted_offerings
+            )
+            if not error:
+                offering_components = components[plan_period.resource.offering_id]
+                try:
+                    for usage in item['usages']:
+                        offering_components[usage['type']].validate_amount(
+                            plan_period.resource, usage['amount'], now
+                        )
+                except rf_exceptions.ValidationError as e:
+                    error = e.detail[0]
+            if error:
+                results.append(
+                    {
+                        'plan_period': item['plan_period'],
+                        'status': 'error',
+                        'detail': error,
+                    }
+                )
+            else:
+                result = {'plan_period': item['plan_period'], 'status': 'unchanged'}
+                results.append(result)
+                valid_items.append((item, plan_period, result))
+
+        existing_usages = {}
+        for usage in (
+            models.ComponentUsage.objects.filter(
+                resource_id__in={
+                    valid_item[1].resource_id for valid_item in valid_items
+                },
+                billing_period=billing_period,
+            )
+            .select_related('resource__offering', 'component', 'plan_period')
+            .select_for_update()
+        ):
+            existing_usages.setdefault(
+                (usage.resource_id, usage.component_id), []
+            ).append(usage)
+
+        new_usages = []
+        changed_usages = {}
+        for item, plan_period, result in valid_items:
+            resource = plan_period.resource
+            offering_components = components[resource.offering_id]
+            for data in item['usages']:
+                component = offering_components[data['type']]
+                target = None
+                for usage in existing_usages.get((resource.id, component.id), []):
+                    if usage.plan_period_id == plan_period.id:
+                        target = usage
+                    elif usage.recurring:
+                        usage.recurring = False
+                        changed_usages[usage.id] = usage
+
+                values = {
+                    'usage': data['amount'],
+                    'date': now,
+                    'description': data.get('description', ''),
+                    'recurring': data['recurring'],
+                }
+                if target is None:
+                    result['status'] = 'created'
+                    new_usages.append(
+                        models.ComponentUsage(
+                            resource=resource,
+                            component=component,
+                            plan_period=plan_period,
+                            billing_period=billing_period,
+                            **values
+                        )
+                    )
+                else:
+                    for key, value in values.items():
+                        setattr(target, key, value)
+                    target.modified = now
+                    changed_usages[target.id] = target
+                    if (
+                        target.tracker.has_changed('usage')
+                        and result['status'] != 'created'
+                    ):
+                        result['status'] = 'updated'
+
+        models.ComponentUsage.objects.bulk_create(new_usages)
+        models.ComponentUsage.objects.bulk_update(
+            changed_usages.values(),
+            ['usage', 'date', 'description', 'recurring', 'modified'],
+            batch_size=1000,
+        )
+
+        updated_usages = list(new_usages)
+        with buffered_events():
+            for usage in new_usages:
+                logger.info(
+                    'Usage has been created for %s, component: %s, value: %s',
+                    usage.resource,
+                    usage.component.type,
+                    usage.usage,
+                )
+                log.log_component_usage_creation_succeeded(usage)
+
+            for usage in changed_usages.values():
+                if not usage.tracker.has_changed('usage'):
+                    continue
+                logger.info(
+                    'Usage has been updated for %s, component: %s, value: %s',
+                    usage.resource,
+                    usage.component.type,
+                    usage.usage,
+                )
+                log.log_component_usage_update_succeeded(usage)
+                updated_usages.append(usage)
+
+        signals.component_usages_updated.send(
+            sender=models.ComponentUsage, usages=updated_usages
+        )
+
+        return results
+
+
 class OfferingFileSerializer(
     MarketplaceProtectedMediaSerializerMixin,
     core_serializers.RestrictedSerializerMixin,
@@ -82,34 +82,34 @@ def create_pdf_for_all():
         utils.create_order_pdf(order)
 
 
-def filter_aggregate_by_scope(queryset, scope):
-    scope_path = None
-
-    if isinstance(scope, structure_models.Project):
-        scope_path = 'resource__project'
-
-    if isinstance(scope, structure_models.Customer):
-        scope_path = 'resource__project__customer'
-
-    if scope_path:
-        queryset = queryset.filter(**{scope_path: scope})
-
-    return queryset
-
-
-def aggregate_reported_usage(start, end, scope):
+def aggregate_reported_usage(start, end, scope_path):
+    """
+    Return dictionary mapping pair of scope ID and category component ID
+    to the sum of usages reported for resources of the scope.
+    """
     queryset = models.ComponentUsage.objects.filter(
         date__gte=start, date__lte=end
     ).exclude(component__parent=None)
 
-    queryset = filter_aggregate_by_scope(queryset, scope)
+    if scope_path == 'resource__project':
+        queryset = queryset.filter(resource__project__is_removed=False)
 
-    queryset = queryset.values('component__parent_id').annotate(total=Sum('usage'))
+    queryset = (
+        queryset.order_by()
+        .values(scope_path, 'component__parent_id')
+        .annotate(total=Sum('usage'))
+    )
 
-    return {row['component__parent_id']: row['total'] for row in queryset}
+    return {
+        (row[scope_path], row['component__parent_id']): row['total'] for row in queryset
+    }
 
 
-def aggregate_fixed_usage(start, end, scope):
+def aggregate_fixed_usage(start, end, scope_path):
+    """
+    Return dictionary mapping pair of scope ID and category component ID
+    to the sum of fixed amounts of plans of resources of the scope.
+    """
     queryset = models.ResourcePlanPeriod.objects.filter(
         # Resource has been active during billing period
         Q(start__gte=start, end__lte=end)
@@ -118,51 +118,80 @@ def aggregate_fixed_usage(start, end, scope):
             end__gte=start, end__lte=end
         )  # Resource has been launched in previous billing period and stopped in current
     )
-    queryset = filter_aggregate_by_scope(queryset, scope)
 
-    queryset = queryset.values('plan__components__component__parent_id').annotate(
-        total=Sum('plan__components__amount')
+    if scope_path == 'resource__project':
+        queryset = queryset.filter(resource__project__is_removed=False)
+
+    queryset = (
+        queryset.order_by()
+        .values(scope_path, 'plan__components__component__parent_id')
+        .annotate(total=Sum('plan__components__amount'))
     )
 
+    # It needs to cover a case when a key is None because OfferingComponent.parent can be None.
     return {
-        row['plan__components__component__parent_id']: row['total'] for row in queryset
+        (row[scope_path], row['plan__components__component__parent_id']): row['total']
+        for row in queryset
+        if row['plan__components__component__parent_id'] is not None
     }
 
 
-def calculate_usage_for_scope(start, end, scope):
-    reported_usage = aggregate_reported_usage(start, end, scope)
-    fixed_usage = aggregate_fixed_usage(start, end, scope)
-    # It needs to cover a case when a key is None because OfferingComponent.parent can be None.
-    fixed_usage.pop(None, None)
-    components = set(reported_usage.keys()) | set(fixed_usage.keys())
-    content_type = ContentType.objects.get_for_model(scope)
-
-    for component_id in components:
-        models.CategoryComponentUsage.objects.update_or_create(
-            content_type=content_type,
-            object_id=scope.id,
-            component_id=component_id,
-            date=start,
-            defaults={
-                'reported_usage': reported_usage.get(component_id),
-                'fixed_usage': fixed_usage.get(component_id),
-            },
-        )
-
-
 @shared_task(name='waldur_mastermind.marketplace.calculate_usage_for_current_month')
 def calculate_usage_for_current_month():
+    """
+    Usage of all customers and projects is aggregated by category component
+    using grouped queries and stored with bulk create and update.
+    """
     start = invoice_utils.get_current_month_start()
     end = invoice_utils.get_current_month_end()
-    scopes = []
 
-    for customer in structure_models.Customer.objects.all():
-        scopes.append(customer)
-        for project in customer.projects.all():
-            scopes.append(project)
+    usages = {}
+    for model, scope_path in (
+        (structure_models.Customer, 'resource__project__customer'),
+        (structure_models.Project, 'resource__project'),
+    ):
+        content_type_id = ContentType.objects.get_for_model(model).id
+        reported_usage = aggregate_reported_usage(start, end, scope_path)
+        fixed_usage = aggregate_fixed_usage(start, end, scope_path)
+        for object_id, component_id in set(reported_usage) | set(fixed_usage):
+            key = (object_id, component_id)
+            usages[(content_type_id, object_id, component_id)] = (
+                reported_usage.get(key),
+                fixed_usage.get(key),
+            )
 
-    for scope in scopes:
-        calculate_usage_for_scope(start, end, scope)
+    with transaction.atomic():
+        existing = {
+            (usage.content_type_id, usage.object_id, usage.component_id): usage
+            for usage in models.CategoryComponentUsage.objects.filter(
+                date=start, content_type_id__in={key[0] for key in usages},
+            ).select_for_update()
+        }
+        new_usages = []
+        changed_usages = []
+        for key, (reported, fixed) in usages.items():
+            usage = existing.get(key)
+            if usage is None:
+                content_type_id, object_id, component_id = key
+                new_usages.append(
+                    models.CategoryComponentUsage(
+                        content_type_id=content_type_id,
+                        object_id=object_id,
+                        component_id=component_id,
+                        date=start,
+                        reported_usage=reported,
+                        fixed_usage=fixed,
+                    )
+                )
+            elif usage.reported_usage != reported or usage.fixed_usage != fixed:
+                usage.reported_usage = reported
+                usage.fixed_usage = fixed
+                changed_usages.append(usage)
+
+        models.CategoryComponentUsage.objects.bulk_create(new_usages)
+        models.CategoryComponentUsage.objects.bulk_update(
+            changed_usages, ['reported_usage', 'fixed_usage'], batch_size=1000
+        )
 
 
 @shared_task(name='waldur_mastermind.marketplace.send_notifications_about_usages')
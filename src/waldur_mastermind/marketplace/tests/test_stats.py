@@ -1,10 +1,13 @@
 import decimal
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from freezegun import freeze_time
 from rest_framework import status, test
 
 from waldur_core.core import utils as core_utils
+from waldur_core.structure import models as structure_models
 from waldur_core.structure.tests import fixtures as structure_fixtures
 from waldur_mastermind.common.mixins import UnitPriceMixin
 from waldur_mastermind.common.utils import parse_date
@@ -205,6 +208,20 @@ class CostsStatsTest(StatsBaseTest):
             },
         )
 
+    def test_cached_costs_are_invalidated_when_past_invoice_item_is_changed(self):
+        with freeze_time('2020-03-01'):
+            self._check_stats()
+            item = invoices_models.InvoiceItem.objects.get(
+                invoice__year=2020,
+                invoice__month=1,
+                details__offering_uuid=self.offering.uuid.hex,
+            )
+            item.unit_price *= 2
+            item.save()
+
+            result = self.client.get(self.url, {'start': '2020-01', 'end': '2020-01'})
+            self.assertEqual(result.data[0]['price'], self.plan_component.price * 62)
+
     @helpers.override_marketplace_settings(ANONYMOUS_USER_CAN_VIEW_OFFERINGS=True)
     def test_stat_methods_are_not_available_for_anonymous_users(self):
         offering_url = factories.OfferingFactory.get_url(self.offering)
@@ -363,6 +380,34 @@ class ComponentStatsTest(StatsBaseTest):
                 }
             ],
         )
+        self.assertIsInstance(result.data[0]['usage'], int)
+
+    def test_number_of_queries_does_not_depend_on_number_of_items(self):
+        self.resource.offering.type = PLUGIN_NAME
+        self.resource.offering.save()
+        self._create_items()
+        date = core_utils.month_start(timezone.now()).date()
+
+        def count_queries():
+            customers = structure_models.Customer.objects.all()
+            with CaptureQueriesContext(connection) as context:
+                stats = utils.calculate_offering_component_stats(
+                    self.offering, customers, date, date
+                )
+            return len(context), stats[date][0]['usage']
+
+        queries, usage = count_queries()
+
+        for _ in range(3):
+            factories.ResourceFactory(
+                offering=self.offering,
+                state=models.Resource.States.OK,
+                plan=self.plan,
+                limits={'cores': 1},
+            )
+        invoices_tasks.create_monthly_invoices()
+
+        self.assertEqual(count_queries(), (queries, usage * 4))
 
     def test_migration(self):
         item = self._create_items().first()
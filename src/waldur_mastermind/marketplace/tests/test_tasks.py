@@ -38,6 +38,15 @@ class CalculateUsageForCurrentMonthTest(test.APITransactionTestCase):
         tasks.calculate_usage_for_current_month()
         self.assertEqual(models.CategoryComponentUsage.objects.count(), 2)
 
+    def test_usage_is_updated_on_subsequent_run(self):
+        tasks.calculate_usage_for_current_month()
+        models.ComponentUsage.objects.update(usage=20)
+        tasks.calculate_usage_for_current_month()
+
+        self.assertEqual(models.CategoryComponentUsage.objects.count(), 2)
+        for usage in models.CategoryComponentUsage.objects.all():
+            self.assertEqual(usage.reported_usage, 20)
+
     def test_calculate_usage_if_category_component_is_not_set(self):
         self.offering_component.parent = None
         self.offering_component.save()
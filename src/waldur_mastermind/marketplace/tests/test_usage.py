@@ -9,9 +9,11 @@ from rest_framework import status, test
 from waldur_core.core import utils as core_utils
 from waldur_core.logging import models as logging_models
 from waldur_core.structure.tests import fixtures as structure_fixtures
+from waldur_mastermind.billing import models as billing_models
 from waldur_mastermind.common.mixins import UnitPriceMixin
 from waldur_mastermind.common.utils import parse_datetime
-from waldur_mastermind.marketplace import callbacks, models
+from waldur_mastermind.invoices import models as invoices_models
+from waldur_mastermind.marketplace import PLUGIN_NAME, callbacks, models
 from waldur_mastermind.marketplace.tests import factories
 
 
@@ -409,3 +411,133 @@ class SubmitUsageTest(test.APITransactionTestCase):
                 {'type': 'ram', 'amount': amount, 'description': description,},
             ],
         }
+
+
+@freeze_time('2017-01-10')
+class BulkSubmitUsageTest(test.APITransactionTestCase):
+    def setUp(self):
+        self.fixture = structure_fixtures.ProjectFixture()
+        self.offering = factories.OfferingFactory(customer=self.fixture.customer)
+        self.plan = factories.PlanFactory(
+            unit=UnitPriceMixin.Units.PER_DAY, offering=self.offering
+        )
+        self.offering_component = factories.OfferingComponentFactory(
+            offering=self.offering,
+            billing_type=models.OfferingComponent.BillingTypes.USAGE,
+            type='cpu',
+        )
+        factories.PlanComponentFactory(
+            plan=self.plan, component=self.offering_component
+        )
+        self.plan_periods = [self.create_plan_period() for _ in range(3)]
+        self.url = '/api/marketplace-component-usages/set_usages/'
+
+    def create_plan_period(self):
+        resource = models.Resource.objects.create(
+            offering=self.offering,
+            plan=self.plan,
+            project=self.fixture.project,
+            state=models.Resource.States.OK,
+        )
+        return models.ResourcePlanPeriod.objects.create(
+            resource=resource, plan=self.plan, start=timezone.now()
+        )
+
+    def get_payload(self, amount=5):
+        return {
+            'items': [
+                {
+                    'plan_period': plan_period.uuid.hex,
+                    'usages': [{'type': 'cpu', 'amount': amount}],
+                }
+                for plan_period in self.plan_periods
+            ]
+        }
+
+    def test_usages_of_many_resources_are_created(self):
+        self.client.force_authenticate(self.fixture.owner)
+        response = self.client.post(self.url, self.get_payload())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [row['status'] for row in response.data], ['created'] * 3,
+        )
+        self.assertEqual(
+            models.ComponentUsage.objects.filter(
+                plan_period__in=self.plan_periods, usage=5
+            ).count(),
+            3,
+        )
+
+    def test_only_changed_usages_are_updated(self):
+        self.client.force_authenticate(self.fixture.owner)
+        self.client.post(self.url, self.get_payload())
+
+        payload = self.get_payload()
+        payload['items'][0]['usages'][0]['amount'] = 8
+        response = self.client.post(self.url, payload)
+        self.assertEqual(
+            [row['status'] for row in response.data],
+            ['updated', 'unchanged', 'unchanged'],
+        )
+        usage = models.ComponentUsage.objects.get(plan_period=self.plan_periods[0])
+        self.assertEqual(usage.usage, 8)
+        logging_models.Event.objects.get(
+            message='Marketplace component usage %s has been updated.' % usage.uuid
+        )
+
+    def test_invoice_items_are_updated_in_bulk(self):
+        self.offering.type = PLUGIN_NAME
+        self.offering.save()
+        self.client.force_authenticate(self.fixture.owner)
+        self.client.post(self.url, self.get_payload())
+
+        items = invoices_models.InvoiceItem.objects.filter(
+            details__plan_period_id__in=[
+                plan_period.id for plan_period in self.plan_periods
+            ]
+        )
+        self.assertEqual([item.quantity for item in items], [5] * 3)
+
+        with mock.patch.object(
+            invoices_models.InvoiceItem, 'save'
+        ) as save, mock.patch.object(models.ComponentUsage, 'save'):
+            self.client.post(self.url, self.get_payload(amount=8))
+            save.assert_not_called()
+
+        self.assertEqual([item.quantity for item in items], [8] * 3)
+
+        invoice = items[0].invoice
+        invoice.refresh_from_db()
+        self.assertEqual(invoice.current_cost, 8 * 10 * 3)
+        estimate = billing_models.PriceEstimate.objects.get(scope=self.fixture.project)
+        self.assertAlmostEqual(estimate.total, 8 * 10 * 3)
+
+    def test_invalid_rows_are_reported_without_rejecting_valid_ones(self):
+        self.client.force_authenticate(self.fixture.owner)
+        resource = self.plan_periods[1].resource
+        resource.set_state_terminated()
+        resource.save()
+
+        response = self.client.post(self.url, self.get_payload())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [row['status'] for row in response.data], ['created', 'error', 'created'],
+        )
+        self.assertFalse(
+            models.ComponentUsage.objects.filter(resource=resource).exists()
+        )
+
+    def test_other_user_can_not_submit_usages(self):
+        self.client.force_authenticate(self.fixture.manager)
+        response = self.client.post(self.url, self.get_payload())
+        self.assertEqual(
+            [row['status'] for row in response.data], ['error'] * 3,
+        )
+        self.assertFalse(models.ComponentUsage.objects.exists())
+
+    def test_plan_period_can_not_be_submitted_twice(self):
+        self.client.force_authenticate(self.fixture.owner)
+        payload = self.get_payload()
+        payload['items'].append(payload['items'][0])
+        response = self.client.post(self.url, payload)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -1,19 +1,22 @@
 import base64
 import datetime
 import decimal
+import hashlib
 import logging
 import os
+import uuid
 from io import BytesIO
 
 import pdfkit
 from dateutil.relativedelta import relativedelta
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
 from django.core.files.base import ContentFile
 from django.core.files.storage import default_storage as storage
 from django.db import transaction
-from django.db.models import Sum
+from django.db.models import F, Q, Sum
 from django.template.loader import render_to_string
 from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
@@ -27,7 +30,7 @@ from waldur_core.core import utils as core_utils
 from waldur_core.structure import filters as structure_filters
 from waldur_core.structure import models as structure_models
 from waldur_mastermind.invoices import models as invoice_models
-from waldur_mastermind.invoices import registrators
+from waldur_mastermind.invoices import pricing, registrators
 from waldur_mastermind.marketplace import attribute_types
 
 from . import models, plugins
@@ -445,37 +448,137 @@ def add_marketplace_offering(sender, fields, **kwargs):
     setattr(sender, 'get_is_usage_based', get_is_usage_based)
 
 
-def get_offering_costs(offering, active_customers, start, end):
-    costs = []
-    date = start
+OFFERING_STATS_CACHE_TIMEOUT = 60 * 60
+
 
+def get_periods(start, end):
+    periods = []
+    date = start
     while date <= end:
-        year = date.year
-        month = date.month
-
-        invoice_items = invoice_models.InvoiceItem.objects.filter(
-            details__offering_uuid=offering.uuid.hex,
-            project__customer__in=active_customers,
-            invoice__year=year,
-            invoice__month=month,
-        )
+        periods.append(date)
+        date += relativedelta(months=1)
+    return periods
+
+
+def get_invoice_period_query(start, end):
+    return (
+        Q(invoice__year__gt=start.year)
+        | Q(invoice__year=start.year, invoice__month__gte=start.month)
+    ) & (
+        Q(invoice__year__lt=end.year)
+        | Q(invoice__year=end.year, invoice__month__lte=end.month)
+    )
+
+
+def get_offering_stats_version_key(offering_uuid):
+    return 'marketplace_offering_stats_version_%s' % offering_uuid
+
+
+def get_offering_stats_version(offering):
+    key = get_offering_stats_version_key(offering.uuid.hex)
+    version = cache.get(key)
+    if version is None:
+        version = uuid.uuid4().hex
+        cache.set(key, version, None)
+    return version
+
+
+def invalidate_offering_stats(offering_uuids):
+    """
+    Cached statistics of offering are not reused after its version is changed.
+    """
+    cache.set_many(
+        {
+            get_offering_stats_version_key(offering_uuid): uuid.uuid4().hex
+            for offering_uuid in offering_uuids
+        },
+        None,
+    )
 
-        stats = {
+
+def get_cached_offering_stats(name, offering, active_customers, start, end, func):
+    """
+    Return dictionary mapping period start date to offering statistics.
+    Statistics for missing periods are calculated by func for the whole range
+    of missing periods at once. Statistics for past periods are cached,
+    because invoices of these periods are not expected to change often.
+    Cache is invalidated when invoice items of past periods are changed.
+    """
+    customer_ids = sorted(active_customers.values_list('id', flat=True))
+    customers_hash = hashlib.sha256(str(customer_ids).encode('utf-8')).hexdigest()
+    version = get_offering_stats_version(offering)
+    keys = {
+        date: 'marketplace_offering_%s_%s_%s_%s_%s'
+        % (name, offering.uuid.hex, date.strftime('%Y-%m'), customers_hash, version)
+        for date in get_periods(start, end)
+    }
+    cached = cache.get_many(keys.values())
+    result = {date: cached[key] for date, key in keys.items() if key in cached}
+
+    missing = [date for date in keys if date not in result]
+    if missing:
+        computed = func(offering, active_customers, missing[0], missing[-1])
+        current_period = core_utils.month_start(timezone.now()).date()
+        to_cache = {}
+        for date in missing:
+            result[date] = computed[date]
+            if date < current_period:
+                to_cache[keys[date]] = computed[date]
+        cache.set_many(to_cache, OFFERING_STATS_CACHE_TIMEOUT)
+
+    return result
+
+
+def get_offering_costs(offering, active_customers, start, end):
+    stats = get_cached_offering_stats(
+        'costs', offering, active_customers, start, end, calculate_offering_costs
+    )
+    return [stats[date] for date in get_periods(start, end)]
+
+
+def calculate_offering_costs(offering, active_customers, start, end):
+    invoice_items = invoice_models.InvoiceItem.objects.filter(
+        get_invoice_period_query(start, end),
+        details__offering_uuid=offering.uuid.hex,
+        project__customer__in=active_customers,
+    )
+    tax_rate = F('invoice__tax_percent') / pricing.number(100)
+
+    costs = {
+        date: {
             'tax': 0,
             'total': 0,
             'price': 0,
             'price_current': 0,
-            'period': '%s-%02d' % (year, month),
+            'period': '%s-%02d' % (date.year, date.month),
         }
-        for item in invoice_items:
-            stats['tax'] += item.tax
-            stats['total'] += item.total
-            stats['price'] += item.price
-            stats['price_current'] += item.price_current
-
-        costs.append(stats)
+        for date in get_periods(start, end)
+    }
 
-        date += relativedelta(months=1)
+    rows = (
+        pricing.annotate_price(invoice_items)
+        .order_by()
+        .values('invoice__year', 'invoice__month')
+        .annotate(
+            price=Sum('computed_price'),
+            tax=Sum(pricing.decimal_expression(F('computed_price') * tax_rate)),
+        )
+    )
+    for row in rows:
+        stats = costs[datetime.date(row['invoice__year'], row['invoice__month'], 1)]
+        stats['price'] = row['price']
+        stats['tax'] = row['tax']
+        stats['total'] = row['price'] + row['tax']
+
+    rows = (
+        pricing.annotate_price(invoice_items, current=True)
+        .order_by()
+        .values('invoice__year', 'invoice__month')
+        .annotate(price_current=Sum('computed_price'))
+    )
+    for row in rows:
+        stats = costs[datetime.date(row['invoice__year'], row['invoice__month'], 1)]
+        stats['price_current'] = row['price_current']
 
     return costs
 
@@ -512,173 +615,162 @@ def get_active_customers(request, view):
 
 
 def get_offering_component_stats(offering, active_customers, start, end):
-    component_stats = []
+    stats = get_cached_offering_stats(
+        'component_stats',
+        offering,
+        active_customers,
+        start,
+        end,
+        calculate_offering_component_stats,
+    )
+    return [item for date in get_periods(start, end) for item in stats[date]]
+
+
+def calculate_offering_component_stats(offering, active_customers, start, end):
+    """
+    Return dictionary mapping period start date to the list of component statistics.
+    Invoice items of all periods are fetched using single query, and
+    statistics are grouped by period and offering component.
+    """
+    component_stats = {date: {} for date in get_periods(start, end)}
 
     resources = models.Resource.objects.filter(
         offering=offering, project__customer__in=active_customers,
     )
-    resources_ids = resources.values_list('id', flat=True)
-    date = start
+    invoice_items = invoice_models.InvoiceItem.objects.filter(
+        get_invoice_period_query(start, end),
+        content_type_id=ContentType.objects.get_for_model(models.Resource).id,
+        object_id__in=resources.values('id'),
+    )
+    rows = list(
+        pricing.annotate_factor(invoice_items)
+        .order_by('invoice__year', 'invoice__month', 'id')
+        .values_list(
+            'id', 'invoice__year', 'invoice__month', 'details', 'computed_factor'
+        )
+    )
 
-    while date <= end:
-        year = date.year
-        month = date.month
-        period = '%s-%02d' % (year, month)
+    components = {
+        component.type: component for component in offering.estimated_components
+    }
+    plan_component_ids = {
+        details.get('plan_component_id')
+        for (_, _, _, details, _) in rows
+        if not details.get('limits') and details.get('plan_component_id')
+    }
+    plan_components = {
+        str(plan_component.id): plan_component
+        for plan_component in models.PlanComponent.objects.filter(
+            id__in=plan_component_ids
+        ).select_related('component')
+    }
+    usage_component_ids = {
+        plan_component.component_id
+        for plan_component in plan_components.values()
+        if plan_component.component.billing_type
+        == models.OfferingComponent.BillingTypes.USAGE
+    }
+    component_usages = {
+        (row['component_id'], row['billing_period']): row['usage']
+        for row in models.ComponentUsage.objects.filter(
+            component_id__in=usage_component_ids,
+            billing_period__in=list(component_stats.keys()),
+        )
+        .order_by()
+        .values('component_id', 'billing_period')
+        .annotate(usage=Sum('usage'))
+    }
+
+    def get_component_stats(component, date, usage):
+        period = '%s-%02d' % (date.year, date.month)
         # for consistency with usage resource usage reporting, assume values at the beginning of the last day
         period_visible = (
             core_utils.month_end(date)
             .replace(hour=0, minute=0, second=0, microsecond=0)
             .isoformat()
         )
-        invoice_items = invoice_models.InvoiceItem.objects.filter(
-            content_type_id=ContentType.objects.get_for_model(models.Resource).id,
-            object_id__in=resources_ids,
-            invoice__year=year,
-            invoice__month=month,
-        )
+        return {
+            'usage': usage,
+            'description': component.description,
+            'measured_unit': component.measured_unit,
+            'type': component.type,
+            'name': component.name,
+            'period': period,
+            'date': period_visible,
+        }
 
-        for item in invoice_items:
-            limits = item.details.get('limits', {})
-
-            if limits:
-                # Case when invoice item details includes limits. This is correct for openstack offering for example.
-                '''If a resource will be deleted then usages will be deleted too.
-                Then statistics will be not available.
-                Therefore we use invoice item details.'''
-                usages = item.details.get('usages', {})
-                limits.update(usages)
-
-                for limit, usage in limits.items():
-
-                    if not isinstance(item.scope, models.Resource):
-                        logger.error(
-                            'Invoice item scope %s is not resource object.' % item.id
-                        )
-                        continue
-
-                    components = offering.estimated_components
-
-                    try:
-                        component = components.get(type=limit)
-                    except ObjectDoesNotExist:
-                        logger.error(
-                            'Limit %s of invoice item %s is not found.'
-                            % (limit, item.id)
-                        )
-                        continue
-
-                    normalized_usage = float(
-                        decimal.Decimal(usage)
-                        / decimal.Decimal(
-                            offering.component_factors.get(component.type, 1)
-                        )
-                    )
-                    other = [
-                        *filter(
-                            lambda x: x['period'] == period
-                            and x['offering_component_id'] == limit,
-                            component_stats,
-                        )
-                    ]
-                    if other:
-                        stats = other[0]
-                        stats['usage'] += normalized_usage
-                    else:
-                        stats = {
-                            'usage': normalized_usage,
-                            'description': component.description,
-                            'measured_unit': component.measured_unit,
-                            'type': component.type,
-                            'name': component.name,
-                            'period': period,
-                            'date': period_visible,
-                            'offering_component_id': component.type,
-                            # offering_component_id is needed for components uniting
-                            # of  the same offering components and periods.
-                        }
-                        component_stats.append(stats)
-                # avoid processing invoice items further if InvoiceItem contains limits details
-                continue
-
-            # Case when invoice item details includes plan component data.
-            plan_component_id = item.details.get('plan_component_id')
-
-            if not plan_component_id:
-                continue
-
-            try:
-                plan_component = models.PlanComponent.objects.get(pk=plan_component_id)
-                offering_component = plan_component.component
-
-                if (
-                    offering_component.billing_type
-                    == models.OfferingComponent.BillingTypes.USAGE
-                ):
-                    if [
-                        *filter(
-                            lambda x: x['period'] == period
-                            and x['offering_component_id'] == offering_component.id,
-                            component_stats,
-                        )
-                    ]:
-                        continue
-
-                    usages = models.ComponentUsage.objects.filter(
-                        component=offering_component, billing_period=date
-                    ).aggregate(usage=Sum('usage'))['usage']
-
-                    component_stats.append(
-                        {
-                            'usage': usages,
-                            'description': offering_component.description,
-                            'measured_unit': offering_component.measured_unit,
-                            'type': offering_component.type,
-                            'name': offering_component.name,
-                            'period': period,
-                            'date': period_visible,
-                            'offering_component_id': offering_component.id,
-                        }
+    for item_id, year, month, details, factor in rows:
+        date = datetime.date(year, month, 1)
+        # Stats are united by offering component within the same period
+        period_stats = component_stats[date]
+        limits = details.get('limits', {})
+
+        if limits:
+            # Case when invoice item details includes limits. This is correct for openstack offering for example.
+            '''If a resource will be deleted then usages will be deleted too.
+            Then statistics will be not available.
+            Therefore we use invoice item details.'''
+            usages = details.get('usages', {})
+            limits.update(usages)
+
+            for limit, usage in limits.items():
+                component = components.get(limit)
+                if not component:
+                    logger.error(
+                        'Limit %s of invoice item %s is not found.' % (limit, item_id)
                     )
+                    continue
 
-                if (
-                    offering_component.billing_type
-                    == models.OfferingComponent.BillingTypes.FIXED
-                ):
-                    other = [
-                        *filter(
-                            lambda x: x['period'] == period
-                            and x['offering_component_id'] == offering_component.id,
-                            component_stats,
-                        )
-                    ]
-                    if other:
-                        other[0]['usage'] += item.get_factor()
-                        continue
-
-                    component_stats.append(
-                        {
-                            'usage': item.get_factor(),
-                            'description': offering_component.description,
-                            'measured_unit': offering_component.measured_unit,
-                            'type': offering_component.type,
-                            'name': offering_component.name,
-                            'period': period,
-                            'date': period_visible,
-                            'offering_component_id': offering_component.id,
-                        }
+                normalized_usage = float(
+                    decimal.Decimal(usage)
+                    / decimal.Decimal(offering.component_factors.get(component.type, 1))
+                )
+                if limit in period_stats:
+                    period_stats[limit]['usage'] += normalized_usage
+                else:
+                    period_stats[limit] = get_component_stats(
+                        component, date, normalized_usage
                     )
+            # avoid processing invoice items further if InvoiceItem contains limits details
+            continue
 
-            except models.PlanComponent.DoesNotExist:
-                logger.error(
-                    'PlanComponent with id %s is not found.' % plan_component_id
-                )
+        # Case when invoice item details includes plan component data.
+        plan_component_id = details.get('plan_component_id')
 
-        date += relativedelta(months=1)
+        if not plan_component_id:
+            continue
+
+        plan_component = plan_components.get(str(plan_component_id))
+        if not plan_component:
+            logger.error('PlanComponent with id %s is not found.' % plan_component_id)
+            continue
+
+        offering_component = plan_component.component
+
+        if (
+            offering_component.billing_type
+            == models.OfferingComponent.BillingTypes.USAGE
+        ):
+            if offering_component.id not in period_stats:
+                period_stats[offering_component.id] = get_component_stats(
+                    offering_component,
+                    date,
+                    component_usages.get((offering_component.id, date)),
+                )
 
-    # delete internal data
-    [s.pop('offering_component_id', None) for s in component_stats]
+        if (
+            offering_component.billing_type
+            == models.OfferingComponent.BillingTypes.FIXED
+        ):
+            factor = pricing.get_factor_value(factor)
+            if offering_component.id in period_stats:
+                period_stats[offering_component.id]['usage'] += factor
+            else:
+                period_stats[offering_component.id] = get_component_stats(
+                    offering_component, date, factor
+                )
 
-    return component_stats
+    return {date: list(stats.values()) for date, stats in component_stats.items()}
 
 
 class MoveResourceException(Exception):
@@ -31,6 +31,7 @@ from rest_framework.generics import ListAPIView
 from rest_framework.response import Response
 from rest_framework.reverse import reverse
 
+from waldur_core.core import pagination as core_pagination
 from waldur_core.core import validators as core_validators
 from waldur_core.core import views as core_views
 from waldur_core.core.mixins import EagerLoadMixin
@@ -798,6 +799,7 @@ class ResourceViewSet(core_views.ActionsViewSet):
     queryset = models.Resource.objects.all()
     filter_backends = (DjangoFilterBackend, filters.ResourceScopeFilterBackend)
     filterset_class = filters.ResourceFilter
+    pagination_class = core_pagination.ApproximateCountLinkHeaderPagination
     lookup_field = 'uuid'
     serializer_class = serializers.ResourceSerializer
     disabled_actions = ['create', 'destroy']
@@ -1060,6 +1062,15 @@ class ComponentUsageViewSet(core_views.ReadOnlyActionsViewSet):
 
     set_usage_serializer_class = serializers.ComponentUsageCreateSerializer
 
+    @action(detail=False, methods=['post'])
+    def set_usages(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = serializer.save()
+        return Response(results, status=status.HTTP_200_OK)
+
+    set_usages_serializer_class = serializers.ComponentUsageBulkCreateSerializer
+
 
 class MarketplaceAPIViewSet(rf_viewsets.ViewSet):
     """
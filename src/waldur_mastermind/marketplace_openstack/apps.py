@@ -14,6 +14,7 @@ class MarketplaceOpenStackConfig(AppConfig):
 
     def ready(self):
         from waldur_core.quotas import models as quota_models
+        from waldur_core.quotas import signals as quotas_signals
         from waldur_core.structure import models as structure_models
         from waldur_core.structure import signals as structure_signals
         from waldur_openstack.openstack import models as openstack_models
@@ -217,6 +218,13 @@ class MarketplaceOpenStackConfig(AppConfig):
             'update_openstack_tenant_usages',
         )
 
+        quotas_signals.quotas_usage_updated.connect(
+            handlers.update_openstack_tenant_usages_in_bulk,
+            sender=quota_models.Quota,
+            dispatch_uid='waldur_mastermind.marketplace_openstack.'
+            'update_openstack_tenant_usages_in_bulk',
+        )
+
         registrators.RegistrationManager.add_registrator(
             PACKAGE_TYPE, MarketplaceItemRegistrator,
         )
@@ -523,8 +523,20 @@ def update_openstack_tenant_usages(sender, instance, created=False, **kwargs):
     if not isinstance(instance.scope, openstack_models.Tenant):
         return
 
-    tenant = instance.scope
+    import_tenant_usages(instance.scope)
 
+
+def update_openstack_tenant_usages_in_bulk(sender, quotas, **kwargs):
+    tenants = {
+        quota.scope.id: quota.scope
+        for quota in quotas
+        if isinstance(quota.scope, openstack_models.Tenant)
+    }
+    for tenant in tenants.values():
+        import_tenant_usages(tenant)
+
+
+def import_tenant_usages(tenant):
     try:
         resource = marketplace_models.Resource.objects.get(scope=tenant)
     except ObjectDoesNotExist:
@@ -7,11 +7,12 @@ class MarketplaceSlurmConfig(AppConfig):
     verbose_name = 'Marketplace SLURM'
 
     def ready(self):
-        from waldur_mastermind.marketplace.plugins import Component, manager
-        from waldur_mastermind.marketplace import models as marketplace_models
         from waldur_mastermind.marketplace import handlers as marketplace_handlers
+        from waldur_mastermind.marketplace import models as marketplace_models
+        from waldur_mastermind.marketplace.plugins import Component, manager
         from waldur_mastermind.marketplace_slurm import PLUGIN_NAME
         from waldur_slurm import models as slurm_models
+        from waldur_slurm import signals as slurm_signals
         from waldur_slurm.apps import SlurmConfig
 
         from . import handlers, processor
@@ -34,6 +35,18 @@ class MarketplaceSlurmConfig(AppConfig):
             dispatch_uid='waldur_mastermind.marketplace_slurm.update_component_quota',
         )
 
+        slurm_signals.allocation_usages_updated.connect(
+            handlers.create_slurm_usages,
+            sender=slurm_models.AllocationUsage,
+            dispatch_uid='waldur_mastermind.marketplace_slurm.create_slurm_usages',
+        )
+
+        slurm_signals.allocations_usage_updated.connect(
+            handlers.update_component_quotas,
+            sender=slurm_models.Allocation,
+            dispatch_uid='waldur_mastermind.marketplace_slurm.update_component_quotas',
+        )
+
         marketplace_handlers.connect_resource_handlers(slurm_models.Allocation)
         marketplace_handlers.connect_resource_metadata_handlers(slurm_models.Allocation)
 
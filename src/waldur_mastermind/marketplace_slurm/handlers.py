@@ -1,16 +1,20 @@
 import datetime
 import logging
 
+from django.contrib.contenttypes.models import ContentType
 from django.core import exceptions as django_exceptions
 from django.db import IntegrityError, transaction
 from django.db.models import Q
+from django.utils import timezone
 
 from waldur_core.core.utils import month_start
 from waldur_core.structure import models as structure_models
 from waldur_mastermind.marketplace import models as marketplace_models
+from waldur_mastermind.marketplace import signals as marketplace_signals
 from waldur_mastermind.marketplace.plugins import manager
 from waldur_mastermind.marketplace_slurm import PLUGIN_NAME
 from waldur_mastermind.slurm_invoices import models as slurm_invoices_models
+from waldur_slurm import models as slurm_models
 from waldur_slurm.apps import SlurmConfig
 
 logger = logging.getLogger(__name__)
@@ -185,3 +189,189 @@ def update_component_quota(sender, instance, created=False, **kwargs):
             marketplace_models.ComponentQuota.objects.create(
                 resource=resource, component=plan_component, limit=limit, usage=usage
             )
+
+
+def get_allocation_resources(allocation_ids):
+    resources = marketplace_models.Resource.objects.filter(
+        content_type=ContentType.objects.get_for_model(slurm_models.Allocation),
+        object_id__in=allocation_ids,
+    ).select_related('offering')
+    return {resource.object_id: resource for resource in resources}
+
+
+def get_offering_components(resources):
+    return {
+        (component.offering_id, component.type): component
+        for component in marketplace_models.OfferingComponent.objects.filter(
+            offering_id__in={resource.offering_id for resource in resources}
+        )
+    }
+
+
+def create_slurm_usages(sender, allocation_usages, **kwargs):
+    # Grouped counterpart of create_slurm_usage for usages stored in bulk
+    transaction.on_commit(lambda: _create_slurm_usages(allocation_usages))
+
+
+def _create_slurm_usages(allocation_usages):
+    resources = get_allocation_resources(
+        {allocation_usage.allocation_id for allocation_usage in allocation_usages}
+    )
+    if not resources:
+        return
+
+    offering_components = get_offering_components(resources.values())
+    plan_periods = {}
+    for plan_period in marketplace_models.ResourcePlanPeriod.objects.filter(
+        resource__in=resources.values()
+    ):
+        plan_periods.setdefault(plan_period.resource_id, []).append(plan_period)
+
+    dates = {
+        datetime.date(year=allocation_usage.year, month=allocation_usage.month, day=1)
+        for allocation_usage in allocation_usages
+    }
+    component_usages = {
+        (
+            component_usage.resource_id,
+            component_usage.component_id,
+            component_usage.plan_period_id,
+            component_usage.billing_period,
+        ): component_usage
+        for component_usage in marketplace_models.ComponentUsage.objects.filter(
+            resource__in=resources.values(), billing_period__in=dates
+        )
+    }
+
+    now = timezone.now()
+    new_usages = []
+    changed_usages = []
+    for allocation_usage in allocation_usages:
+        resource = resources.get(allocation_usage.allocation_id)
+        if not resource:
+            continue
+
+        date = datetime.date(
+            year=allocation_usage.year, month=allocation_usage.month, day=1
+        )
+        period_start = month_start(date)
+        matching_periods = [
+            plan_period
+            for plan_period in plan_periods.get(resource.id, [])
+            if (not plan_period.start or plan_period.start <= period_start)
+            and (not plan_period.end or plan_period.end > period_start)
+        ]
+
+        for component in manager.get_components(PLUGIN_NAME):
+            usage = getattr(allocation_usage, component.type + '_usage')
+            offering_component = offering_components.get(
+                (resource.offering_id, component.type)
+            )
+            if not offering_component or len(matching_periods) != 1:
+                logger.warning(
+                    'Skipping AllocationUsage synchronization because this '
+                    'marketplace.OfferingComponent or plan period does not exist.'
+                    'AllocationUsage ID: %s',
+                    allocation_usage.id,
+                )
+                continue
+
+            plan_period = matching_periods[0]
+            component_usage = component_usages.get(
+                (resource.id, offering_component.id, plan_period.id, date)
+            )
+            if component_usage is None:
+                new_usages.append(
+                    marketplace_models.ComponentUsage(
+                        resource=resource,
+                        component=offering_component,
+                        billing_period=date,
+                        plan_period=plan_period,
+                        usage=usage,
+                        date=date,
+                    )
+                )
+            elif component_usage.usage != usage:
+                component_usage.usage = usage
+                component_usage.date = date
+                component_usage.modified = now
+                changed_usages.append(component_usage)
+
+    try:
+        with transaction.atomic():
+            marketplace_models.ComponentUsage.objects.bulk_create(new_usages)
+            marketplace_models.ComponentUsage.objects.bulk_update(
+                changed_usages, ['usage', 'date', 'modified']
+            )
+    except IntegrityError:
+        logger.warning(
+            'Skipping AllocationUsage synchronization because marketplace.ComponentUsage exists.',
+            exc_info=True,
+        )
+        return
+
+    logger.debug(
+        '%s marketplace.ComponentUsage objects were created and %s were updated.',
+        len(new_usages),
+        len(changed_usages),
+    )
+    marketplace_signals.component_usages_updated.send(
+        sender=marketplace_models.ComponentUsage, usages=new_usages + changed_usages,
+    )
+
+
+def update_component_quotas(sender, allocations, **kwargs):
+    # Grouped counterpart of update_component_quota for allocations updated in bulk
+    resources = get_allocation_resources([allocation.id for allocation in allocations])
+    if not resources:
+        return
+
+    offering_components = get_offering_components(resources.values())
+    component_quotas = {
+        (component_quota.resource_id, component_quota.component_id): component_quota
+        for component_quota in marketplace_models.ComponentQuota.objects.filter(
+            resource__in=resources.values()
+        )
+    }
+
+    new_quotas = []
+    changed_quotas = []
+    for allocation in allocations:
+        resource = resources.get(allocation.id)
+        if not resource:
+            continue
+
+        for component in manager.get_components(PLUGIN_NAME):
+            usage = getattr(allocation, component.type + '_usage')
+            limit = getattr(allocation, component.type + '_limit')
+            offering_component = offering_components.get(
+                (resource.offering_id, component.type)
+            )
+            if not offering_component:
+                logger.warning(
+                    'Skipping Allocation synchronization because this '
+                    'marketplace.OfferingComponent does not exist.'
+                    'Allocation ID: %s',
+                    allocation.id,
+                )
+                continue
+
+            component_quota = component_quotas.get((resource.id, offering_component.id))
+            if component_quota is None:
+                new_quotas.append(
+                    marketplace_models.ComponentQuota(
+                        resource=resource,
+                        component=offering_component,
+                        limit=limit,
+                        usage=usage,
+                    )
+                )
+            else:
+                component_quota.limit = limit
+                component_quota.usage = usage
+                changed_quotas.append(component_quota)
+
+    marketplace_models.ComponentQuota.objects.bulk_create(new_quotas)
+    marketplace_models.ComponentQuota.objects.bulk_update(
+        changed_quotas, ['limit', 'usage']
+    )
@@ -54,14 +54,16 @@ class BaseTest(test.APITransactionTestCase):
 
 class ComponentUsageTest(BaseTest):
     @freeze_time('2017-01-16')
-    @mock.patch('subprocess.check_output')
-    def test_backend_triggers_usage_sync(self, check_output):
+    @mock.patch('subprocess.Popen')
+    def test_backend_triggers_usage_sync(self, popen):
         account = self.allocation.backend_id
         VALID_REPORT = """
         allocation1|cpu=1,node=1,gres/gpu=1,gres/gpu:tesla=1|00:01:00|user1|
         allocation1|cpu=2,node=2,gres/gpu=2,gres/gpu:tesla=1|00:02:00|user2|
         """
-        check_output.return_value = VALID_REPORT.replace('allocation1', account)
+        report = VALID_REPORT.replace('allocation1', account)
+        popen.return_value.stdout = iter(report.splitlines(keepends=True))
+        popen.return_value.returncode = 0
 
         backend = self.allocation.get_backend()
         backend.sync_usage()
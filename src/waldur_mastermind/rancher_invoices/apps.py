@@ -9,6 +9,7 @@ class RancherInvoicesConfig(AppConfig):
     def ready(self):
         from waldur_rancher import models as rancher_models
         from waldur_mastermind.marketplace import models as marketplace_models
+        from waldur_mastermind.marketplace import signals as marketplace_signals
         from . import handlers
 
         signals.post_save.connect(
@@ -22,3 +23,9 @@ class RancherInvoicesConfig(AppConfig):
             sender=marketplace_models.ComponentUsage,
             dispatch_uid='support_invoices.handlers.create_invoice_item_if_component_usage_has_been_created',
         )
+
+        marketplace_signals.component_usages_updated.connect(
+            handlers.create_invoice_items_if_component_usages_have_been_updated,
+            sender=marketplace_models.ComponentUsage,
+            dispatch_uid='rancher_invoices.handlers.create_invoice_items_if_component_usages_have_been_updated',
+        )
@@ -1,3 +1,5 @@
+from django.contrib.contenttypes.models import ContentType
+
 from waldur_rancher import models as rancher_models
 
 from . import utils
@@ -20,3 +22,16 @@ def create_invoice_item_if_component_usage_has_been_created(
         return
 
     utils.component_usage_register(component_usage)
+
+
+def create_invoice_items_if_component_usages_have_been_updated(
+    sender, usages, **kwargs
+):
+    """
+    Grouped counterpart of create_invoice_item_if_component_usage_has_been_created
+    for usages stored in bulk. Scope of resources is not fetched for other resources.
+    """
+    content_type = ContentType.objects.get_for_model(rancher_models.Cluster)
+    for component_usage in usages:
+        if component_usage.resource.content_type_id == content_type.id:
+            utils.component_usage_register(component_usage)
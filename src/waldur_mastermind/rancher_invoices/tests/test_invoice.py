@@ -9,6 +9,7 @@ from waldur_core.core import utils as core_utils
 from waldur_mastermind.invoices import models as invoices_models
 from waldur_mastermind.invoices import tasks as invoices_tasks
 from waldur_mastermind.marketplace import models as marketplace_models
+from waldur_mastermind.marketplace import signals as marketplace_signals
 from waldur_mastermind.marketplace import tasks as marketplace_tasks
 from waldur_mastermind.marketplace.tests import factories as marketplace_factories
 from waldur_mastermind.marketplace_rancher import PLUGIN_NAME
@@ -154,6 +155,24 @@ class InvoiceTest(test.APITransactionTestCase):
         self.assertEqual(invoice.items.count(), 1)
         self.assertEqual(invoice.price, self.plan_component.price)
 
+    @freeze_time('2019-01-01')
+    @mock.patch('waldur_rancher.views.executors')
+    def test_invoice_item_is_updated_if_usages_are_updated_in_bulk(
+        self, mock_executors
+    ):
+        self._create_usage(mock_executors)
+        usage = marketplace_models.ComponentUsage.objects.get(
+            resource=self.resource, component=self.offering_component
+        )
+        usage.usage = 3
+        marketplace_models.ComponentUsage.objects.bulk_update([usage], ['usage'])
+        marketplace_signals.component_usages_updated.send(
+            sender=marketplace_models.ComponentUsage, usages=[usage]
+        )
+        invoice = invoices_models.Invoice.objects.get(customer=self.cluster.customer)
+        self.assertEqual(invoice.items.count(), 1)
+        self.assertEqual(invoice.price, self.plan_component.price * 3)
+
     @freeze_time('2019-01-01')
     @mock.patch('waldur_rancher.views.executors')
     def test_usage_is_zero_if_node_is_not_active(self, mock_executors):
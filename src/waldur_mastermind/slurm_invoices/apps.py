@@ -9,7 +9,10 @@ class SlurmInvoicesConfig(AppConfig):
     def ready(self):
         from waldur_mastermind.invoices import registrators
         from waldur_slurm import models as slurm_models
-        from . import handlers, registrators as slurm_registrators
+        from waldur_slurm import signals as slurm_signals
+
+        from . import handlers
+        from . import registrators as slurm_registrators
 
         registrators.RegistrationManager.add_registrator(
             slurm_models.Allocation, slurm_registrators.AllocationRegistrator
@@ -32,3 +35,9 @@ class SlurmInvoicesConfig(AppConfig):
             sender=slurm_models.AllocationUsage,
             dispatch_uid='waldur_slurm.handlers.update_invoice_item_on_allocation_usage_update',
         )
+
+        slurm_signals.allocation_usages_updated.connect(
+            handlers.update_invoice_items_on_allocation_usages_update,
+            sender=slurm_models.AllocationUsage,
+            dispatch_uid='waldur_slurm.handlers.update_invoice_items_on_allocation_usages_update',
+        )
@@ -38,3 +38,12 @@ def update_invoice_item_on_allocation_usage_update(
         registrator.create_or_update_items(
             allocation, allocation_usage, package, invoice, start, end
         )
+
+
+def update_invoice_items_on_allocation_usages_update(
+    sender, allocation_usages, **kwargs
+):
+    start = timezone.now()
+    end = core_utils.month_end(start)
+    registrator = slurm_registrators.AllocationRegistrator()
+    registrator.update_items_in_bulk(allocation_usages, start, end)
@@ -5,6 +5,7 @@ from django.contrib.contenttypes.models import ContentType
 from waldur_core.core import utils as core_utils
 from waldur_mastermind.invoices import models as invoice_models
 from waldur_mastermind.invoices import registrators
+from waldur_mastermind.invoices import utils as invoices_utils
 from waldur_mastermind.marketplace import utils as marketplace_utils
 from waldur_mastermind.marketplace.plugins import manager
 from waldur_mastermind.marketplace_slurm import PLUGIN_NAME
@@ -87,6 +88,81 @@ class AllocationRegistrator(registrators.BaseRegistrator):
                         end,
                     )
 
+    def update_items_in_bulk(self, allocation_usages, start, end):
+        """
+        Grouped counterpart of create_or_update_items for allocation usages
+        stored in bulk. Existing invoice items are loaded and written at once.
+        """
+        packages = {}
+        for allocation_usage in allocation_usages:
+            allocation = allocation_usage.allocation
+            service_settings_id = allocation.service_project_link.service.settings_id
+            if service_settings_id not in packages:
+                packages[service_settings_id] = self.get_package(allocation)
+        allocation_usages = [
+            allocation_usage
+            for allocation_usage in allocation_usages
+            if packages[
+                allocation_usage.allocation.service_project_link.service.settings_id
+            ]
+        ]
+        if not allocation_usages:
+            return
+
+        customers = {
+            self.get_customer(allocation_usage.allocation)
+            for allocation_usage in allocation_usages
+        }
+        invoices = {
+            invoice.customer_id: invoice
+            for invoice in invoice_models.Invoice.objects.filter(
+                customer__in=customers, month=start.month, year=start.year,
+            )
+        }
+        items = {
+            (item.object_id, item.details.get('type')): item
+            for item in invoice_models.InvoiceItem.objects.filter(
+                content_type=ContentType.objects.get_for_model(slurm_models.Allocation),
+                object_id__in={
+                    allocation_usage.allocation_id
+                    for allocation_usage in allocation_usages
+                },
+                invoice__in=invoices.values(),
+                invoice__state=invoice_models.Invoice.States.PENDING,
+                end=core_utils.month_end(start),
+            ).order_by('id')
+        }
+
+        changed_items = []
+        for allocation_usage in allocation_usages:
+            allocation = allocation_usage.allocation
+            package = packages[allocation.service_project_link.service.settings_id]
+            invoice = invoices[self.get_customer(allocation).id]
+            for component in manager.get_components(PLUGIN_NAME):
+                component_usage = getattr(allocation_usage, component.type + '_usage')
+                if component_usage <= 0 or not allocation_usage.tracker.has_changed(
+                    component.type + '_usage'
+                ):
+                    continue
+                existing_item = items.get((allocation.id, component.type))
+                if existing_item:
+                    existing_item.quantity = utils.get_usage_quantity(
+                        component_usage, component.type
+                    )
+                    changed_items.append(existing_item)
+                else:
+                    self.create_single_item(
+                        allocation,
+                        package,
+                        component,
+                        component_usage,
+                        invoice,
+                        start,
+                        end,
+                    )
+
+        invoices_utils.bulk_update_invoice_items(changed_items, ['quantity'])
+
     def create_single_item(
         self, allocation, package, component, component_usage, invoice, start, end
     ):
@@ -91,6 +91,11 @@ class OpenStackExtension(WaldurExtension):
             'MANAGER_CAN_MANAGE_TENANTS': False,
             'ADMIN_CAN_MANAGE_TENANTS': False,
             'TENANT_CREDENTIALS_VISIBLE': True,
+            # Maximum number of OpenStack API calls issued concurrently by single backend
+            # operation, such as pull of tenant resources or quotas. Set to 1 to disable concurrency.
+            'API_CONCURRENCY': 4,
+            # Number of seconds to wait for result of single concurrent OpenStack API call
+            'API_CALL_TIMEOUT': 300,
         }
 
     @staticmethod
@@ -27,6 +27,8 @@ class ServiceUsageAggregatorQuotaField(UsageAggregatorQuotaField):
             get_children=lambda service: Tenant.objects.filter(
                 service_project_link__service=service
             ),
+            child_model=lambda: Tenant,
+            path_to_scope='service_project_link.service',
             **kwargs
         )
 
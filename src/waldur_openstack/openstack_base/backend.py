@@ -3,9 +3,11 @@ import hashlib
 import json
 import logging
 import re
+from concurrent import futures
 
 from cinderclient import exceptions as cinder_exceptions
 from cinderclient.v2 import client as cinder_client
+from django.conf import settings as django_settings
 from django.core.cache import cache
 from django.db import transaction
 from django.utils import timezone
@@ -177,6 +179,35 @@ class OpenStackClient:
             raise OpenStackBackendError(e)
 
 
+def run_concurrently(*calls):
+    """
+    Execute independent network-bound OpenStack API calls using bounded thread pool
+    and return their results in the same order as calls are given.
+    Calls should share clients created on the calling thread, so that they reuse
+    the same keystone session, and should not access database,
+    because all database writes are expected to be done on the calling thread.
+    Exception raised by the call is re-raised on the calling thread.
+    """
+    concurrency = django_settings.WALDUR_OPENSTACK['API_CONCURRENCY']
+    timeout = django_settings.WALDUR_OPENSTACK['API_CALL_TIMEOUT']
+    if concurrency <= 1 or len(calls) <= 1:
+        return [call() for call in calls]
+
+    executor = futures.ThreadPoolExecutor(
+        max_workers=min(concurrency, len(calls)), thread_name_prefix='openstack'
+    )
+    try:
+        pending = [executor.submit(call) for call in calls]
+        return [future.result(timeout=timeout) for future in pending]
+    except futures.TimeoutError:
+        raise OpenStackBackendError(
+            'OpenStack API call has not completed in %s seconds.' % timeout
+        )
+    finally:
+        # Do not block calling thread on calls which have timed out
+        executor.shutdown(wait=False)
+
+
 class BaseOpenStackBackend(ServiceBackend):
     def __init__(self, settings, tenant_id=None):
         self.settings = settings
@@ -286,9 +317,11 @@ class BaseOpenStackBackend(ServiceBackend):
         cinder = self.get_client('cinder', admin)
 
         try:
-            nova_quotas = nova.quotas.get(tenant_id=tenant_backend_id)
-            cinder_quotas = cinder.quotas.get(tenant_id=tenant_backend_id)
-            neutron_quotas = neutron.show_quota(tenant_id=tenant_backend_id)['quota']
+            nova_quotas, cinder_quotas, neutron_quotas = run_concurrently(
+                lambda: nova.quotas.get(tenant_id=tenant_backend_id),
+                lambda: cinder.quotas.get(tenant_id=tenant_backend_id),
+                lambda: neutron.show_quota(tenant_id=tenant_backend_id)['quota'],
+            )
         except (
             nova_exceptions.ClientException,
             cinder_exceptions.ClientException,
@@ -324,19 +357,25 @@ class BaseOpenStackBackend(ServiceBackend):
         cinder = self.get_client('cinder', admin)
 
         try:
-            nova_quotas = nova.quotas.get(
-                tenant_id=tenant_backend_id, detail=True
-            )._info
-            neutron_quotas = neutron.show_quota_details(tenant_backend_id)['quota']
             # There are no cinder quotas for total volumes and snapshots size.
             # Therefore we need to compute them manually by fetching list of volumes and snapshots in the tenant.
             # Also `list` method in volume and snapshots does not implement filtering by tenant ID.
             # That's why we need to assume that tenant_id field is set up in backend settings.
-            volumes = cinder.volumes.list()
-            snapshots = cinder.volume_snapshots.list()
-            cinder_quotas = cinder.quotas.get(
-                tenant_id=tenant_backend_id, usage=True
-            )._info
+            (
+                nova_quotas,
+                neutron_quotas,
+                volumes,
+                snapshots,
+                cinder_quotas,
+            ) = run_concurrently(
+                lambda: nova.quotas.get(tenant_id=tenant_backend_id, detail=True)._info,
+                lambda: neutron.show_quota_details(tenant_backend_id)['quota'],
+                cinder.volumes.list,
+                cinder.volume_snapshots.list,
+                lambda: cinder.quotas.get(
+                    tenant_id=tenant_backend_id, usage=True
+                )._info,
+            )
         except (
             nova_exceptions.ClientException,
             neutron_exceptions.NeutronClientException,
@@ -1,14 +1,20 @@
 import pickle  # noqa: S403
+import threading
 from unittest import TestCase
 
 from cinderclient import exceptions as cinder_exceptions
 from ddt import data, ddt
+from django.conf import settings
+from django.test import override_settings
 from glanceclient import exc as glance_exceptions
 from keystoneclient import exceptions as keystone_exceptions
 from neutronclient.client import exceptions as neutron_exceptions
 from novaclient import exceptions as nova_exceptions
 
-from waldur_openstack.openstack_base.backend import OpenStackBackendError
+from waldur_openstack.openstack_base.backend import (
+    OpenStackBackendError,
+    run_concurrently,
+)
 
 
 @ddt
@@ -36,3 +42,54 @@ class TestOpenStackBackendError(TestCase):
             pickle.loads(pickle.dumps(exc))  # noqa: S301
         except Exception as e:
             self.fail('Reraised exception is not serializable: %s' % str(e))
+
+
+class RunConcurrentlyTest(TestCase):
+    def override_concurrency(self, concurrency, timeout=10):
+        return override_settings(
+            WALDUR_OPENSTACK=dict(
+                settings.WALDUR_OPENSTACK,
+                API_CONCURRENCY=concurrency,
+                API_CALL_TIMEOUT=timeout,
+            )
+        )
+
+    def test_results_are_returned_in_order_of_calls(self):
+        with self.override_concurrency(4):
+            result = run_concurrently(lambda: 1, lambda: 2, lambda: 3)
+        self.assertEqual(result, [1, 2, 3])
+
+    def test_calls_are_executed_in_parallel(self):
+        barrier = threading.Barrier(2, timeout=5)
+
+        def call():
+            # Barrier is broken if the second call is not started concurrently
+            return barrier.wait()
+
+        with self.override_concurrency(2):
+            result = run_concurrently(call, call)
+        self.assertEqual(set(result), {0, 1})
+
+    def test_calls_are_executed_on_calling_thread_if_concurrency_is_disabled(self):
+        with self.override_concurrency(1):
+            result = run_concurrently(
+                threading.current_thread, threading.current_thread
+            )
+        self.assertEqual(result, [threading.current_thread()] * 2)
+
+    def test_exception_is_reraised_on_calling_thread(self):
+        def call():
+            raise nova_exceptions.ClientException(500)
+
+        with self.override_concurrency(2):
+            self.assertRaises(
+                nova_exceptions.ClientException, run_concurrently, lambda: 1, call
+            )
+
+    def test_backend_error_is_raised_if_call_has_timed_out(self):
+        event = threading.Event()
+        with self.override_concurrency(2, timeout=0.01):
+            self.assertRaises(
+                OpenStackBackendError, run_concurrently, lambda: 1, event.wait
+            )
+        event.set()
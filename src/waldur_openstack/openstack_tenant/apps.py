@@ -16,6 +16,7 @@ class OpenStackTenantConfig(AppConfig):
 
     def ready(self):
         from waldur_core.quotas.fields import QuotaField, TotalQuotaField
+        from waldur_core.quotas import signals as quotas_signals
         from waldur_core.quotas.models import Quota
         from waldur_core.structure.models import (
             ServiceSettings,
@@ -49,6 +50,12 @@ class OpenStackTenantConfig(AppConfig):
             dispatch_uid='openstack_tenant.handlers.sync_private_settings_quotas_with_tenant_quotas',
         )
 
+        quotas_signals.quotas_usage_updated.connect(
+            handlers.sync_private_settings_quotas_with_tenant_quotas_in_bulk,
+            sender=Quota,
+            dispatch_uid='openstack_tenant.handlers.sync_private_settings_quotas_with_tenant_quotas_in_bulk',
+        )
+
         signals.post_save.connect(
             handlers.propagate_volume_type_quotas_from_tenant_to_private_service_settings,
             sender=Quota,
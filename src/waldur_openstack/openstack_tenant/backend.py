@@ -19,6 +19,7 @@ from waldur_core.structure.utils import (
 from waldur_openstack.openstack_base.backend import (
     BaseOpenStackBackend,
     OpenStackBackendError,
+    run_concurrently,
 )
 
 from . import models
@@ -216,12 +217,35 @@ class OpenStackTenantBackend(BaseOpenStackBackend):
         self.pull_instance_availability_zones()
 
     def pull_resources(self):
-        self.pull_volumes()
-        self.pull_snapshots()
-        self.pull_instances()
+        # Clients are created on the calling thread so that all calls share the same session
+        cinder = self.cinder_client
+        nova = self.nova_client
+        neutron = self.neutron_client
+        try:
+            volumes, snapshots, instances, ports = run_concurrently(
+                cinder.volumes.list,
+                cinder.volume_snapshots.list,
+                nova.servers.list,
+                lambda: neutron.list_ports(tenant_id=self.tenant_id)['ports'],
+            )
+        except (
+            cinder_exceptions.ClientException,
+            nova_exceptions.ClientException,
+            neutron_exceptions.NeutronClientException,
+        ) as e:
+            raise OpenStackBackendError(e)
 
-    def pull_volumes(self):
-        backend_volumes = self.get_volumes()
+        # Backend resources are converted and stored on the calling thread
+        # because it requires database queries
+        self.pull_volumes(self.get_volumes(volumes))
+        self.pull_snapshots(self.get_snapshots(snapshots))
+        self.pull_instances(
+            self.get_instances(instances), self.get_instances_security_groups(ports)
+        )
+
+    def pull_volumes(self, backend_volumes=None):
+        if backend_volumes is None:
+            backend_volumes = self.get_volumes()
         volumes = models.Volume.objects.filter(
             service_project_link__service__settings=self.settings,
             state__in=[models.Volume.States.OK, models.Volume.States.ERRED],
@@ -241,8 +265,9 @@ class OpenStackTenantBackend(BaseOpenStackBackend):
                 )
                 handle_resource_update_success(volume)
 
-    def pull_snapshots(self):
-        backend_snapshots = self.get_snapshots()
+    def pull_snapshots(self, backend_snapshots=None):
+        if backend_snapshots is None:
+            backend_snapshots = self.get_snapshots()
         snapshots = models.Snapshot.objects.filter(
             service_project_link__service__settings=self.settings,
             state__in=[models.Snapshot.States.OK, models.Snapshot.States.ERRED],
@@ -262,8 +287,11 @@ class OpenStackTenantBackend(BaseOpenStackBackend):
                 )
                 handle_resource_update_success(snapshot)
 
-    def pull_instances(self):
-        backend_instances = self.get_instances()
+    def pull_instances(self, backend_instances=None, backend_security_groups=None):
+        if backend_instances is None:
+            backend_instances = self.get_instances()
+        if backend_security_groups is None:
+            backend_security_groups = self.get_instances_security_groups()
         instances = models.Instance.objects.filter(
             service_project_link__service__settings=self.settings,
             state__in=[models.Instance.States.OK, models.Instance.States.ERRED],
@@ -272,6 +300,7 @@ class OpenStackTenantBackend(BaseOpenStackBackend):
             backend_instance.backend_id: backend_instance
             for backend_instance in backend_instances
         }
+        pulled_instances = []
         for instance in instances:
             try:
                 backend_instance = backend_instances_map[instance.backend_id]
@@ -279,9 +308,85 @@ class OpenStackTenantBackend(BaseOpenStackBackend):
                 handle_resource_not_found(instance)
             else:
                 self.update_instance_fields(instance, backend_instance)
-                # XXX: can be optimized after https://goo.gl/BZKo8Y will be resolved.
-                self.pull_instance_security_groups(instance)
-                handle_resource_update_success(instance)
+                pulled_instances.append(instance)
+        self.pull_instances_security_groups(pulled_instances, backend_security_groups)
+        for instance in pulled_instances:
+            handle_resource_update_success(instance)
+
+    def get_instances_security_groups(self, ports=None):
+        """
+        Return dictionary mapping backend ID of instance to the set of backend IDs
+        of its security groups. Security groups of all instances of the tenant
+        are fetched from ports using single Neutron call instead of Nova call per instance.
+        """
+        if ports is None:
+            try:
+                response = self.neutron_client.list_ports(tenant_id=self.tenant_id)
+            except neutron_exceptions.NeutronClientException as e:
+                raise OpenStackBackendError(e)
+            ports = response['ports']
+
+        security_groups = {}
+        for port in ports:
+            if not port.get('device_owner', '').startswith('compute:'):
+                continue
+            security_groups.setdefault(port['device_id'], set()).update(
+                port.get('security_groups', [])
+            )
+        return security_groups
+
+    @transaction.atomic()
+    def pull_instances_security_groups(self, instances, backend_security_groups):
+        """
+        Synchronize security groups of given instances using bulk queries
+        for through table, so that number of queries does not depend on number of instances.
+        """
+        Link = models.Instance.security_groups.through
+        instances_map = {instance.id: instance for instance in instances}
+        security_groups_map = dict(
+            models.SecurityGroup.objects.filter(settings=self.settings)
+            .exclude(backend_id='')
+            .values_list('backend_id', 'id')
+        )
+
+        current_links = {}
+        for link_id, instance_id, group_id in (
+            Link.objects.filter(instance_id__in=list(instances_map))
+            .exclude(securitygroup__backend_id='')
+            .values_list('id', 'instance_id', 'securitygroup__backend_id')
+        ):
+            current_links.setdefault(instance_id, {})[group_id] = link_id
+
+        stale_links = []
+        new_links = []
+        for instance_id, instance in instances_map.items():
+            backend_ids = backend_security_groups.get(instance.backend_id, set())
+            nc_links = current_links.get(instance_id, {})
+
+            for group_id in set(nc_links) - backend_ids:
+                stale_links.append(nc_links[group_id])
+
+            for group_id in backend_ids - set(nc_links):
+                try:
+                    security_group_id = security_groups_map[group_id]
+                except KeyError:
+                    logger.error(
+                        'Security group with id %s does not exist at Waldur. '
+                        'Settings ID: %s',
+                        group_id,
+                        self.settings.id,
+                    )
+                else:
+                    new_links.append(
+                        Link(
+                            instance_id=instance_id, securitygroup_id=security_group_id
+                        )
+                    )
+
+        if stale_links:
+            Link.objects.filter(id__in=stale_links).delete()
+        if new_links:
+            Link.objects.bulk_create(new_links)
 
     def update_instance_fields(self, instance, backend_instance):
         # Preserve flavor fields in Waldur database if flavor is deleted in OpenStack
@@ -802,12 +907,12 @@ class OpenStackTenantBackend(BaseOpenStackBackend):
                 ).first()
         return volume
 
-    def get_volumes(self):
-        cinder = self.cinder_client
-        try:
-            backend_volumes = cinder.volumes.list()
-        except cinder_exceptions.ClientException as e:
-            raise OpenStackBackendError(e)
+    def get_volumes(self, backend_volumes=None):
+        if backend_volumes is None:
+            try:
+                backend_volumes = self.cinder_client.volumes.list()
+            except cinder_exceptions.ClientException as e:
+                raise OpenStackBackendError(e)
         return [
             self._backend_volume_to_volume(backend_volume)
             for backend_volume in backend_volumes
@@ -927,12 +1032,12 @@ class OpenStackTenantBackend(BaseOpenStackBackend):
             ).first()
         return snapshot
 
-    def get_snapshots(self):
-        cinder = self.cinder_client
-        try:
-            backend_snapshots = cinder.volume_snapshots.list()
-        except cinder_exceptions.ClientException as e:
-            raise OpenStackBackendError(e)
+    def get_snapshots(self, backend_snapshots=None):
+        if backend_snapshots is None:
+            try:
+                backend_snapshots = self.cinder_client.volume_snapshots.list()
+            except cinder_exceptions.ClientException as e:
+                raise OpenStackBackendError(e)
         return [
             self._backend_snapshot_to_snapshot(backend_snapshot)
             for backend_snapshot in backend_snapshots
@@ -1409,12 +1514,12 @@ class OpenStackTenantBackend(BaseOpenStackBackend):
             if instance.backend_id not in registered_backend_ids
         ]
 
-    def get_instances(self):
-        nova = self.nova_client
-        try:
-            backend_instances = nova.servers.list()
-        except nova_exceptions.ClientException as e:
-            raise OpenStackBackendError(e)
+    def get_instances(self, backend_instances=None):
+        if backend_instances is None:
+            try:
+                backend_instances = self.nova_client.servers.list()
+            except nova_exceptions.ClientException as e:
+                raise OpenStackBackendError(e)
 
         instances = []
         for backend_instance in backend_instances:
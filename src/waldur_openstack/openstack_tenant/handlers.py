@@ -555,6 +555,11 @@ def sync_private_settings_quotas_with_tenant_quotas(
     )
 
 
+def sync_private_settings_quotas_with_tenant_quotas_in_bulk(sender, quotas, **kwargs):
+    for quota in quotas:
+        sync_private_settings_quotas_with_tenant_quotas(sender, quota)
+
+
 def propagate_volume_type_quotas_from_tenant_to_private_service_settings(
     sender, instance, created=False, **kwargs
 ):
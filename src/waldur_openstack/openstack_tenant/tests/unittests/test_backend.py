@@ -4,9 +4,11 @@ from unittest import mock
 from cinderclient.v2.volumes import Volume
 from ddt import data, ddt
 from django.test import TestCase
+from neutronclient.client import exceptions as neutron_exceptions
 from novaclient.v2.flavors import Flavor
 from novaclient.v2.servers import Server
 
+from waldur_openstack.openstack_base.backend import OpenStackBackendError
 from waldur_openstack.openstack_tenant import models
 from waldur_openstack.openstack_tenant.backend import OpenStackTenantBackend
 
@@ -783,6 +785,106 @@ class PullInstanceTest(BaseBackendTest):
         self.assertEqual(instance.error_message, 'Waldur error.')
 
 
+class PullInstancesSecurityGroupsTest(BaseBackendTest):
+    def setUp(self):
+        super(PullInstancesSecurityGroupsTest, self).setUp()
+        self.instance = self.fixture.instance
+        self.instance.backend_id = 'instance_id'
+        self.instance.save()
+        self.groups = [
+            factories.SecurityGroupFactory(settings=self.settings) for _ in range(3)
+        ]
+        self.instance.security_groups.add(self.groups[0], self.groups[1])
+
+    def pull(self, *group_ids):
+        self.neutron_client_mock.list_ports.return_value = {
+            'ports': [
+                {
+                    'device_id': self.instance.backend_id,
+                    'device_owner': 'compute:nova',
+                    'security_groups': list(group_ids),
+                },
+                {
+                    'device_id': 'router_id',
+                    'device_owner': 'network:router_interface',
+                    'security_groups': [self.groups[0].backend_id],
+                },
+            ]
+        }
+        backend_groups = self.tenant_backend.get_instances_security_groups()
+        self.tenant_backend.pull_instances_security_groups(
+            [self.instance], backend_groups
+        )
+
+    def test_security_groups_of_all_instances_are_fetched_with_single_call(self):
+        self.pull(self.groups[0].backend_id)
+        self.neutron_client_mock.list_ports.assert_called_once_with(
+            tenant_id=self.tenant_backend.tenant_id
+        )
+        self.nova_client_mock.servers.list_security_group.assert_not_called()
+
+    def test_stale_groups_are_removed_and_missing_groups_are_added(self):
+        self.pull(self.groups[1].backend_id, self.groups[2].backend_id)
+        self.assertEqual(
+            set(self.instance.security_groups.all()), {self.groups[1], self.groups[2]}
+        )
+
+    def test_unknown_group_is_skipped(self):
+        self.pull(self.groups[0].backend_id, 'unknown_id')
+        self.assertEqual(set(self.instance.security_groups.all()), {self.groups[0]})
+
+
+class PullResourcesTest(BaseBackendTest):
+    def setUp(self):
+        super(PullResourcesTest, self).setUp()
+        self.volume = self.fixture.volume
+        self.instance = self.fixture.instance
+        self.instance.backend_id = 'instance_id'
+        self.instance.save()
+        self.security_group = factories.SecurityGroupFactory(settings=self.settings)
+
+        self.cinder_client_mock.volumes.list.return_value = []
+        self.cinder_client_mock.volume_snapshots.list.return_value = []
+        self.nova_client_mock.servers.list.return_value = [
+            self._get_valid_instance(self.instance.backend_id)
+        ]
+        self.neutron_client_mock.list_ports.return_value = {
+            'ports': [
+                {
+                    'device_id': self.instance.backend_id,
+                    'device_owner': 'compute:nova',
+                    'security_groups': [self.security_group.backend_id],
+                }
+            ]
+        }
+
+    def test_each_resource_list_is_fetched_once(self):
+        self.tenant_backend.pull_resources()
+        self.cinder_client_mock.volumes.list.assert_called_once_with()
+        self.cinder_client_mock.volume_snapshots.list.assert_called_once_with()
+        self.nova_client_mock.servers.list.assert_called_once_with()
+        self.neutron_client_mock.list_ports.assert_called_once_with(
+            tenant_id=self.tenant_backend.tenant_id
+        )
+
+    def test_pulled_resources_are_updated(self):
+        self.tenant_backend.pull_resources()
+
+        self.volume.refresh_from_db()
+        self.assertEqual(self.volume.state, models.Volume.States.ERRED)
+        self.instance.refresh_from_db()
+        self.assertEqual(self.instance.name, 'server-%s' % self.instance.backend_id)
+        self.assertEqual(
+            list(self.instance.security_groups.all()), [self.security_group]
+        )
+
+    def test_backend_error_is_raised_if_any_call_fails(self):
+        self.neutron_client_mock.list_ports.side_effect = (
+            neutron_exceptions.NeutronClientException
+        )
+        self.assertRaises(OpenStackBackendError, self.tenant_backend.pull_resources)
+
+
 class PullInstanceInternalIpsTest(BaseBackendTest):
     def setup_neutron(self, port_id, device_id, subnet_id):
         self.neutron_client_mock.list_ports.return_value = {
@@ -21,3 +21,16 @@ class TenantQuotasTest(test.APITransactionTestCase):
         self.assertEqual(self.tenant.quotas.get(name='storage').usage, 102400)
         self.assertEqual(self.tenant.quotas.get(name='floating_ip_count').usage, 2)
         self.assertEqual(self.tenant.quotas.get(name='instances').usage, 1)
+
+    def test_private_settings_quota_is_synced_when_instance_quotas_are_applied(self):
+        self.tenant.set_quota_usage('vcpu', 10)
+        private_settings = self.fixture.openstack_tenant_service_settings
+        # Emulate usage drift which is fixed by synchronization with tenant quota
+        private_settings.quotas.filter(name='vcpu').update(usage=0)
+
+        instance = self.fixture.instance
+        instance.increase_backend_quotas_usage(validate=False)
+
+        expected_usage = 10 + instance.cores
+        self.assertEqual(self.tenant.quotas.get(name='vcpu').usage, expected_usage)
+        self.assertEqual(private_settings.quotas.get(name='vcpu').usage, expected_usage)
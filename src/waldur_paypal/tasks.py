@@ -20,9 +20,6 @@ class PaypalTaskMixin(ExtensionTaskMixin):
 class PaymentsCleanUp(PaypalTaskMixin, core_tasks.BackgroundTask):
     name = 'waldur_paypal.PaymentsCleanUp'
 
-    def is_equal(self, other_task, *args, **kwargs):
-        return self.name == other_task.get('name')
-
     def run(self):
         timespan = settings.WALDUR_PAYPAL.get(
             'STALE_PAYMENTS_LIFETIME', timedelta(weeks=1)
@@ -35,9 +32,6 @@ class PaymentsCleanUp(PaypalTaskMixin, core_tasks.BackgroundTask):
 class SendInvoices(PaypalTaskMixin, core_tasks.BackgroundTask):
     name = 'waldur_paypal.SendInvoices'
 
-    def is_equal(self, other_task, *args, **kwargs):
-        return self.name == other_task.get('name')
-
     def run(self):
         new_invoices = models.Invoice.objects.filter(backend_id='')
 
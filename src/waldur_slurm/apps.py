@@ -8,14 +8,16 @@ class SlurmConfig(AppConfig):
     service_name = 'SLURM'
 
     def ready(self):
-        from waldur_core.quotas.fields import QuotaField, CounterQuotaField
+        from waldur_core.quotas.fields import CounterQuotaField, QuotaField
         from waldur_core.structure import SupportedServices
         from waldur_core.structure import models as structure_models
         from waldur_core.structure import signals as structure_signals
         from waldur_freeipa import models as freeipa_models
 
+        from . import handlers, models
+        from . import signals as slurm_signals
+        from . import utils
         from .backend import SlurmBackend
-        from . import handlers, models, utils
 
         SupportedServices.register_backend(SlurmBackend)
 
@@ -80,3 +82,9 @@ class SlurmConfig(AppConfig):
             sender=models.Allocation,
             dispatch_uid='waldur_slurm.handlers.update_quotas_on_allocation_usage_update',
         )
+
+        slurm_signals.allocations_usage_updated.connect(
+            handlers.update_quotas_on_allocations_usage_update,
+            sender=models.Allocation,
+            dispatch_uid='waldur_slurm.handlers.update_quotas_on_allocations_usage_update',
+        )
@@ -1,6 +1,7 @@
 import logging
 import operator
 import re
+import time
 from functools import reduce
 
 from django.conf import settings as django_settings
@@ -12,10 +13,12 @@ from waldur_freeipa import models as freeipa_models
 from waldur_slurm.client import SlurmClient
 from waldur_slurm.structures import Quotas
 
-from . import base, models
+from . import base, models, signals, utils
 
 logger = logging.getLogger(__name__)
 
+BATCH_SIZE = 1000
+
 
 class SlurmBackend(ServiceBackend):
     def __init__(self, settings):
@@ -142,13 +145,28 @@ class SlurmBackend(ServiceBackend):
         self.client.set_resource_limits(allocation.backend_id, quotas)
 
     def sync_usage(self):
+        """
+        Fetch usage report of all allocations with single sacct call
+        and store it using bulk queries. Timings of each phase are logged and returned.
+        """
+        timings = {}
+        started = time.perf_counter()
         waldur_allocations = {
             allocation.backend_id: allocation
             for allocation in self.get_allocation_queryset()
             if allocation.backend_id
         }
+        timings['allocations'] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        if django_settings.WALDUR_SLURM['STREAM_USAGE_REPORT']:
+            lines = self.client.iter_usage_report(waldur_allocations.keys())
+        else:
+            lines = self.client.get_usage_report(waldur_allocations.keys())
+        report = self.aggregate_usage_report(lines)
+        timings['report'] = time.perf_counter() - started
 
-        report = self.get_usage_report(waldur_allocations.keys())
+        usages = {}
         for account, usage in report.items():
             allocation = waldur_allocations.get(account)
             if not allocation:
@@ -157,7 +175,16 @@ class SlurmBackend(ServiceBackend):
                     account,
                 )
                 continue
-            self._update_quotas(allocation, usage)
+            usages[allocation] = usage
+
+        timings.update(self.update_usages(usages))
+        logger.info(
+            'Usage of %s SLURM allocations has been synchronized for %s. Timings: %s',
+            len(usages),
+            self.settings,
+            ', '.join('%s=%.3fs' % item for item in timings.items()),
+        )
+        return timings
 
     def pull_allocation(self, allocation):
         account = allocation.backend_id
@@ -171,13 +198,19 @@ class SlurmBackend(ServiceBackend):
         usage = report.get(account)
         if not usage:
             usage = {'TOTAL_ACCOUNT_USAGE': Quotas()}
-        self._update_quotas(allocation, usage)
+        self.update_usages({allocation: usage})
         limits = self.get_allocation_limits(account)
         self._update_limits(allocation, limits)
 
     def get_usage_report(self, accounts):
+        return self.aggregate_usage_report(self.client.get_usage_report(accounts))
+
+    def aggregate_usage_report(self, lines):
+        """
+        Sum up usage per account and user. Lines are consumed one by one,
+        so that iterator over streamed report is never stored in memory.
+        """
         report = {}
-        lines = self.client.get_usage_report(accounts)
 
         for line in lines:
             report.setdefault(line.account, {}).setdefault(line.user, Quotas())
@@ -208,42 +241,144 @@ class SlurmBackend(ServiceBackend):
         allocation.ram_limit = limits.ram
         allocation.save(update_fields=['cpu_limit', 'gpu_limit', 'ram_limit'])
 
-    @transaction.atomic()
-    def _update_quotas(self, allocation, usage):
-        quotas = usage.pop('TOTAL_ACCOUNT_USAGE')
-        allocation.cpu_usage = quotas.cpu
-        allocation.gpu_usage = quotas.gpu
-        allocation.ram_usage = quotas.ram
-        allocation.save(update_fields=['cpu_usage', 'gpu_usage', 'ram_usage'])
-
-        usernames = usage.keys()
+    def update_usages(self, usages):
+        """
+        Store current month usage of allocations and their users using bulk queries.
+        Usages are specified as dictionary mapping allocation to the dictionary
+        mapping username to quotas with total usage under TOTAL_ACCOUNT_USAGE key.
+        Signals are sent once for all allocations and allocation usages
+        which have been created or changed. Timings of each phase are returned.
+        """
+        timings = {}
+        started = time.perf_counter()
+        now = timezone.now()
+        usages = {allocation: dict(usage) for allocation, usage in usages.items()}
+        totals = {
+            allocation: usage.pop('TOTAL_ACCOUNT_USAGE')
+            for allocation, usage in usages.items()
+        }
+        usernames = {username for usage in usages.values() for username in usage}
         usermap = {
-            profile.username: profile.user
+            profile.username: profile.user_id
             for profile in freeipa_models.Profile.objects.filter(username__in=usernames)
         }
+        allocations = {allocation.id: allocation for allocation in usages.keys()}
+        allocation_usages = {}
+        for allocation_usage in models.AllocationUsage.objects.filter(
+            allocation__in=list(usages.keys()), year=now.year, month=now.month
+        ):
+            # Reuse allocation with related objects already loaded for signal receivers
+            allocation_usage.allocation = allocations[allocation_usage.allocation_id]
+            allocation_usages.setdefault(
+                allocation_usage.allocation_id, allocation_usage
+            )
+        timings['lookup'] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        with transaction.atomic():
+            changed_allocations = []
+            new_allocation_usages = []
+            changed_allocation_usages = []
+            for allocation, quotas in totals.items():
+                if self._set_usage(allocation, quotas):
+                    changed_allocations.append(allocation)
+
+                allocation_usage = allocation_usages.get(allocation.id)
+                if allocation_usage is None:
+                    allocation_usage = models.AllocationUsage(
+                        allocation=allocation, year=now.year, month=now.month
+                    )
+                    self._set_usage(allocation_usage, quotas)
+                    allocation_usages[allocation.id] = allocation_usage
+                    new_allocation_usages.append(allocation_usage)
+                elif self._set_usage(allocation_usage, quotas):
+                    changed_allocation_usages.append(allocation_usage)
+
+            models.Allocation.objects.bulk_update(
+                changed_allocations, list(utils.FIELD_NAMES), batch_size=BATCH_SIZE
+            )
+            models.AllocationUsage.objects.bulk_create(
+                new_allocation_usages, batch_size=BATCH_SIZE
+            )
+            models.AllocationUsage.objects.bulk_update(
+                changed_allocation_usages,
+                list(utils.FIELD_NAMES),
+                batch_size=BATCH_SIZE,
+            )
 
-        allocation_usage, _ = models.AllocationUsage.objects.update_or_create(
-            allocation=allocation,
-            year=timezone.now().year,
-            month=timezone.now().month,
-            defaults={
-                'cpu_usage': quotas.cpu,
-                'gpu_usage': quotas.gpu,
-                'ram_usage': quotas.ram,
-            },
-        )
+            user_usages = {}
+            for user_usage in models.AllocationUserUsage.objects.filter(
+                allocation_usage__in=[
+                    allocation_usages[allocation.id] for allocation in usages.keys()
+                ]
+            ):
+                user_usages.setdefault(
+                    (user_usage.allocation_usage_id, user_usage.username), user_usage
+                )
 
-        for username, quotas in usage.items():
-            models.AllocationUserUsage.objects.update_or_create(
-                allocation_usage=allocation_usage,
-                user=usermap.get(username),
-                username=username,
-                defaults={
-                    'cpu_usage': quotas.cpu,
-                    'gpu_usage': quotas.gpu,
-                    'ram_usage': quotas.ram,
-                },
+            new_user_usages = []
+            changed_user_usages = []
+            for allocation, usage in usages.items():
+                allocation_usage = allocation_usages[allocation.id]
+                for username, quotas in usage.items():
+                    user_id = usermap.get(username)
+                    user_usage = user_usages.get((allocation_usage.id, username))
+                    if user_usage is None:
+                        user_usage = models.AllocationUserUsage(
+                            allocation_usage=allocation_usage,
+                            user_id=user_id,
+                            username=username,
+                        )
+                        self._set_usage(user_usage, quotas)
+                        new_user_usages.append(user_usage)
+                    elif (
+                        self._set_usage(user_usage, quotas)
+                        or user_usage.user_id != user_id
+                    ):
+                        user_usage.user_id = user_id
+                        changed_user_usages.append(user_usage)
+
+            models.AllocationUserUsage.objects.bulk_create(
+                new_user_usages, batch_size=BATCH_SIZE
+            )
+            models.AllocationUserUsage.objects.bulk_update(
+                changed_user_usages,
+                list(utils.FIELD_NAMES) + ['user'],
+                batch_size=BATCH_SIZE,
             )
+            timings['write'] = time.perf_counter() - started
+
+            started = time.perf_counter()
+            # Dependent quotas, component usages and invoice items
+            # are updated in grouped form by receivers of these signals
+            if changed_allocations:
+                signals.allocations_usage_updated.send(
+                    sender=models.Allocation, allocations=changed_allocations
+                )
+            if new_allocation_usages or changed_allocation_usages:
+                signals.allocation_usages_updated.send(
+                    sender=models.AllocationUsage,
+                    allocation_usages=new_allocation_usages + changed_allocation_usages,
+                )
+            timings['signals'] = time.perf_counter() - started
+
+        return timings
+
+    def _set_usage(self, instance, quotas):
+        """
+        Copy quotas to usage fields of the instance and return True if any of them has changed.
+        """
+        values = {
+            'cpu_usage': quotas.cpu,
+            'gpu_usage': quotas.gpu,
+            'ram_usage': quotas.ram,
+        }
+        changed = any(
+            getattr(instance, field) != value for field, value in values.items()
+        )
+        for field, value in values.items():
+            setattr(instance, field, value)
+        return changed
 
     def create_customer(self, customer):
         customer_name = self.get_customer_name(customer)
@@ -263,6 +398,9 @@ class SlurmBackend(ServiceBackend):
     def get_allocation_queryset(self):
         return models.Allocation.objects.filter(
             service_project_link__service__settings=self.settings
+        ).select_related(
+            'service_project_link__service',
+            'service_project_link__project__customer',
         )
 
     def get_customer_name(self, customer):
@@ -1,6 +1,7 @@
 import abc
 import logging
 import subprocess  # noqa: S404
+import tempfile
 
 from django.utils.functional import cached_property
 
@@ -109,7 +110,7 @@ class BaseBatchClient(metaclass=abc.ABCMeta):
         """
         raise NotImplementedError()
 
-    def execute_command(self, command):
+    def get_ssh_command(self, command):
         server = '%s@%s' % (self.username, self.hostname)
         port = str(self.port)
         if self.use_sudo:
@@ -118,7 +119,7 @@ class BaseBatchClient(metaclass=abc.ABCMeta):
             account_command = []
 
         account_command.extend(command)
-        ssh_command = [
+        return [
             'ssh',
             '-o',
             'UserKnownHostsFile=/dev/null',
@@ -131,6 +132,9 @@ class BaseBatchClient(metaclass=abc.ABCMeta):
             self.key_path,
             ' '.join(account_command),
         ]
+
+    def execute_command(self, command):
+        ssh_command = self.get_ssh_command(command)
         try:
             logger.debug('Executing SSH command: %s', ' '.join(ssh_command))
             return subprocess.check_output(  # noqa: S603
@@ -138,12 +142,34 @@ class BaseBatchClient(metaclass=abc.ABCMeta):
             )
         except subprocess.CalledProcessError as e:
             logger.exception('Failed to execute command "%s".', ssh_command)
-            stdout = e.output or ''
-            lines = stdout.splitlines()
-            if len(lines) > 0 and lines[0].startswith('Warning: Permanently added'):
-                lines = lines[1:]
-            stdout = '\n'.join(lines)
-            raise BatchError(stdout)
+            raise BatchError(self.format_error(e.output))
+
+    def stream_command(self, command):
+        """
+        Execute command and yield lines of its output as soon as they are received,
+        so that large output is not kept in memory at once.
+        """
+        ssh_command = self.get_ssh_command(command)
+        logger.debug('Streaming SSH command: %s', ' '.join(ssh_command))
+        # Error output is written to temporary file instead of pipe
+        # in order to avoid deadlock if it is not consumed in time.
+        with tempfile.TemporaryFile(mode='w+', encoding='utf-8') as stderr:
+            process = subprocess.Popen(  # noqa: S603
+                ssh_command, stdout=subprocess.PIPE, stderr=stderr, encoding='utf-8',
+            )
+            with process:
+                for line in process.stdout:
+                    yield line.rstrip('\n')
+            if process.returncode:
+                logger.error('Failed to execute command "%s".', ssh_command)
+                stderr.seek(0)
+                raise BatchError(self.format_error(stderr.read()))
+
+    def format_error(self, output):
+        lines = (output or '').splitlines()
+        if len(lines) > 0 and lines[0].startswith('Warning: Permanently added'):
+            lines = lines[1:]
+        return '\n'.join(lines)
 
 
 class BaseReportLine(metaclass=abc.ABCMeta):
@@ -116,9 +116,26 @@ class SlurmClient(BaseBatchClient):
         )
 
     def get_usage_report(self, accounts):
+        output = self._execute_command(
+            self._get_usage_report_args(accounts), 'sacct', immediate=False
+        )
+        return [SlurmReportLine(line) for line in output.splitlines() if '|' in line]
+
+    def iter_usage_report(self, accounts):
+        """
+        Yield report lines while output of sacct is being received.
+        """
+        command = self._get_command(
+            self._get_usage_report_args(accounts), 'sacct', immediate=False
+        )
+        for line in self.stream_command(command):
+            if '|' in line:
+                yield SlurmReportLine(line)
+
+    def _get_usage_report_args(self, accounts):
         month_start, month_end = format_current_month()
 
-        args = [
+        return [
             '--noconvert',
             '--truncate',
             '--allocations',
@@ -128,8 +145,6 @@ class SlurmClient(BaseBatchClient):
             '--accounts=%s' % ','.join(accounts),
             '--format=Account,ReqTRES,Elapsed,User',
         ]
-        output = self._execute_command(args, 'sacct', immediate=False)
-        return [SlurmReportLine(line) for line in output.splitlines() if '|' in line]
 
     def get_resource_limits(self, account):
         args = [
@@ -159,9 +174,12 @@ class SlurmClient(BaseBatchClient):
             if '|' in line and line[-1] != '|'
         ]
 
-    def _execute_command(self, command, command_name='sacctmgr', immediate=True):
+    def _get_command(self, command, command_name='sacctmgr', immediate=True):
         account_command = [command_name, '--parsable2', '--noheader']
         if immediate:
             account_command.append('--immediate')
         account_command.extend(command)
-        return self.execute_command(account_command)
+        return account_command
+
+    def _execute_command(self, command, command_name='sacctmgr', immediate=True):
+        return self.execute_command(self._get_command(command, command_name, immediate))
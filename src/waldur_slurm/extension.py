@@ -14,6 +14,9 @@ class SlurmExtension(WaldurExtension):
                 'GPU': 400,  # Measured unit is GPU-hours
                 'RAM': 100000 * 2 ** 10,  # Measured unit is MB
             },
+            # Stream sacct output for usage synchronization instead of waiting for whole report.
+            # Disable it if SSH connection to the cluster does not tolerate long-running reads.
+            'STREAM_USAGE_REPORT': True,
         }
 
     @staticmethod
@@ -5,6 +5,7 @@ from django.db import transaction
 from django.db.models import Sum
 
 from waldur_core.core import utils as core_utils
+from waldur_core.structure import models as structure_models
 from waldur_freeipa import models as freeipa_models
 
 from . import models, tasks, utils
@@ -81,6 +82,23 @@ def update_quotas_on_allocation_usage_update(sender, instance, created=False, **
     update_quotas(project.customer, models.Allocation.Permissions.customer_path)
 
 
+def update_quotas_on_allocations_usage_update(sender, allocations, **kwargs):
+    # Quotas of each project and customer are updated once for all their allocations
+    projects = structure_models.Project.objects.filter(
+        id__in=models.Allocation.objects.filter(
+            id__in=[allocation.id for allocation in allocations]
+        ).values('service_project_link__project_id')
+    ).select_related('customer')
+
+    customers = {}
+    for project in projects:
+        update_quotas(project, models.Allocation.Permissions.project_path)
+        customers[project.customer_id] = project.customer
+
+    for customer in customers.values():
+        update_quotas(customer, models.Allocation.Permissions.customer_path)
+
+
 def update_quotas(scope, path):
     qs = models.Allocation.objects.filter(**{path: scope}).values(path)
     for quota in utils.FIELD_NAMES:
@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Sent once for all allocations and allocation usages stored by usage synchronization
+allocations_usage_updated = Signal(providing_args=['allocations'])
+allocation_usages_updated = Signal(providing_args=['allocation_usages'])
@@ -1,7 +1,7 @@
 from unittest import mock
 
 from django.conf import settings as django_settings
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from freezegun import freeze_time
 
 from waldur_freeipa import models as freeipa_models
@@ -35,15 +35,20 @@ allocation1|user3
 """
 
 
+def mock_report(popen, report):
+    popen.return_value.stdout = iter(report.splitlines(keepends=True))
+    popen.return_value.returncode = 0
+
+
 class BackendTest(TestCase):
     def setUp(self):
         self.fixture = fixtures.SlurmFixture()
         self.allocation = self.fixture.allocation
         self.account = self.allocation.backend_id
 
-    @mock.patch('subprocess.check_output')
-    def test_usage_synchronization(self, check_output):
-        check_output.return_value = VALID_REPORT.replace('allocation1', self.account)
+    @mock.patch('subprocess.Popen')
+    def test_usage_synchronization(self, popen):
+        mock_report(popen, VALID_REPORT.replace('allocation1', self.account))
 
         backend = self.allocation.get_backend()
         backend.sync_usage()
@@ -54,9 +59,9 @@ class BackendTest(TestCase):
         self.assertEqual(self.allocation.ram_usage, (1 + 2 * 2) * 51200)
 
     @freeze_time('2017-10-16')
-    @mock.patch('subprocess.check_output')
-    def test_usage_per_user(self, check_output):
-        check_output.return_value = VALID_REPORT.replace('allocation1', self.account)
+    @mock.patch('subprocess.Popen')
+    def test_usage_per_user(self, popen):
+        mock_report(popen, VALID_REPORT.replace('allocation1', self.account))
 
         user1 = self.fixture.manager
         user2 = self.fixture.admin
@@ -86,6 +91,71 @@ class BackendTest(TestCase):
         self.assertEqual(user2_allocation_usage.gpu_usage, 2 * 2 * 2)
         self.assertEqual(user2_allocation_usage.ram_usage, 2 * 2 * 51200)
 
+    @mock.patch('subprocess.check_output')
+    @mock.patch('subprocess.Popen')
+    def test_usage_report_is_streamed(self, popen, check_output):
+        mock_report(popen, VALID_REPORT.replace('allocation1', self.account))
+
+        backend = self.allocation.get_backend()
+        timings = backend.sync_usage()
+        self.allocation.refresh_from_db()
+
+        check_output.assert_not_called()
+
+        self.assertEqual(self.allocation.cpu_usage, 1 + 2 * 2 * 2)
+        self.assertEqual(self.allocation.ram_usage, (1 + 2 * 2) * 51200)
+        self.assertEqual(
+            set(timings.keys()), {'allocations', 'report', 'lookup', 'write', 'signals'}
+        )
+
+    @override_settings(
+        WALDUR_SLURM=dict(django_settings.WALDUR_SLURM, STREAM_USAGE_REPORT=False)
+    )
+    @mock.patch('subprocess.check_output')
+    def test_usage_report_is_buffered_if_streaming_is_disabled(self, check_output):
+        check_output.return_value = VALID_REPORT.replace('allocation1', self.account)
+
+        backend = self.allocation.get_backend()
+        backend.sync_usage()
+        self.allocation.refresh_from_db()
+
+        self.assertEqual(self.allocation.cpu_usage, 1 + 2 * 2 * 2)
+
+    @freeze_time('2017-10-16')
+    @mock.patch('subprocess.Popen')
+    def test_unchanged_usage_is_not_saved_again(self, popen):
+        report = VALID_REPORT.replace('allocation1', self.account)
+        mock_report(popen, report)
+        backend = self.allocation.get_backend()
+        backend.sync_usage()
+        self.assertEqual(
+            models.AllocationUserUsage.objects.filter(
+                allocation_usage__allocation=self.allocation
+            ).count(),
+            2,
+        )
+
+        with mock.patch(
+            'waldur_slurm.backend.signals.allocations_usage_updated.send'
+        ) as send, mock.patch(
+            'waldur_slurm.backend.signals.allocation_usages_updated.send'
+        ) as send_usages:
+            mock_report(popen, report)
+            backend.sync_usage()
+            send.assert_not_called()
+            send_usages.assert_not_called()
+
+        self.assertEqual(
+            models.AllocationUsage.objects.filter(allocation=self.allocation).count(),
+            1,
+        )
+        self.assertEqual(
+            models.AllocationUserUsage.objects.filter(
+                allocation_usage__allocation=self.allocation
+            ).count(),
+            2,
+        )
+
     @mock.patch('subprocess.check_output')
     def test_set_resource_limits(self, check_output):
         default_limits = django_settings.WALDUR_SLURM['DEFAULT_LIMITS']